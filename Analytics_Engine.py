@@ -0,0 +1,280 @@
+import argparse
+import statistics
+import time
+
+import pandas as pd
+
+from Dashboard_Queries import AGE_GROUPS, DAY_PERIODS, QUERIES, build_filters, query
+
+# -----------------------------
+# IN-MEMORY ANALYTICS ENGINE
+# -----------------------------
+# Optional alternative to running every panel query in Dashboard_Queries.py:
+# pull the filtered traffic_stops slice once (SLICE_SQL), then compute each
+# panel's DataFrame in-process with vectorized groupbys. Every aggregate
+# returns the same columns, order and limits as its SQL counterpart.
+
+SLICE_COLUMNS = [
+    "country_name", "driver_gender", "driver_age", "driver_race", "violation", "search_conducted",
+    "is_arrested", "stop_duration", "drugs_related_stop", "vehicle_number",
+    "stop_year", "stop_month", "stop_hour", "age_group", "day_period",
+]
+
+SLICE_SQL = "SELECT " + ", ".join(SLICE_COLUMNS) + " FROM traffic_stops {filter_sql}"
+
+CATEGORICAL_COLUMNS = ["country_name", "driver_gender", "driver_race", "violation", "vehicle_number"]
+FLAG_COLUMNS = ["search_conducted", "is_arrested", "drugs_related_stop"]
+
+
+def slice_query(filter_sql):
+    return SLICE_SQL.format(filter_sql=filter_sql)
+
+
+def prepare_slice(raw):
+    # Columnar, categorical frame with the derived columns the panels group on
+    df = pd.DataFrame(index=raw.index)
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = raw[col].astype("category")
+    for col in FLAG_COLUMNS:
+        df[col] = pd.to_numeric(raw[col], errors="coerce").astype("Int8")
+    df["driver_age"] = pd.to_numeric(raw["driver_age"], errors="coerce")
+    df["stop_duration"] = pd.to_numeric(raw["stop_duration"], errors="coerce")
+
+    # Time parts and buckets are computed by the loader; only retyped here
+    df["year"] = pd.to_numeric(raw["stop_year"], errors="coerce").astype("Int16")
+    df["month"] = pd.to_numeric(raw["stop_month"], errors="coerce").astype("Int8")
+    df["hour"] = pd.to_numeric(raw["stop_hour"], errors="coerce").astype("Int8")
+    df["driver_age_group"] = pd.Categorical(raw["age_group"], categories=AGE_GROUPS)
+    df["time_period"] = pd.Categorical(raw["day_period"], categories=DAY_PERIODS)
+    return df
+
+# -----------------------------
+# AGGREGATES
+# -----------------------------
+
+def _group(df, keys):
+    # GROUP BY semantics: NULL keys form their own group, unused categories are skipped
+    return df.groupby(keys, dropna=False, observed=True, sort=False)
+
+
+def _top(df, by, ascending=False, limit=None):
+    out = df.sort_values(by, ascending=ascending, kind="stable").reset_index(drop=True)
+    return out.head(limit) if limit else out
+
+
+def _rate(part, total):
+    return (part * 100.0 / total).astype("float64").round(2)
+
+
+def _count_by(df, keys, name):
+    return _group(df, keys).size().rename(name).reset_index()
+
+
+def _stops_arrests(df, keys, searches=False):
+    grouped = _group(df, keys)
+    out = grouped.size().rename("total_stops").to_frame()
+    if searches:
+        out["total_searches"] = grouped["search_conducted"].sum()
+    out["total_arrests"] = grouped["is_arrested"].sum()
+    return out.reset_index()
+
+
+def total_logs(df):
+    return pd.DataFrame({"c": [len(df)]})
+
+
+def total_violations(df):
+    violation = df["violation"].astype("string")
+    return pd.DataFrame({"c": [int((violation.notna() & (violation != "")).sum())]})
+
+
+def high_risk_vehicles(df, threshold=4):
+    counts = _group(df, "vehicle_number").size()
+    return pd.DataFrame({"c": [int((counts >= threshold).sum())]})
+
+
+def drug_vehicles(df):
+    out = _count_by(df[df["drugs_related_stop"] == 1], "vehicle_number", "drug_stop_count")
+    return _top(out, "drug_stop_count", limit=10)
+
+
+def searched_vehicles(df):
+    out = _count_by(df[df["search_conducted"] == 1], "vehicle_number", "search_count")
+    return _top(out, "search_count", limit=10)
+
+
+def stops_by_hour(df):
+    out = _count_by(df, "hour", "stop_count").rename(columns={"hour": "hour_of_day"})
+    return _top(out, "stop_count")
+
+
+def duration_by_violation(df):
+    out = _group(df, "violation")["stop_duration"].mean().round(2).rename("avg_duration").reset_index()
+    return _top(out, "avg_duration")
+
+
+def night_arrest_rate(df):
+    out = _stops_arrests(df, "time_period")
+    out["arrest_rate_percent"] = _rate(out["total_arrests"], out["total_stops"])
+    return _top(out, "arrest_rate_percent")
+
+
+def arrests_by_age_group(df):
+    out = _count_by(df[df["is_arrested"] == 1], "driver_age_group", "arrests")
+    return _top(out, "arrests", limit=10)
+
+
+def gender_by_country(df):
+    out = _count_by(df, ["country_name", "driver_gender"], "stop_count").rename(columns={"country_name": "country"})
+    return _top(out, "stop_count")
+
+
+def race_gender_search_rate(df):
+    grouped = _group(df, ["driver_race", "driver_gender"])
+    out = grouped.size().rename("total_stops").to_frame()
+    out["total_searches"] = grouped["search_conducted"].sum()
+    out = out.reset_index()
+    out["search_rate_percent"] = _rate(out["total_searches"], out["total_stops"])
+    return _top(out, "search_rate_percent")
+
+
+def violation_search_arrest(df):
+    out = _stops_arrests(df, "violation", searches=True).drop(columns="total_stops")
+    return _top(out, ["total_searches", "total_arrests"], ascending=[False, False], limit=10)
+
+
+def young_driver_violations(df):
+    out = _count_by(df[df["driver_age"] < 25], "violation", "violation_count")
+    return _top(out, "violation_count", limit=10)
+
+
+def drug_stops_by_country(df):
+    out = _count_by(df[df["drugs_related_stop"] == 1], "country_name", "drug_stop_count")
+    return _top(out.rename(columns={"country_name": "country"}), "drug_stop_count", limit=10)
+
+
+def country_violation_arrest_rate(df):
+    out = _stops_arrests(df, ["country_name", "violation"]).rename(columns={"country_name": "country"})
+    out["arrest_rate_percent"] = _rate(out["total_arrests"], out["total_stops"])
+    return _top(out, "arrest_rate_percent")
+
+
+def country_searches(df):
+    out = _count_by(df[df["search_conducted"] == 1], "country_name", "total_search_stops")
+    return _top(out.rename(columns={"country_name": "country"}), "total_search_stops")
+
+
+def yearly_by_country(df):
+    out = _stops_arrests(df, ["country_name", "year"]).rename(columns={"country_name": "country"})
+    return _top(out, ["country", "year"], ascending=True)
+
+
+def violation_trends_age_race(df):
+    out = _count_by(df, ["driver_race", "driver_age_group", "violation"], "violation_count")
+    return _top(out, "violation_count")
+
+
+def time_period_analysis(df):
+    out = _count_by(df, ["year", "month", "hour"], "stop_count")
+    return _top(out, ["year", "month", "hour"], ascending=True)
+
+
+def violation_high_rates(df):
+    out = _stops_arrests(df, "violation", searches=True)
+    out["search_rate"] = _rate(out["total_searches"], out["total_stops"])
+    out["arrest_rate"] = _rate(out["total_arrests"], out["total_stops"])
+    return _top(out, ["search_rate", "arrest_rate"], ascending=[False, False], limit=10)
+
+
+def demographics_by_country(df):
+    keys = ["country_name", "driver_gender", "driver_race", "driver_age_group"]
+    out = _count_by(df, keys, "count").rename(columns={"country_name": "country"})
+    return _top(out, "count")
+
+
+def top_violations_arrest_rate(df):
+    out = _stops_arrests(df, "violation")
+    out["arrest_rate_percent"] = _rate(out["total_arrests"], out["total_stops"])
+    return _top(out, "arrest_rate_percent", limit=5)
+
+
+def kpis(df, threshold=4):
+    # Engine counterpart of Dashboard_Queries.KPI_SQL
+    return pd.DataFrame({
+        "total_logs": total_logs(df)["c"],
+        "total_violations": total_violations(df)["c"],
+        "high_risk_vehicles": high_risk_vehicles(df, threshold)["c"],
+    })
+
+
+AGGREGATES = {name: globals()[name] for name in QUERIES}
+
+
+def compute(name, df):
+    return AGGREGATES[name](df)
+
+
+def compute_all(df):
+    return {name: fn(df) for name, fn in AGGREGATES.items()}
+
+# -----------------------------
+# BENCHMARK: SQL PATH vs ENGINE
+# -----------------------------
+
+def _sql_path(read, filter_sql, params):
+    return {name: read(query(name, filter_sql), params) for name in QUERIES}
+
+
+def _engine_path(read, filter_sql, params):
+    return compute_all(prepare_slice(read(slice_query(filter_sql), params)))
+
+
+def _median_ms(fn, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def benchmark(read, date_windows, runs=3):
+    # read(sql, params) -> DataFrame; one row of results per date window (i.e. slice size)
+    results = []
+    for start, end in date_windows:
+        filter_sql, params = build_filters(start, end)
+        rows = int(read(query("total_logs", filter_sql), params)["c"][0])
+        sql_ms = _median_ms(lambda: _sql_path(read, filter_sql, params), runs)
+        engine_ms = _median_ms(lambda: _engine_path(read, filter_sql, params), runs)
+        results.append({"start": str(start.date()), "end": str(end.date()), "rows": rows,
+                        "sql_ms": round(sql_ms, 1), "engine_ms": round(engine_ms, 1),
+                        "speedup": round(sql_ms / max(engine_ms, 1e-9), 2)})
+    return pd.DataFrame(results)
+
+
+def main(argv=None):
+    import Data_Load as dl
+
+    parser = argparse.ArgumentParser(description="Benchmark the in-memory analytics engine against per-panel SQL")
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], default="mysql")
+    parser.add_argument("--sqlite-path", default="securecheck.db")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    connection = dl.connect(args.backend, args.sqlite_path)
+    placeholder = dl.PLACEHOLDER[args.backend]
+
+    def read(sql, params=None):
+        return pd.read_sql(sql.replace("%s", placeholder), connection, params=params)
+
+    # Growing slices: the most recent quarter, half and all of the data by stop_date
+    dates = pd.to_datetime(read("SELECT stop_date FROM traffic_stops WHERE stop_date IS NOT NULL")["stop_date"])
+    end = dates.max()
+    windows = [(dates.quantile(q), end) for q in (0.75, 0.5, 0.0)]
+
+    print(benchmark(read, windows, args.runs).to_string(index=False))
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import Data_Load as dl
+from Dashboard_Db import ConnectionPool, mysql_connect, read_data_version
+from Dashboard_Queries import QUERIES, ROLLUP_QUERIES, default_filters, kpi_query, query, rollup_query
+
+# ------------------------------
+# BENCHMARK SUITE
+# ------------------------------
+# Generates synthetic traffic stop CSVs at fixed sizes, loads each into a fresh
+# local database with Data_Load.py, times every dashboard query, and writes a
+# JSON report. Passing an earlier report as --baseline fails the run (exit 1)
+# when the loader or a query got slower than the tolerance allows. Each size
+# also checks that the dashboard's pooled connections see a newly committed load.
+#
+#   python Benchmark_Suite.py --sizes 10k 1m --report bench.json
+#   python Benchmark_Suite.py --sizes 10k 1m --baseline bench.json
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+
+COUNTRIES = (["USA", "India", "Canada"], [0.45, 0.35, 0.20])
+GENDERS = (["M", "F"], [0.68, 0.32])
+RACES = (["White", "Black", "Hispanic", "Asian", "Other"], [0.45, 0.2, 0.17, 0.12, 0.06])
+VIOLATIONS = (["Speeding", "Seatbelt", "Signal", "Other", "DUI"], [0.42, 0.18, 0.16, 0.16, 0.08])
+DURATIONS = (["0-15 Min", "16-30 Min", "30+ Min"], [0.7, 0.22, 0.08])
+SEARCH_TYPES = (["Vehicle Search", "Frisk"], [0.6, 0.4])
+
+# Tables the loader creates; dropped between sizes so each load starts empty
+LOADER_TABLES = ["traffic_stops", "traffic_stops_daily", "vehicle_profiles", "vehicle_violations",
+                 "load_state", "data_version", "data_changes", "load_quarantine"]
+
+# ------------------------------
+# SYNTHETIC DATA
+# ------------------------------
+
+def _pick(rng, choices, n):
+    values, weights = choices
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=n, p=weights)]
+
+
+def generate_chunk(rng, n, n_vehicles, repeat_share=0.2, offender_share=0.01):
+    # One chunk of rows in the source CSV's format. Most stops hit a uniformly
+    # random vehicle; repeat_share of them come from a small pool of repeat
+    # offenders (offender_share of all vehicles), skewed towards its first plates.
+    offenders = max(1, int(n_vehicles * offender_share))
+    vehicle = rng.integers(0, n_vehicles, size=n)
+    repeat = rng.random(n) < repeat_share
+    vehicle[repeat] = np.minimum(rng.zipf(1.6, size=int(repeat.sum())) - 1, offenders - 1)
+
+    age = rng.integers(16, 80, size=n)
+    violation = _pick(rng, VIOLATIONS, n)
+    drugs = rng.random(n) < 0.05
+    searched = rng.random(n) < np.where(drugs, 0.7, 0.12)
+    arrest_p = np.where(violation == "DUI", 0.45, 0.04) + np.where(drugs, 0.3, 0.0)
+    arrested = rng.random(n) < arrest_p
+    outcome = np.where(arrested, "Arrest", np.where(rng.random(n) < 0.55, "Citation", "Warning"))
+
+    day = pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 3 * 365, size=n), unit="D")
+    minute = rng.integers(0, 24 * 60, size=n)
+
+    return pd.DataFrame({
+        "stop_date": day.strftime("%Y-%m-%d"),
+        "stop_time": [f"{m // 60:02d}:{m % 60:02d}" for m in minute],
+        "country_name": _pick(rng, COUNTRIES, n),
+        "driver_gender": _pick(rng, GENDERS, n),
+        "driver_age_raw": age,
+        "driver_age": age,
+        "driver_race": _pick(rng, RACES, n),
+        "violation_raw": violation,
+        "violation": violation,
+        "search_conducted": searched,
+        "search_type": np.where(searched, _pick(rng, SEARCH_TYPES, n), None),
+        "stop_outcome": outcome,
+        "is_arrested": arrested,
+        "stop_duration": _pick(rng, DURATIONS, n),
+        "drugs_related_stop": drugs,
+        "vehicle_number": [f"TN{v:07d}" for v in vehicle],
+    })
+
+
+def write_csv(path, n_rows, seed=42, chunk=1_000_000):
+    # Streams chunk rows at a time, so 10M rows never sit in memory at once
+    rng = np.random.default_rng(seed)
+    n_vehicles = max(100, n_rows // 3)
+    started = time.perf_counter()
+    for start in range(0, n_rows, chunk):
+        df = generate_chunk(rng, min(chunk, n_rows - start), n_vehicles)
+        df.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+    return time.perf_counter() - started
+
+# ------------------------------
+# TIMING
+# ------------------------------
+
+def reset_database(backend, sqlite_path):
+    if backend == "sqlite":
+        if os.path.exists(sqlite_path):
+            os.remove(sqlite_path)
+        return
+    connection = dl.connect(backend, sqlite_path)
+    mycursor = connection.cursor()
+    for table in LOADER_TABLES:
+        mycursor.execute(f"DROP TABLE IF EXISTS {table}")
+    connection.commit()
+    mycursor.close()
+    connection.close()
+
+
+def time_load(csv_path, backend, sqlite_path, loader_args):
+    started = time.perf_counter()
+    dl.main(["--source", csv_path, "--backend", backend, "--sqlite-path", sqlite_path, *loader_args])
+    return time.perf_counter() - started
+
+
+def dashboard_sql():
+    # Every SQL the dashboard issues for the default filters, by report name
+    filter_sql, _ = default_filters()
+    jobs = {name: query(name, filter_sql) for name in QUERIES}
+    jobs.update({f"rollup:{name}": rollup_query(name, filter_sql) for name in ROLLUP_QUERIES})
+    jobs["kpis"] = kpi_query(filter_sql)
+    return jobs
+
+
+def time_queries(connection, backend, runs=3):
+    _, params = default_filters()
+    timings = {}
+    mycursor = connection.cursor()
+    for name, sql in dashboard_sql().items():
+        sql = sql.replace("%s", dl.PLACEHOLDER[backend])
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            mycursor.execute(sql, params)
+            mycursor.fetchall()
+            samples.append((time.perf_counter() - started) * 1000)
+        timings[name] = round(statistics.median(samples), 2)
+    mycursor.close()
+    return timings
+
+
+def check_fresh_reads(backend, sqlite_path):
+    # A data_version bump committed on a second connection must be visible through
+    # a pooled dashboard connection that has already read (no stale snapshot)
+    connect = mysql_connect if backend == "mysql" else (lambda: dl.connect(backend, sqlite_path))
+    pool = ConnectionPool(connect=connect, max_size=1)
+    try:
+        read_data_version(pool)
+        writer = dl.connect(backend, sqlite_path)
+        version = dl.bump_data_version(writer, backend)
+        writer.commit()
+        writer.close()
+        return read_data_version(pool) == version
+    finally:
+        pool.close_all()
+
+
+def run_size(label, n_rows, args):
+    csv_path = os.path.join(args.work_dir, f"stops_{label}_seed{args.seed}.csv")
+    generate_s = 0.0
+    if not os.path.exists(csv_path):
+        generate_s = write_csv(csv_path, n_rows, args.seed)
+        print(f"Generated {n_rows} rows in {generate_s:.1f}s -> {csv_path}")
+
+    sqlite_path = os.path.join(args.work_dir, f"bench_{label}.db")
+    reset_database(args.backend, sqlite_path)
+    load_s = time_load(csv_path, args.backend, sqlite_path, args.loader_args)
+
+    connection = dl.connect(args.backend, sqlite_path)
+    queries_ms = time_queries(connection, args.backend, args.runs)
+    connection.close()
+    fresh_reads = check_fresh_reads(args.backend, sqlite_path)
+
+    return {
+        "size": label,
+        "rows": n_rows,
+        "generate_s": round(generate_s, 2),
+        "load_s": round(load_s, 2),
+        "load_rows_per_sec": round(n_rows / max(load_s, 1e-9)),
+        "db_bytes": os.path.getsize(sqlite_path) if args.backend == "sqlite" else None,
+        "queries_ms": queries_ms,
+        "fresh_reads": fresh_reads,
+    }
+
+# ------------------------------
+# REGRESSION CHECK
+# ------------------------------
+
+def find_regressions(report, baseline, tolerance=0.25, min_ms=5.0):
+    # Slower than baseline by more than tolerance (and by at least min_ms, so
+    # sub-millisecond noise on tiny queries does not fail the run)
+    previous = {run["size"]: run for run in baseline["results"]}
+    regressions = []
+    for run in report["results"]:
+        before = previous.get(run["size"])
+        if before is None:
+            continue
+        if run["load_s"] > before["load_s"] * (1 + tolerance) and run["load_s"] - before["load_s"] > min_ms / 1000:
+            regressions.append((run["size"], "load", before["load_s"] * 1000, run["load_s"] * 1000))
+        for name, ms in run["queries_ms"].items():
+            old = before["queries_ms"].get(name)
+            if old is not None and ms > old * (1 + tolerance) and ms - old > min_ms:
+                regressions.append((run["size"], name, old, ms))
+    return regressions
+
+# ------------------------------
+# MAIN
+# ------------------------------
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the loader and dashboard queries on synthetic data")
+    parser.add_argument("--sizes", nargs="+", choices=sorted(SIZES, key=SIZES.get), default=["10k", "1m"])
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], default="sqlite")
+    parser.add_argument("--work-dir", default="bench", help="generated CSVs and SQLite files (CSVs are reused)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--runs", type=int, default=3, help="timed runs per query (median is reported)")
+    parser.add_argument("--report", default="benchmark_report.json")
+    parser.add_argument("--baseline", help="earlier report to compare against; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    args, loader_args = parser.parse_known_args(argv)
+    args.loader_args = loader_args   # anything else is passed through to Data_Load.py, e.g. --method multirow
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.makedirs(args.work_dir, exist_ok=True)
+
+    report = {
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "backend": args.backend,
+        "seed": args.seed,
+        "query_runs": args.runs,
+        "loader_args": args.loader_args,
+        "results": [run_size(label, SIZES[label], args) for label in args.sizes],
+    }
+
+    print(f"{'size':<8}{'load s':>10}{'rows/sec':>12}{'queries ms':>12}")
+    for run in report["results"]:
+        print(f"{run['size']:<8}{run['load_s']:>10.2f}{run['load_rows_per_sec']:>12,}"
+              f"{sum(run['queries_ms'].values()):>12.1f}")
+
+    with open(args.report, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Report written to {args.report}")
+
+    stale = [run["size"] for run in report["results"] if not run["fresh_reads"]]
+    if stale:
+        print(f"STALE READS {' '.join(stale)}: pooled dashboard connections missed a committed data_version bump")
+        sys.exit(1)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            regressions = find_regressions(report, json.load(fh), args.tolerance)
+        for size, name, before, after in regressions:
+            print(f"REGRESSION {size} {name}: {before:.1f} ms -> {after:.1f} ms")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
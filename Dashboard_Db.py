@@ -0,0 +1,731 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pandas as pd
+import pymysql
+
+from Dashboard_Queries import (
+    KPI_QUERY_NAMES, OPTION_COLUMNS, OPTION_QUERIES, PANEL_ROW_FLAGS, QUERIES, ROLLUP_QUERIES, default_dates,
+    default_filters, filter_scope, kpi_query, query, rollup_query, vehicle_profile_queries, vehicle_search_query,
+)
+
+# -----------------------------
+# DATABASE SETTINGS
+# -----------------------------
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",
+    "password": "7654321",
+    "database": "SecureCheck",
+    "port": 3306,
+    # Each query sees the latest committed data. Without it a pooled connection
+    # stays in the REPEATABLE READ snapshot of its first SELECT and never sees a load.
+    "autocommit": True,
+}
+
+
+def mysql_connect():
+    return pymysql.connect(**DB_CONFIG)
+
+# -----------------------------
+# CONNECTION POOL
+# -----------------------------
+# One pool per process (Streamlit.py keeps it in st.cache_resource), so a page
+# render reuses a handful of connections instead of opening one per query.
+
+class ConnectionPool:
+    def __init__(self, connect=mysql_connect, max_size=5, acquire_timeout=10, ping_after=30):
+        self.connect = connect
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.ping_after = ping_after        # seconds idle before a connection is health-checked
+        self._idle = deque()                # (connection, last_used)
+        self._created = 0
+        self._cond = threading.Condition()
+        self.stats = {"created": 0, "reused": 0, "pinged": 0, "discarded": 0, "waits": 0}
+
+    def _healthy(self, conn, last_used):
+        # Called without the lock held: a slow or dead server only stalls this caller
+        if time.monotonic() - last_used < self.ping_after or not hasattr(conn, "ping"):
+            return True
+        try:
+            conn.ping(reconnect=True)   # transparently reopens a connection MySQL has timed out
+        except Exception:
+            return False
+        with self._cond:
+            self.stats["pinged"] += 1
+        return True
+
+    def acquire(self):
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            with self._cond:
+                while not self._idle and self._created >= self.max_size:
+                    self.stats["waits"] += 1
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._cond.wait(remaining):
+                        raise TimeoutError(f"no database connection free after {self.acquire_timeout}s")
+                if not self._idle:
+                    self._created += 1
+                    break
+                conn, last_used = self._idle.pop()
+
+            # Health-check outside the lock; a dead connection frees its slot and we go again
+            healthy = self._healthy(conn, last_used)
+            with self._cond:
+                if healthy:
+                    self.stats["reused"] += 1
+                    return conn
+                self._close(conn)
+                self._cond.notify()
+
+        # Open outside the lock so a slow connect does not block other sessions
+        try:
+            conn = self.connect()
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.stats["created"] += 1
+        return conn
+
+    def release(self, conn, broken=False):
+        if not broken and not getattr(conn, "autocommit_mode", True):
+            # A connection without autocommit ends its read transaction here,
+            # so the next borrower does not inherit a stale snapshot
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+        with self._cond:
+            if broken:
+                self._close(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def _close(self, conn):
+        # Caller holds the lock
+        self._created -= 1
+        self.stats["discarded"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        except (pymysql.err.OperationalError, pymysql.err.InterfaceError):
+            # Lost/broken connection: drop it rather than hand it to the next query
+            self.release(conn, broken=True)
+            raise
+        except Exception:
+            self.release(conn)
+            raise
+        else:
+            self.release(conn)
+
+    def close_all(self):
+        with self._cond:
+            while self._idle:
+                self._close(self._idle.pop()[0])
+
+    def status(self):
+        with self._cond:
+            return {"open": self._created, "idle": len(self._idle), "max_size": self.max_size, **self.stats}
+
+# -----------------------------
+# QUERY INSTRUMENTATION
+# -----------------------------
+# Every query is tagged with the panel that issued it. Each execution (or cache
+# hit) is appended to QUERY_TIMINGS, shared by all sessions of the process, and
+# logged as one JSON line on the "securecheck.queries" logger (silent unless a
+# handler is attached, e.g. Streamlit.py with SECURECHECK_QUERY_LOG set).
+# PANEL_SQL keeps each panel's latest SQL and params for EXPLAIN on demand.
+QUERY_TIMINGS = deque(maxlen=500)   # (timestamp, panel, SQL label, milliseconds, rows, bytes, cache hit)
+PANEL_SQL = {}
+QUERY_LOG = logging.getLogger("securecheck.queries")
+
+
+def _label(sql):
+    return " ".join(sql.split())[:80]
+
+
+def frame_bytes(df):
+    # Computed once per result and carried on the frame, so cache hits report it for free
+    if "nbytes" not in df.attrs:
+        df.attrs["nbytes"] = int(df.memory_usage(deep=True).sum())
+    return df.attrs["nbytes"]
+
+
+def record_query(panel, sql, params, elapsed_ms, df, cached):
+    panel = panel or _label(sql)
+    entry = (time.time(), panel, _label(sql), round(elapsed_ms, 2), len(df), frame_bytes(df), cached)
+    QUERY_TIMINGS.append(entry)
+    PANEL_SQL[panel] = (sql, params)
+    if QUERY_LOG.isEnabledFor(logging.INFO):
+        QUERY_LOG.info(json.dumps({"ts": round(entry[0], 3), "panel": panel, "ms": entry[3], "rows": entry[4],
+                                   "bytes": entry[5], "cached": cached, "sql": entry[2]}))
+
+
+def run_query(pool, sql, params=None, panel=None):
+    started = time.perf_counter()
+    with pool.connection() as conn:
+        df = pd.read_sql(sql, conn, params=params)
+    record_query(panel, sql, params, (time.perf_counter() - started) * 1000, df, False)
+    return df
+
+# -----------------------------
+# SINGLE-FLIGHT QUERIES
+# -----------------------------
+# At shift start many sessions open the same default view at once, and before
+# the first of them has filled the cache every one would run the same ~25
+# queries. Identical queries in flight at the same time, across all sessions
+# of the process, run once: the first caller executes, later callers wait for
+# its result (or its exception) instead of taking another connection.
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}                  # key -> Future of the running call
+        self._lock = threading.Lock()
+        self.stats = {"executed": 0, "coalesced": 0}
+
+    def do(self, key, fn):
+        # Returns (result, True) to the caller that ran fn, (result, False) to those that waited
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = Future()
+                self.stats["executed"] += 1
+                leader = True
+            else:
+                self.stats["coalesced"] += 1
+                leader = False
+        if not leader:
+            return call.result(), False
+        try:
+            result = fn()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result, True
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+# -----------------------------
+# QUERY RESULT CACHE
+# -----------------------------
+# Results keyed on whitespace-normalized SQL + params, expired after a TTL,
+# evicted least-recently-used once the cached frames exceed max_bytes, and
+# dropped when the loader bumps data_version: only those whose scope the new
+# data touches when the loader published its changes (see DATA CHANGES),
+# otherwise all of them. Cached frames are shared between reruns and
+# sessions, so callers must not modify them.
+
+class QueryCache:
+    def __init__(self, ttl=300, max_bytes=64 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()     # key -> (expires_at, df, nbytes, scope)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.data_version = None
+        self.flights = SingleFlight()     # cache misses shared by concurrent sessions
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0, "kept": 0}
+
+    @staticmethod
+    def key(sql, params=None):
+        return " ".join(sql.split()), tuple(params or ())
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                self._drop(key)
+                self.stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1]
+
+    def put(self, key, df, ttl=None, scope=None):
+        nbytes = frame_bytes(df)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + (ttl or self.ttl), df, nbytes, scope)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def _drop(self, key):
+        # Caller holds the lock
+        self._bytes -= self._entries.pop(key)[2]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.stats["invalidations"] += 1
+
+    def invalidate(self, changes):
+        # Drop the entries the changes can touch; returns how many were dropped
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if any(touches(change, entry[3]) for change in changes)]
+            for key in stale:
+                self._drop(key)
+            self.stats["invalidations"] += 1
+            self.stats["kept"] += len(self._entries)
+        return len(stale)
+
+    def check_version(self, version, changes=None):
+        # New batches committed by Data_Load.py invalidate what they can have
+        # changed; everything when what changed is unknown (changes=None)
+        with self._lock:
+            if version == self.data_version:
+                return
+            previous, self.data_version = self.data_version, version
+        if previous is None:
+            return
+        if changes is None:
+            self.clear()
+        else:
+            self.invalidate(changes)
+
+    def status(self):
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+                "data_version": self.data_version,
+                "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else None,
+                **self.stats,
+                **self.flights.stats,
+                "in_flight": self.flights.in_flight(),
+            }
+
+
+def read_data_version(pool):
+    try:
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT MAX(version) FROM data_version")
+            version = cursor.fetchone()[0]
+            cursor.close()
+            return version
+    except Exception:
+        return None     # table not created yet (no loader run since it was introduced)
+
+
+def cached_query(pool, cache, sql, params=None, ttl=None, panel=None, scope=None):
+    # scope: what the result depends on (see touches); None means any new data
+    key = cache.key(sql, params)
+    df = cache.get(key)
+    if df is not None:
+        record_query(panel, sql, params, 0.0, df, True)
+        return df
+
+    version = cache.data_version
+
+    def execute():
+        df = run_query(pool, sql, params, panel)
+        if cache.data_version == version:     # not stored if new data landed while it ran
+            cache.put(key, df, ttl, scope)
+        return df
+
+    started = time.perf_counter()
+    df, executed = cache.flights.do((key, version), execute)
+    if not executed:
+        # Another session ran it; the wait is recorded like a cache hit
+        record_query(panel, sql, params, (time.perf_counter() - started) * 1000, df, True)
+    return df
+
+# -----------------------------
+# DATA CHANGES
+# -----------------------------
+# Data_Load.py --watch publishes, with every micro-batch, what it changed
+# (data_changes: date range, dimension values and flags of the rows written
+# or replaced, and never-seen values). A result's scope says what it depends
+# on: {"dates": (first, last), "columns": {column: [values]}, "flag": name}
+# for panels (Dashboard_Queries.filter_scope, PANEL_ROW_FLAGS), or
+# {"new_values": column} for option lists. Results the changes cannot touch
+# stay valid across data versions.
+
+def touches(change, scope):
+    # Could rows of this change alter a result with this scope?
+    if change is None or scope is None:
+        return True
+    if "new_values" in scope:
+        new = change["new_values"].get(scope["new_values"])
+        return new is None or bool(new)
+    if "dates" in scope:
+        first, last = scope["dates"]
+        if change["min_date"] is None or change["max_date"] < first or change["min_date"] > last:
+            return False
+    for column, selected in scope.get("columns", {}).items():
+        values = change["values"].get(column)
+        if values is not None and not set(values) & set(selected):
+            return False
+    flag = scope.get("flag")
+    return not flag or change["flags"].get(flag, True)
+
+
+def read_changes(pool, since, version):
+    # The changes published for every version after since up to version, or None
+    # if any of them was committed without one (a full load, a rollup rebuild)
+    if since is None or version is None or version <= since:
+        return None
+    try:
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT scope FROM data_changes WHERE version > {int(since)} AND version <= {int(version)}")
+            rows = cursor.fetchall()
+            cursor.close()
+    except Exception:
+        return None     # no data_changes table: nothing published
+    if len(rows) != version - since:
+        return None
+    return [json.loads(row[0]) for row in rows]
+
+
+def sync_data_version(pool, cache):
+    # Once per rerun: catch the cache up with the loader; returns the current version
+    version = read_data_version(pool)
+    if version != cache.data_version:
+        cache.check_version(version, read_changes(pool, cache.data_version, version))
+    return version
+
+# -----------------------------
+# CONCURRENT DISPATCH
+# -----------------------------
+
+def submit_many(pool, cache, jobs, max_workers=4, ttl=None, scopes=None):
+    # jobs: {name: (sql, params)}. The queries are independent reads, so they run
+    # side by side on pooled connections; never more at once than max_workers
+    # (nor than the pool holds). Returns {name: Future} without waiting, so a
+    # caller can use each result as it arrives. Each job is recorded under its
+    # name as the panel; scopes: {name: scope}.
+    scopes = scopes or {}
+    workers = max(1, min(max_workers, pool.max_size, len(jobs)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="securecheck-query")
+    futures = {name: executor.submit(cached_query, pool, cache, sql, params, ttl, name, scopes.get(name))
+               for name, (sql, params) in jobs.items()}
+    executor.shutdown(wait=False)   # the workers exit once the submitted queries are done
+    return futures
+
+
+def run_many(pool, cache, jobs, max_workers=4, ttl=None, scopes=None):
+    # submit_many, waiting for all of them: {name: DataFrame, or the exception raised}
+    futures = submit_many(pool, cache, jobs, max_workers, ttl, scopes)
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            results[name] = e
+    return results
+
+# -----------------------------
+# FILTER OPTIONS
+# -----------------------------
+# Dimension dictionaries change only when the loader commits a value they have
+# not seen, which drops them from the cache via data_version, so they can live
+# far longer than the TTL used for panel results.
+DIMENSION_TTL = 3600
+
+
+def filter_options(pool, cache, max_workers=4):
+    results = run_many(pool, cache, {name: (sql, None) for name, sql in OPTION_QUERIES.items()},
+                       max_workers, ttl=DIMENSION_TTL,
+                       scopes={name: {"new_values": column} for name, column in OPTION_COLUMNS.items()})
+    options = {}
+    for name, result in results.items():
+        if isinstance(result, Exception):
+            raise result
+        options[name] = sorted(result.iloc[:, 0].dropna().tolist())
+    return options
+
+
+def search_vehicles(pool, cache, prefix, limit=50):
+    sql, params = vehicle_search_query(prefix.strip(), limit)
+    return cached_query(pool, cache, sql, params, ttl=DIMENSION_TTL, panel="vehicle_search",
+                        scope={"new_values": "vehicle_number"})["vehicle_number"].tolist()
+
+# -----------------------------
+# VEHICLE LOOKUP
+# -----------------------------
+
+def vehicle_profile(pool, cache, vehicle, history_limit=100, max_workers=3):
+    # {"profile", "violations", "history"} DataFrames for one vehicle; an empty
+    # profile frame means the vehicle has never been stopped
+    jobs = vehicle_profile_queries(vehicle.strip(), history_limit)
+    jobs = {f"vehicle_lookup:{name}": job for name, job in jobs.items()}
+    scope = {"columns": {"vehicle_number": [vehicle.strip()]}}
+    results = run_many(pool, cache, jobs, max_workers, scopes={name: scope for name in jobs})
+    for result in results.values():
+        if isinstance(result, Exception):
+            raise result
+    return {name.split(":", 1)[1]: df for name, df in results.items()}
+
+# -----------------------------
+# STARTUP WARM-UP
+# -----------------------------
+# The default view (2020-01-01 to today, nothing selected, rollup on, the
+# default high-risk threshold) is what every session renders first. keep_warm
+# runs in the background from server start: it computes the option lists and
+# every panel of that view into the shared cache, and repeats every WARM_EVERY
+# seconds so the view stays warm across new data, TTL expiry and the date
+# rolling over. Entries still cached are hits, so a repeat costs only what
+# changed. Sessions arriving mid-run join its in-flight queries.
+WARM_EVERY = 60
+WARM_TTL = 3600
+WARM_UP = {"runs": 0}
+
+
+def default_view_jobs(threshold=4, use_rollup=True):
+    # {name: (sql, params)} and {name: scope} exactly as Streamlit.py issues them for the default view
+    filter_sql, params = default_filters()
+    view_scope = filter_scope(*default_dates())
+    jobs = {name: (rollup_query(name, filter_sql) if use_rollup and name in ROLLUP_QUERIES
+                   else query(name, filter_sql), params)
+            for name in QUERIES if name not in KPI_QUERY_NAMES}
+    jobs["kpis"] = (kpi_query(filter_sql, threshold), params)
+    scopes = {name: dict(view_scope, flag=PANEL_ROW_FLAGS.get(name)) for name in jobs}
+    return jobs, scopes
+
+
+def warm_up(pool, cache, max_workers=2, ttl=WARM_TTL):
+    # Leaves the rest of the pool to the sessions rendering meanwhile
+    started = time.perf_counter()
+    sync_data_version(pool, cache)
+    filter_options(pool, cache, max_workers)
+    jobs, scopes = default_view_jobs()
+    results = run_many(pool, cache, jobs, max_workers, ttl, scopes)
+    WARM_UP.update(
+        runs=WARM_UP["runs"] + 1,
+        last=time.strftime("%H:%M:%S"),
+        ms=round((time.perf_counter() - started) * 1000, 2),
+        queries=len(jobs) + len(OPTION_QUERIES),
+        error=None,
+        failed=sorted(name for name, result in results.items() if isinstance(result, Exception)),
+    )
+    return results
+
+
+def keep_warm(pool, cache, every=WARM_EVERY, stop=None):
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        try:
+            warm_up(pool, cache)
+        except Exception as e:
+            WARM_UP["error"] = f"{type(e).__name__}: {e}"   # e.g. database not up yet; retried next round
+        stop.wait(every)
+
+# -----------------------------
+# RECORD EXPORT
+# -----------------------------
+# Raw records behind the current filters, streamed from the database in chunks
+# straight into a compressed file, so the full result is never held as one
+# DataFrame. MySQL gets an unbuffered (server-side) cursor; sqlite3 and the
+# DuckDB snapshot cursor already fetch lazily. Finished files are kept in
+# EXPORT_DIR, named after the query, params and data_version, so repeated
+# downloads of an unchanged view reuse the file.
+EXPORT_FORMATS = {"csv.gz": "application/gzip", "parquet": "application/vnd.apache.parquet"}
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "securecheck_exports")
+EXPORT_MAX_AGE = 3600
+
+
+def _streaming_cursor(conn):
+    if isinstance(conn, pymysql.connections.Connection):
+        return conn.cursor(pymysql.cursors.SSCursor)
+    return conn.cursor()
+
+
+def _csv_text(df):
+    # TIME arrives as a timedelta from MySQL; write it as HH:MM:SS like the source CSV
+    for name in df.columns:
+        if df[name].dtype.kind == "m":
+            df[name] = (pd.Timestamp(0) + df[name]).dt.strftime("%H:%M:%S")
+    return df
+
+
+def export_records(pool, sql, params, path, fmt="csv.gz", chunk=50_000):
+    started = time.perf_counter()
+    partial = f"{path}.{os.getpid()}.{threading.get_ident()}.part"   # concurrent sessions may export the same view
+    rows = 0
+    writer = None
+    with pool.connection() as conn:
+        cursor = _streaming_cursor(conn)
+        try:
+            cursor.execute(sql, params)
+            columns = [d[0] for d in cursor.description]
+            if fmt == "csv.gz":
+                writer = gzip.open(partial, "wt", compresslevel=6, newline="", encoding="utf-8")
+                writer.write(",".join(columns) + "\n")
+            while True:
+                batch = cursor.fetchmany(chunk)
+                if not batch:
+                    break
+                df = pd.DataFrame.from_records(batch, columns=columns)
+                if fmt == "csv.gz":
+                    _csv_text(df).to_csv(writer, header=False, index=False)
+                else:
+                    import pyarrow.parquet as pq
+                    from Snapshot_Store import to_arrow
+
+                    table = to_arrow(df, columns, with_year=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(partial, table.schema, compression="zstd")
+                    writer.write_table(table)
+                rows += len(batch)
+        finally:
+            cursor.close()
+            if writer is not None:
+                writer.close()
+
+    if writer is None:
+        # Parquet with no matching rows: still hand back a valid, empty file
+        import pyarrow.parquet as pq
+        from Snapshot_Store import to_arrow
+
+        pq.write_table(to_arrow(pd.DataFrame(columns=columns), columns, with_year=False), partial)
+    os.replace(partial, path)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    QUERY_TIMINGS.append((time.time(), "export", _label(sql), round(elapsed_ms, 2), rows, os.path.getsize(path), False))
+    PANEL_SQL["export"] = (sql, params)
+    return {"rows": rows, "bytes": os.path.getsize(path), "ms": round(elapsed_ms, 2)}
+
+
+def prune_exports(export_dir=EXPORT_DIR, max_age=EXPORT_MAX_AGE):
+    now = time.time()
+    for name in os.listdir(export_dir):
+        full = os.path.join(export_dir, name)
+        if now - os.path.getmtime(full) > max_age:
+            try:
+                os.remove(full)
+            except OSError:
+                pass   # another session is replacing or serving it
+
+
+def export_file(pool, sql, params, fmt, data_version, export_dir=EXPORT_DIR):
+    # Path of the finished export for this view, written on first request
+    os.makedirs(export_dir, exist_ok=True)
+    prune_exports(export_dir)
+    key = hashlib.sha256(json.dumps([" ".join(sql.split()), list(params or ()), data_version],
+                                    default=str).encode("utf-8")).hexdigest()[:16]
+    path = os.path.join(export_dir, f"traffic_stops_{key}.{fmt}")
+    if not os.path.exists(path):
+        export_records(pool, sql, params, path, fmt)
+    return path
+
+# -----------------------------
+# PERFORMANCE REPORTING
+# -----------------------------
+
+def timings_frame(timings=None, since=None):
+    rows = [t for t in (QUERY_TIMINGS if timings is None else timings) if since is None or t[0] >= since]
+    return pd.DataFrame(rows, columns=["ts", "panel", "query", "ms", "rows", "bytes", "cached"])
+
+
+def panel_summary(timings=None):
+    # One row per panel, slowest (p95 of executed queries) first
+    df = timings_frame(timings)
+    if df.empty:
+        return pd.DataFrame(columns=["panel", "calls", "cache_hit_rate", "p50_ms", "p95_ms", "max_ms",
+                                     "total_ms", "rows", "bytes"])
+    executed = df[~df["cached"]].groupby("panel")["ms"]
+    grouped = df.groupby("panel")
+    out = pd.DataFrame({
+        "calls": grouped.size(),
+        "cache_hit_rate": grouped["cached"].mean().round(3),
+        "p50_ms": executed.median().round(2),
+        "p95_ms": executed.quantile(0.95).round(2),
+        "max_ms": executed.max().round(2),
+        "total_ms": executed.sum().round(2),
+        "rows": grouped["rows"].last(),
+        "bytes": grouped["bytes"].last(),
+    })
+    return out.sort_values(["p95_ms", "total_ms"], ascending=False, na_position="last").reset_index()
+
+
+def explain(pool, panel):
+    # Query plan of the panel's most recent SQL (MySQL and the DuckDB snapshot both take EXPLAIN)
+    sql, params = PANEL_SQL[panel]
+    with pool.connection() as conn:
+        return pd.read_sql("EXPLAIN " + sql, conn, params=params)
+
+
+def _prom_labels(**labels):
+    escaped = {k: str(v).replace("\\", "\\\\").replace('"', '\\"') for k, v in labels.items()}
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped.items()) + "}"
+
+
+def prometheus_text(cache=None, pool=None, timings=None):
+    # Prometheus text exposition of the recorded queries (a rolling window of
+    # QUERY_TIMINGS, so the counters are per window, not process lifetime)
+    df = timings_frame(timings)
+    lines = [
+        "# HELP securecheck_query_duration_seconds Dashboard query wall time by panel (cache misses).",
+        "# TYPE securecheck_query_duration_seconds summary",
+    ]
+    executed = df[~df["cached"]]
+    for panel, group in executed.groupby("panel"):
+        for q in (0.5, 0.95):
+            lines.append(f"securecheck_query_duration_seconds{_prom_labels(panel=panel, quantile=q)} "
+                         f"{group['ms'].quantile(q) / 1000:.6f}")
+        lines.append(f"securecheck_query_duration_seconds_sum{_prom_labels(panel=panel)} {group['ms'].sum() / 1000:.6f}")
+        lines.append(f"securecheck_query_duration_seconds_count{_prom_labels(panel=panel)} {len(group)}")
+
+    lines += ["# HELP securecheck_queries_total Dashboard queries by panel and cache outcome.",
+              "# TYPE securecheck_queries_total counter"]
+    for (panel, cached), group in df.groupby(["panel", "cached"]):
+        lines.append(f"securecheck_queries_total{_prom_labels(panel=panel, cached=str(bool(cached)).lower())} {len(group)}")
+
+    lines += ["# HELP securecheck_query_result_bytes Size of the latest result by panel.",
+              "# TYPE securecheck_query_result_bytes gauge"]
+    for panel, group in df.groupby("panel"):
+        lines.append(f"securecheck_query_result_bytes{_prom_labels(panel=panel)} {int(group['bytes'].iloc[-1])}")
+
+    if cache is not None:
+        status = cache.status()
+        lines += ["# TYPE securecheck_cache_hits_total counter", f"securecheck_cache_hits_total {status['hits']}",
+                  "# TYPE securecheck_cache_misses_total counter", f"securecheck_cache_misses_total {status['misses']}",
+                  "# TYPE securecheck_queries_coalesced_total counter",
+                  f"securecheck_queries_coalesced_total {status['coalesced']}",
+                  "# TYPE securecheck_cache_bytes gauge", f"securecheck_cache_bytes {status['bytes']}"]
+    if pool is not None:
+        status = pool.status()
+        lines += ["# TYPE securecheck_pool_open_connections gauge", f"securecheck_pool_open_connections {status['open']}",
+                  "# TYPE securecheck_pool_waits_total counter", f"securecheck_pool_waits_total {status['waits']}"]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,658 @@
+import re
+from datetime import datetime, date
+
+# -----------------------------
+# DASHBOARD SQL
+# -----------------------------
+# Every panel query of Streamlit.py, by name, so the dashboard, the schema
+# migration report and benchmarks all run exactly the same SQL.
+# {filter_sql} is the sidebar WHERE clause built by build_filters().
+# Rates are written as SUM(x) * 100.0 / COUNT(*) so they are not integer
+# division on the SQLite stand-in; MySQL gives the same numbers either way.
+
+AGE_GROUPS = ["Under 18", "18-25", "26-35", "36-45", "46-60", "60+"]
+DAY_PERIODS = ["Night (8 PM–11 PM)", "Night (12 AM–5 AM)", "Daytime (6 AM–7 PM)"]
+
+AGE_GROUP_SQL = """CASE
+               WHEN driver_age < 18 THEN 'Under 18'
+               WHEN driver_age BETWEEN 18 AND 25 THEN '18-25'
+               WHEN driver_age BETWEEN 26 AND 35 THEN '26-35'
+               WHEN driver_age BETWEEN 36 AND 45 THEN '36-45'
+               WHEN driver_age BETWEEN 46 AND 60 THEN '46-60'
+               ELSE '60+'
+           END"""
+
+DAY_PERIOD_SQL = """CASE
+            WHEN HOUR(stop_time) BETWEEN 20 AND 23 THEN 'Night (8 PM–11 PM)'
+            WHEN HOUR(stop_time) BETWEEN 0 AND 5 THEN 'Night (12 AM–5 AM)'
+            ELSE 'Daytime (6 AM–7 PM)'
+        END"""
+
+# Columns Data_Load.py derives once per row at load time, so panels group on
+# stored, indexed values instead of evaluating these expressions on every row
+# of every query. The expressions define the columns: they backfill tables
+# loaded before the columns existed, and expression_form() turns a panel query
+# back into its per-row form for before/after timings.
+DERIVED_EXPRESSIONS = {
+    "stop_hour": "HOUR(stop_time)",
+    "stop_year": "YEAR(stop_date)",
+    "stop_month": "MONTH(stop_date)",
+    "age_group": AGE_GROUP_SQL,
+    "day_period": DAY_PERIOD_SQL,
+}
+
+
+def expression_form(sql):
+    pattern = r"\b(" + "|".join(DERIVED_EXPRESSIONS) + r")\b"
+    return re.sub(pattern, lambda m: DERIVED_EXPRESSIONS[m.group(1)], sql)
+
+# Low-cardinality dimension dictionaries for the sidebar; each is the leading
+# column of a dashboard index, so DISTINCT is an index scan
+OPTION_QUERIES = {
+    "violation_options": "SELECT DISTINCT violation FROM traffic_stops",
+    "gender_options": "SELECT DISTINCT driver_gender FROM traffic_stops",
+    "race_options": "SELECT DISTINCT driver_race FROM traffic_stops",
+    "country_options": "SELECT DISTINCT country_name FROM traffic_stops",
+}
+
+# Column each option list reads; it only changes when a load brings a new value
+OPTION_COLUMNS = {
+    "violation_options": "violation",
+    "gender_options": "driver_gender",
+    "race_options": "driver_race",
+    "country_options": "country_name",
+}
+
+# Vehicle numbers are far too many to ship to the browser: the sidebar searches
+# them by prefix instead, a range scan on the uq_stop (vehicle_number, ...) index
+VEHICLE_SEARCH_SQL = """
+SELECT DISTINCT vehicle_number
+FROM traffic_stops
+WHERE vehicle_number LIKE %s ESCAPE '!'
+ORDER BY vehicle_number
+LIMIT {limit}
+"""
+
+
+def vehicle_search_query(prefix, limit=50):
+    pattern = prefix.replace("!", "!!").replace("%", "!%").replace("_", "!_") + "%"
+    return VEHICLE_SEARCH_SQL.format(limit=int(limit)), [pattern]
+
+# Checkpoint lookup of one vehicle: primary-key reads of the profile tables
+# maintained by Data_Load.py, plus its latest stops via the uq_stop index
+VEHICLE_PROFILE_QUERIES = {
+    "profile": """
+    SELECT vehicle_number, stops, searches, arrests, drug_stops, first_seen, last_seen
+    FROM vehicle_profiles
+    WHERE vehicle_number = %s
+    """,
+    "violations": """
+    SELECT violation, stops
+    FROM vehicle_violations
+    WHERE vehicle_number = %s
+    ORDER BY stops DESC
+    """,
+    "history": """
+    SELECT stop_date, stop_time, country_name, violation, search_conducted, search_type,
+           stop_outcome, is_arrested, stop_duration, drugs_related_stop
+    FROM traffic_stops
+    WHERE vehicle_number = %s
+    ORDER BY stop_date DESC, stop_time DESC
+    LIMIT {limit}
+    """,
+}
+
+
+def vehicle_profile_queries(vehicle, history_limit=100):
+    return {name: (sql.format(limit=int(history_limit)), [vehicle])
+            for name, sql in VEHICLE_PROFILE_QUERIES.items()}
+
+
+# Single-number KPI queries; the dashboard's cards come from the fused KPI_SQL instead
+KPI_QUERY_NAMES = ["total_logs", "total_violations", "high_risk_vehicles"]
+
+QUERIES = {
+    # KPI cards
+    "total_logs": "SELECT COUNT(*) AS c FROM traffic_stops {filter_sql}",
+
+    "total_violations": "SELECT COUNT(*) AS c FROM traffic_stops {filter_sql} AND violation IS NOT NULL AND violation != ''",
+
+    "high_risk_vehicles": """
+    SELECT COUNT(*) AS c
+    FROM (
+        SELECT vehicle_number
+        FROM traffic_stops
+        {filter_sql}
+        GROUP BY vehicle_number
+        HAVING COUNT(*) >= 4
+    ) AS t
+    """,
+
+    # Vehicle analytics
+    "drug_vehicles": """
+    SELECT vehicle_number, COUNT(*) AS drug_stop_count
+    FROM traffic_stops
+    {filter_sql} AND drugs_related_stop = 1
+    GROUP BY vehicle_number
+    ORDER BY drug_stop_count DESC
+    LIMIT 10
+    """,
+
+    "searched_vehicles": """
+    SELECT vehicle_number, COUNT(*) AS search_count
+    FROM traffic_stops
+    {filter_sql} AND search_conducted = 1
+    GROUP BY vehicle_number
+    ORDER BY search_count DESC
+    LIMIT 10
+    """,
+
+    # Time & duration
+    "stops_by_hour": """
+    SELECT stop_hour AS hour_of_day, COUNT(*) AS stop_count
+    FROM traffic_stops
+    {filter_sql}
+    GROUP BY hour_of_day
+    ORDER BY stop_count DESC
+    """,
+
+    "duration_by_violation": """
+    SELECT violation, ROUND(AVG(stop_duration),2) AS avg_duration
+    FROM traffic_stops
+    {filter_sql}
+    GROUP BY violation
+    ORDER BY avg_duration DESC
+    """,
+
+    "night_arrest_rate": """
+    SELECT
+        day_period AS time_period,
+        COUNT(*) AS total_stops,
+        SUM(is_arrested) AS total_arrests,
+        ROUND(SUM(is_arrested) * 100.0 / COUNT(*), 2) AS arrest_rate_percent
+    FROM traffic_stops
+    {filter_sql}
+    GROUP BY time_period
+    ORDER BY arrest_rate_percent DESC
+    """,
+
+    # Demographics
+    "arrests_by_age_group": """
+    SELECT
+        age_group AS driver_age_group,
+        COUNT(*) AS arrests
+    FROM traffic_stops
+    {filter_sql} AND is_arrested = 1
+    GROUP BY driver_age_group
+    ORDER BY arrests DESC
+    LIMIT 10
+    """,
+
+    "gender_by_country": """
+    SELECT country_name AS country, driver_gender, COUNT(*) AS stop_count
+    FROM traffic_stops
+    {filter_sql}
+    GROUP BY country, driver_gender
+    ORDER BY stop_count DESC
+    """,
+
+    "race_gender_search_rate": """
+    SELECT
+        driver_race,
+        driver_gender,
+        COUNT(*) AS total_stops,
+        SUM(search_conducted) AS total_searches,
+        ROUND(SUM(search_conducted) * 100.0 / COUNT(*), 2) AS search_rate_percent
+    FROM traffic_stops
+    {filter_sql}
+    GROUP BY driver_race, driver_gender
+    ORDER BY search_rate_percent DESC
+    """,
+
+    # Violations
+    "violation_search_arrest": """
+    SELECT violation,
+           SUM(search_conducted) AS total_searches,
+           SUM(is_arrested) AS total_arrests
+    FROM traffic_stops
+    {filter_sql}
+    GROUP BY violation
+    ORDER BY total_searches DESC, total_arrests DESC
+    LIMIT 10
+    """,
+
+    "young_driver_violations": """
+    SELECT
+        violation,
+        COUNT(*) AS violation_count
+    FROM traffic_stops
+    {filter_sql} AND driver_age < 25
+    GROUP BY violation
+    ORDER BY violation_count DESC
+    LIMIT 10
+    """,
+
+    # Location
+    "drug_stops_by_country": """
+    SELECT country_name AS country, COUNT(*) AS drug_stop_count
+    FROM traffic_stops
+    {filter_sql} AND drugs_related_stop = 1
+    GROUP BY country
+    ORDER BY drug_stop_count DESC
+    LIMIT 10
+    """,
+
+    "country_violation_arrest_rate": """
+    SELECT
+        country_name AS country,
+        violation,
+        COUNT(*) AS total_stops,
+        SUM(is_arrested) AS total_arrests,
+        ROUND(SUM(is_arrested) * 100.0 / COUNT(*), 2) AS arrest_rate_percent
+    FROM traffic_stops
+    {filter_sql}
+    GROUP BY country, violation
+    ORDER BY arrest_rate_percent DESC
+    """,
+
+    "country_searches": """
+    SELECT
+        country_name AS country,
+        COUNT(*) AS total_search_stops
+    FROM traffic_stops
+    {filter_sql} AND search_conducted = 1
+    GROUP BY country
+    ORDER BY total_search_stops DESC
+    """,
+
+    # Advanced analytics
+    "yearly_by_country": """
+    SELECT country_name AS country,
+           stop_year AS year,
+           COUNT(*) AS total_stops,
+           SUM(is_arrested) AS total_arrests
+    FROM traffic_stops
+    {filter_sql}
+    GROUP BY country, year
+    ORDER BY country, year
+    """,
+
+    "violation_trends_age_race": """
+    SELECT driver_race,
+           age_group AS driver_age_group,
+           violation,
+           COUNT(*) AS violation_count
+    FROM traffic_stops
+    {filter_sql}
+    GROUP BY driver_race, driver_age_group, violation
+    ORDER BY violation_count DESC
+    """,
+
+    "time_period_analysis": """
+    SELECT stop_year AS year,
+           stop_month AS month,
+           stop_hour AS hour,
+           COUNT(*) AS stop_count
+    FROM traffic_stops
+    {filter_sql}
+    GROUP BY year, month, hour
+    ORDER BY year, month, hour
+    """,
+
+    "violation_high_rates": """
+    SELECT violation,
+           total_stops,
+           total_searches,
+           total_arrests,
+           ROUND(total_searches * 100.0 / total_stops, 2) AS search_rate,
+           ROUND(total_arrests * 100.0 / total_stops, 2) AS arrest_rate
+    FROM (
+        SELECT violation,
+               COUNT(*) AS total_stops,
+               SUM(search_conducted) AS total_searches,
+               SUM(is_arrested) AS total_arrests
+        FROM traffic_stops
+        {filter_sql}
+        GROUP BY violation
+    ) AS t
+    ORDER BY search_rate DESC, arrest_rate DESC
+    LIMIT 10
+    """,
+
+    "demographics_by_country": """
+    SELECT country_name AS country,
+           driver_gender,
+           driver_race,
+           age_group AS driver_age_group,
+           COUNT(*) AS count
+    FROM traffic_stops
+    {filter_sql}
+    GROUP BY country, driver_gender, driver_race, driver_age_group
+    ORDER BY count DESC
+    """,
+
+    "top_violations_arrest_rate": """
+    SELECT violation,
+           COUNT(*) AS total_stops,
+           SUM(is_arrested) AS total_arrests,
+           ROUND(SUM(is_arrested) * 100.0 / COUNT(*), 2) AS arrest_rate_percent
+    FROM traffic_stops
+    {filter_sql}
+    GROUP BY violation
+    ORDER BY arrest_rate_percent DESC
+    LIMIT 5
+    """,
+}
+
+
+# -----------------------------
+# ROLLUP SQL
+# -----------------------------
+# The same panels answered from the daily rollup cube (traffic_stops_daily,
+# maintained by Data_Load.py). Only valid without a vehicle filter; the
+# per-vehicle panels (high-risk, drug and searched vehicles) have no rollup form.
+# HAVING > 0 mirrors the row filters (is_arrested = 1 etc.) of the raw queries.
+
+ROLLUP_QUERIES = {
+    "total_logs": "SELECT COALESCE(SUM(stops), 0) AS c FROM traffic_stops_daily {filter_sql}",
+
+    "total_violations": "SELECT COALESCE(SUM(stops), 0) AS c FROM traffic_stops_daily {filter_sql} AND violation IS NOT NULL AND violation != ''",
+
+    "stops_by_hour": """
+    SELECT hour AS hour_of_day, SUM(stops) AS stop_count
+    FROM traffic_stops_daily
+    {filter_sql}
+    GROUP BY hour_of_day
+    ORDER BY stop_count DESC
+    """,
+
+    "duration_by_violation": """
+    SELECT violation, ROUND(SUM(duration_sum) * 1.0 / NULLIF(SUM(duration_count), 0), 2) AS avg_duration
+    FROM traffic_stops_daily
+    {filter_sql}
+    GROUP BY violation
+    ORDER BY avg_duration DESC
+    """,
+
+    "night_arrest_rate": """
+    SELECT
+        CASE
+            WHEN hour BETWEEN 20 AND 23 THEN 'Night (8 PM–11 PM)'
+            WHEN hour BETWEEN 0 AND 5 THEN 'Night (12 AM–5 AM)'
+            ELSE 'Daytime (6 AM–7 PM)'
+        END AS time_period,
+        SUM(stops) AS total_stops,
+        SUM(arrests) AS total_arrests,
+        ROUND(SUM(arrests) * 100.0 / SUM(stops), 2) AS arrest_rate_percent
+    FROM traffic_stops_daily
+    {filter_sql}
+    GROUP BY time_period
+    ORDER BY arrest_rate_percent DESC
+    """,
+
+    "arrests_by_age_group": """
+    SELECT driver_age_group, SUM(arrests) AS arrests
+    FROM traffic_stops_daily
+    {filter_sql}
+    GROUP BY driver_age_group
+    HAVING SUM(arrests) > 0
+    ORDER BY arrests DESC
+    LIMIT 10
+    """,
+
+    "gender_by_country": """
+    SELECT country_name AS country, driver_gender, SUM(stops) AS stop_count
+    FROM traffic_stops_daily
+    {filter_sql}
+    GROUP BY country, driver_gender
+    ORDER BY stop_count DESC
+    """,
+
+    "race_gender_search_rate": """
+    SELECT
+        driver_race,
+        driver_gender,
+        SUM(stops) AS total_stops,
+        SUM(searches) AS total_searches,
+        ROUND(SUM(searches) * 100.0 / SUM(stops), 2) AS search_rate_percent
+    FROM traffic_stops_daily
+    {filter_sql}
+    GROUP BY driver_race, driver_gender
+    ORDER BY search_rate_percent DESC
+    """,
+
+    "violation_search_arrest": """
+    SELECT violation,
+           SUM(searches) AS total_searches,
+           SUM(arrests) AS total_arrests
+    FROM traffic_stops_daily
+    {filter_sql}
+    GROUP BY violation
+    ORDER BY total_searches DESC, total_arrests DESC
+    LIMIT 10
+    """,
+
+    "young_driver_violations": """
+    SELECT violation, SUM(young_stops) AS violation_count
+    FROM traffic_stops_daily
+    {filter_sql}
+    GROUP BY violation
+    HAVING SUM(young_stops) > 0
+    ORDER BY violation_count DESC
+    LIMIT 10
+    """,
+
+    "drug_stops_by_country": """
+    SELECT country_name AS country, SUM(drug_stops) AS drug_stop_count
+    FROM traffic_stops_daily
+    {filter_sql}
+    GROUP BY country
+    HAVING SUM(drug_stops) > 0
+    ORDER BY drug_stop_count DESC
+    LIMIT 10
+    """,
+
+    "country_violation_arrest_rate": """
+    SELECT
+        country_name AS country,
+        violation,
+        SUM(stops) AS total_stops,
+        SUM(arrests) AS total_arrests,
+        ROUND(SUM(arrests) * 100.0 / SUM(stops), 2) AS arrest_rate_percent
+    FROM traffic_stops_daily
+    {filter_sql}
+    GROUP BY country, violation
+    ORDER BY arrest_rate_percent DESC
+    """,
+
+    "country_searches": """
+    SELECT country_name AS country, SUM(searches) AS total_search_stops
+    FROM traffic_stops_daily
+    {filter_sql}
+    GROUP BY country
+    HAVING SUM(searches) > 0
+    ORDER BY total_search_stops DESC
+    """,
+
+    "yearly_by_country": """
+    SELECT country_name AS country,
+           YEAR(stop_date) AS year,
+           SUM(stops) AS total_stops,
+           SUM(arrests) AS total_arrests
+    FROM traffic_stops_daily
+    {filter_sql}
+    GROUP BY country, year
+    ORDER BY country, year
+    """,
+
+    "violation_trends_age_race": """
+    SELECT driver_race, driver_age_group, violation, SUM(stops) AS violation_count
+    FROM traffic_stops_daily
+    {filter_sql}
+    GROUP BY driver_race, driver_age_group, violation
+    ORDER BY violation_count DESC
+    """,
+
+    "time_period_analysis": """
+    SELECT YEAR(stop_date) AS year,
+           MONTH(stop_date) AS month,
+           hour,
+           SUM(stops) AS stop_count
+    FROM traffic_stops_daily
+    {filter_sql}
+    GROUP BY year, month, hour
+    ORDER BY year, month, hour
+    """,
+
+    "violation_high_rates": """
+    SELECT violation,
+           total_stops,
+           total_searches,
+           total_arrests,
+           ROUND(total_searches * 100.0 / total_stops, 2) AS search_rate,
+           ROUND(total_arrests * 100.0 / total_stops, 2) AS arrest_rate
+    FROM (
+        SELECT violation,
+               SUM(stops) AS total_stops,
+               SUM(searches) AS total_searches,
+               SUM(arrests) AS total_arrests
+        FROM traffic_stops_daily
+        {filter_sql}
+        GROUP BY violation
+    ) AS t
+    ORDER BY search_rate DESC, arrest_rate DESC
+    LIMIT 10
+    """,
+
+    "demographics_by_country": """
+    SELECT country_name AS country, driver_gender, driver_race, driver_age_group, SUM(stops) AS count
+    FROM traffic_stops_daily
+    {filter_sql}
+    GROUP BY country, driver_gender, driver_race, driver_age_group
+    ORDER BY count DESC
+    """,
+
+    "top_violations_arrest_rate": """
+    SELECT violation,
+           SUM(stops) AS total_stops,
+           SUM(arrests) AS total_arrests,
+           ROUND(SUM(arrests) * 100.0 / SUM(stops), 2) AS arrest_rate_percent
+    FROM traffic_stops_daily
+    {filter_sql}
+    GROUP BY violation
+    ORDER BY arrest_rate_percent DESC
+    LIMIT 5
+    """,
+}
+
+
+# -----------------------------
+# FUSED KPI SQL
+# -----------------------------
+# The three Key Metrics cards from a single scan: one GROUP BY vehicle_number
+# yields per-vehicle stop and violation counts, which sum to the totals and
+# count the high-risk vehicles at any threshold.
+KPI_SQL = """
+SELECT COALESCE(SUM(stops), 0) AS total_logs,
+       COALESCE(SUM(violations), 0) AS total_violations,
+       COALESCE(SUM(CASE WHEN stops >= {threshold} THEN 1 ELSE 0 END), 0) AS high_risk_vehicles
+FROM (
+    SELECT vehicle_number,
+           COUNT(*) AS stops,
+           SUM(CASE WHEN violation IS NOT NULL AND violation != '' THEN 1 ELSE 0 END) AS violations
+    FROM traffic_stops
+    {filter_sql}
+    GROUP BY vehicle_number
+) AS v
+"""
+
+
+# Panels that count only some of the filtered rows (the extra WHERE of QUERIES,
+# HAVING > 0 of ROLLUP_QUERIES), by the data_changes flag those rows set. New
+# data without such rows leaves the panel as it was.
+PANEL_ROW_FLAGS = {
+    "drug_vehicles": "drugs_related_stop",
+    "searched_vehicles": "search_conducted",
+    "arrests_by_age_group": "is_arrested",
+    "young_driver_violations": "young_driver",
+    "drug_stops_by_country": "drugs_related_stop",
+    "country_searches": "search_conducted",
+}
+
+
+def kpi_query(filter_sql, threshold=4):
+    return KPI_SQL.format(filter_sql=filter_sql, threshold=int(threshold))
+
+
+def query(name, filter_sql):
+    return QUERIES[name].format(filter_sql=filter_sql)
+
+
+def rollup_query(name, filter_sql):
+    return ROLLUP_QUERIES[name].format(filter_sql=filter_sql)
+
+# -----------------------------
+# RECORD EXPORT SQL
+# -----------------------------
+# Raw rows behind the current filters, for the dashboard's export download.
+# No ORDER BY: rows are streamed in storage order instead of sorting the
+# whole filtered set first.
+EXPORT_COLUMNS = [
+    "stop_date", "stop_time", "country_name", "driver_gender", "driver_age_raw", "driver_age",
+    "driver_race", "violation_raw", "violation", "search_conducted", "search_type", "stop_outcome",
+    "is_arrested", "stop_duration", "drugs_related_stop", "vehicle_number",
+]
+
+EXPORT_SQL = "SELECT {columns} FROM traffic_stops {filter_sql}"
+
+
+def export_query(filter_sql):
+    return EXPORT_SQL.format(columns=", ".join(EXPORT_COLUMNS), filter_sql=filter_sql)
+
+# -----------------------------
+# BUILD FILTER SQL
+# -----------------------------
+
+def _filter_columns(vehicles, violations, genders, races, countries):
+    return [
+        ("vehicle_number", vehicles),
+        ("violation", violations),
+        ("driver_gender", genders),
+        ("driver_race", races),
+        ("country_name", countries),
+    ]
+
+
+def build_filters(start_date, end_date, vehicles=(), violations=(), genders=(), races=(), countries=()):
+    # stop_date is a DATE, so ISO date strings compare correctly on every backend
+    filters = ["stop_date BETWEEN %s AND %s"]
+    params = [start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")]
+
+    for column, selected in _filter_columns(vehicles, violations, genders, races, countries):
+        if selected:
+            filters.append("%s IN (%s)" % (column, ",".join(["%s"] * len(selected))))
+            params.extend(selected)
+
+    return "WHERE " + " AND ".join(filters), params
+
+
+def filter_scope(start_date, end_date, vehicles=(), violations=(), genders=(), races=(), countries=()):
+    # The same filters as data, to match against what a load changed (Dashboard_Db.touches)
+    return {
+        "dates": (start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")),
+        "columns": {column: sorted(selected)
+                    for column, selected in _filter_columns(vehicles, violations, genders, races, countries)
+                    if selected},
+    }
+
+
+def default_dates():
+    # Dashboard defaults: 2020-01-01 to today
+    start_date = datetime.combine(date(2020, 1, 1), datetime.min.time())
+    end_date = datetime.combine(date.today(), datetime.max.time())
+    return start_date, end_date
+
+
+def default_filters():
+    # Dashboard defaults: 2020-01-01 to today, nothing selected
+    return build_filters(*default_dates())
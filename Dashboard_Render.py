@@ -0,0 +1,138 @@
+import importlib
+import math
+import time
+from collections import deque
+
+import pandas as pd
+
+# -----------------------------
+# BOUNDED PANEL PAYLOADS
+# -----------------------------
+# Panel results can grow with the data (country x violation, race x age x
+# violation, the demographics sunburst, year x month x hour), and everything
+# handed to st.dataframe / st.plotly_chart is shipped to the browser. These
+# helpers keep each panel's payload bounded: tables are paged on the server,
+# chart categories beyond the top N fold into "All others", and long series are
+# bucketed. What each panel actually sent is measured against PAYLOAD_BUDGET.
+
+TABLE_PAGE_SIZE = 25
+MAX_CATEGORIES = 10                 # bars / colours / sunburst children per level
+MAX_FACETS = 6                      # facet_col panels
+MAX_SERIES_POINTS = 500             # points across all lines of a line chart
+PAYLOAD_BUDGET = 256 * 1024         # bytes per panel (table page + chart)
+OTHER = "All others"                # not "Other", which is a real violation / race value
+
+PAYLOAD_SAMPLE_SECONDS = 60         # how long a panel's measured chart size is reused
+
+PAYLOADS = deque(maxlen=500)        # (timestamp, panel, table bytes, chart bytes, rows, rows sent)
+FIGURE_SIZES = {}                   # panel -> (measured at, rows, chart bytes)
+
+
+def page_count(n_rows, page_size=TABLE_PAGE_SIZE):
+    return max(1, math.ceil(n_rows / page_size))
+
+
+def paginate(df, page, page_size=TABLE_PAGE_SIZE):
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size]
+
+
+def cap_categories(df, column, max_categories=MAX_CATEGORIES, measures=(), rates=None, other=OTHER):
+    # Keep the max_categories values of column with the largest first measure and
+    # fold the rest into one OTHER row per combination of the remaining
+    # dimensions. Measures are summed; rates are recomputed as
+    # 100 * numerator / denominator (summing percentages would be meaningless).
+    rates = rates or {}
+    if df[column].nunique(dropna=False) <= max_categories:
+        return df
+    measures = list(measures)
+    keep = df.groupby(column, dropna=False, observed=True)[measures[0]].sum().nlargest(max_categories - 1).index
+    capped = df.copy()
+    if isinstance(capped[column].dtype, pd.CategoricalDtype):
+        capped[column] = capped[column].astype(object)
+    capped.loc[~capped[column].isin(keep), column] = other
+
+    dimensions = [col for col in df.columns if col not in measures and col not in rates]
+    out = capped.groupby(dimensions, dropna=False, sort=False, observed=True)[measures].sum().reset_index()
+    for rate, (numerator, denominator) in rates.items():
+        out[rate] = (out[numerator] * 100.0 / out[denominator]).round(2)
+    return out
+
+
+def downsample_series(df, x, y, series, max_points=MAX_SERIES_POINTS):
+    # Line charts: first drop series dimensions from the right (summing over
+    # them) while there are more lines than the budget allows, then average y
+    # over equal-width x buckets so no line has more points than its share.
+    series = list(series)
+    out = df
+    while len(out) > max_points and len(series) > 1:
+        series.pop()
+        out = out.groupby(series + [x], dropna=False, sort=True)[y].sum().reset_index()
+    if len(out) <= max_points:
+        return out
+
+    n_series = max(1, out.groupby(series, dropna=False).ngroups)
+    points_per_series = max(2, max_points // n_series)
+    span = out[x].max() - out[x].min()
+    width = max(1, math.ceil((span + 1) / points_per_series))
+    bucketed = out.assign(**{x: out[x] - (out[x] - out[x].min()) % width})
+    return bucketed.groupby(series + [x], dropna=False, sort=True)[y].mean().round(2).reset_index()
+
+# -----------------------------
+# DEFERRED IMPORTS
+# -----------------------------
+
+class LazyModule:
+    # Stands in for a module until its first attribute is used, so a heavy
+    # charting import (plotly.express) is paid by the first chart instead of
+    # delaying everything drawn before it
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+# -----------------------------
+# PAYLOAD MEASUREMENT
+# -----------------------------
+
+def table_bytes(df):
+    # st.dataframe ships the frame as Arrow IPC
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+
+def figure_bytes(fig, panel=None, rows=None, every=PAYLOAD_SAMPLE_SECONDS):
+    # fig.to_json() serializes the whole chart a second time, so a panel is
+    # re-measured only when its row count changes or its last sample is stale
+    if panel is None:
+        return len(fig.to_json())
+    now = time.monotonic()
+    last = FIGURE_SIZES.get(panel)
+    if last is not None and last[1] == rows and now - last[0] < every:
+        return last[2]
+    nbytes = len(fig.to_json())
+    FIGURE_SIZES[panel] = (now, rows, nbytes)
+    return nbytes
+
+
+def record_payload(panel, table_nbytes, chart_nbytes, rows, rows_sent):
+    PAYLOADS.append((time.time(), panel, table_nbytes, chart_nbytes, rows, rows_sent))
+    return table_nbytes + chart_nbytes
+
+
+def payload_summary(budget=PAYLOAD_BUDGET):
+    # Latest payload of every panel, largest first
+    df = pd.DataFrame(list(PAYLOADS), columns=["ts", "panel", "table_bytes", "chart_bytes", "rows", "rows_sent"])
+    df = df.drop_duplicates("panel", keep="last").drop(columns="ts")
+    df["total_bytes"] = df["table_bytes"] + df["chart_bytes"]
+    df["over_budget"] = df["total_bytes"] > budget
+    return df.sort_values("total_bytes", ascending=False).reset_index(drop=True)
@@ -1,113 +1,1835 @@
-import pandas as pd
-import mysql.connector
-
-# ------------------------------
-# STEP 1: LOAD & CLEAN CSV FILE
-# ------------------------------
-
-df = pd.read_csv(
-    "https://raw.githubusercontent.com/Mounesh1921/SecureCheck-A-Python-SQL-Digital-Ledger-for-Police-Post-Logs/refs/heads/main/traffic_stops_with_vehicle_number.csv"
-)
-
-print(df)
-print(df.isnull().sum())  # Check missing values
-
-# Remove columns with all NULL values
-df.dropna(axis=1, how='all', inplace=True)
-
-# Fill missing search_type with mode
-mode_search_type = df['search_type'].mode()[0]
-df['search_type'].fillna(mode_search_type, inplace=True)
-
-print(df)
-
-# ------------------------------
-# STEP 2: MYSQL CONNECTION (FIXED)
-# ------------------------------
-
-try:
-    connection = mysql.connector.connect(
-        host="localhost",
-        port=3306,
-        user="root",
-        password="7654321",
-        database="SecureCheck",
-        auth_plugin='mysql_native_password'   # FIX for caching_sha2_password
-    )
-
-    if connection.is_connected():
-        print("Connected to MySQL successfully!")
-
-except mysql.connector.Error as e:
-    print("MySQL Connection Error:", e)
-    raise SystemExit
-
-# Use real cursor AFTER successful connection
-mycursor = connection.cursor()
-
-# ------------------------------
-# STEP 3: CREATE TABLE
-# ------------------------------
-
-mycursor.execute("""
-CREATE TABLE IF NOT EXISTS traffic_stops (
-    stop_date DATE,
-    stop_time TIME,
-    country_name TEXT,
-    driver_gender VARCHAR(20),
-    driver_age_raw INT,
-    driver_age INT,
-    driver_race VARCHAR(30),
-    violation_raw TEXT,
-    violation TEXT,
-    search_conducted VARCHAR(10),
-    search_type TEXT,
-    stop_outcome TEXT,
-    is_arrested VARCHAR(10),
-    stop_duration TEXT,
-    drugs_related_stop VARCHAR(10),
-    vehicle_number VARCHAR(50)
-)
-""")
-connection.commit()
-print("Table Created successfully!")
-
-# ------------------------------
-# STEP 4: INSERT DATA SAFELY
-# ------------------------------
-
-sql = """
-INSERT INTO traffic_stops (
-    stop_date, stop_time, country_name, driver_gender, driver_age_raw, driver_age,
-    driver_race, violation_raw, violation, search_conducted, search_type, stop_outcome,
-    is_arrested, stop_duration, drugs_related_stop, vehicle_number
-) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
-"""
-
-for _, row in df.iterrows():
-
-    values = (
-        str(row['stop_date']) if not pd.isna(row['stop_date']) else None,
-        str(row['stop_time']) if not pd.isna(row['stop_time']) else None,
-        row['country_name'],
-        row['driver_gender'],
-        int(row['driver_age_raw']) if not pd.isna(row['driver_age_raw']) else None,
-        int(row['driver_age']) if not pd.isna(row['driver_age']) else None,
-        row['driver_race'],
-        row['violation_raw'],
-        row['violation'],
-        row['search_conducted'],
-        row['search_type'],
-        row['stop_outcome'],
-        row['is_arrested'],
-        row['stop_duration'],
-        row['drugs_related_stop'],
-        row['vehicle_number']
-    )
-
-    mycursor.execute(sql, values)
-
-connection.commit()
-print("Data inserted successfully!")
-
-connection.close()
+import argparse
+import csv
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime
+
+import pandas as pd
+import mysql.connector
+
+from Dashboard_Queries import AGE_GROUPS, DAY_PERIODS, DERIVED_EXPRESSIONS
+
+SOURCE_URL = "https://raw.githubusercontent.com/Mounesh1921/SecureCheck-A-Python-SQL-Digital-Ledger-for-Police-Post-Logs/refs/heads/main/traffic_stops_with_vehicle_number.csv"
+
+MYSQL_CONFIG = {
+    "host": "localhost",
+    "port": 3306,
+    "user": "root",
+    "password": "7654321",
+    "database": "SecureCheck",
+    "auth_plugin": "mysql_native_password",   # FIX for caching_sha2_password
+}
+
+COLUMNS = [
+    "stop_date", "stop_time", "country_name", "driver_gender", "driver_age_raw", "driver_age",
+    "driver_race", "violation_raw", "violation", "search_conducted", "search_type", "stop_outcome",
+    "is_arrested", "stop_duration", "drugs_related_stop", "vehicle_number",
+]
+
+INT_COLUMNS = ["driver_age_raw", "driver_age"]
+FLAG_COLUMNS = ["search_conducted", "is_arrested", "drugs_related_stop"]
+# stop_duration arrives as text buckets; stored as minutes (bucket midpoint, 45 for the open-ended one)
+DURATION_MINUTES = {"0-15 Min": 8, "16-30 Min": 23, "30+ Min": 45}
+FLAG_VALUES = {True: 1, False: 0, "True": 1, "False": 0, "true": 1, "false": 0, 1: 1, 0: 0, "1": 1, "0": 0}
+
+# Dedup key: a vehicle cannot be stopped twice at the same moment. Rows with a NULL
+# in any key column are not deduplicated (NULLs never collide in a UNIQUE index).
+KEY_COLUMNS = ["vehicle_number", "stop_date", "stop_time"]
+
+# Computed once per row in convert() (see DERIVED_EXPRESSIONS in Dashboard_Queries.py)
+DERIVED_COLUMNS = list(DERIVED_EXPRESSIONS)
+INSERT_COLUMNS = COLUMNS + DERIVED_COLUMNS + ["row_hash"]
+
+PLACEHOLDER = {"mysql": "%s", "sqlite": "?"}
+
+# ------------------------------
+# STEP 0: RESOLVE SOURCE (LOCAL FILE / CACHED DOWNLOAD)
+# ------------------------------
+# URLs are downloaded once into a content-addressed cache (<sha256><suffix>)
+# and revalidated with If-None-Match / If-Modified-Since, so an unchanged
+# remote file costs one 304 round trip, and the cached copy is used offline.
+# Every source gets a SHA-256 (memoized by size + mtime for local files);
+# main() skips a source whose hash matches its last completed load.
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "securecheck")
+CACHE_INDEX = "index.json"
+COMPRESSION_MAGIC = {b"\x1f\x8b": "gzip", b"\x28\xb5\x2f\xfd": "zstd"}
+
+
+def is_url(source):
+    return "://" in source
+
+
+def detect_compression(source):
+    # By magic bytes, so a gzip/zstd file loads whatever its name; otherwise pandas infers from the suffix
+    if not is_url(source):
+        with open(source, "rb") as fh:
+            head = fh.read(4)
+        for magic, kind in COMPRESSION_MAGIC.items():
+            if head.startswith(magic):
+                return kind
+    return "infer"
+
+
+def load_cache_index(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, CACHE_INDEX)) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {"urls": {}, "files": {}}
+
+
+def save_cache_index(cache_dir, index):
+    path = os.path.join(cache_dir, CACHE_INDEX)
+    with open(path + ".tmp", "w") as fh:
+        json.dump(index, fh, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def file_digest(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _stat_key(path):
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def cached_digest(path, index):
+    # Digest from an earlier run, if the file's size and mtime have not changed since
+    memo = index["files"].get(os.path.abspath(path))
+    return memo["sha256"] if memo and memo["stat"] == _stat_key(path) else None
+
+
+def remember_digest(path, digest, index):
+    index["files"][os.path.abspath(path)] = {"stat": _stat_key(path), "sha256": digest}
+
+
+def download(url, cache_dir, index, timeout=60):
+    entry = index["urls"].get(url)
+    cached = entry is not None and os.path.exists(os.path.join(cache_dir, entry["file"]))
+    request = urllib.request.Request(url)
+    if cached:
+        if entry.get("etag"):
+            request.add_header("If-None-Match", entry["etag"])
+        if entry.get("last_modified"):
+            request.add_header("If-Modified-Since", entry["last_modified"])
+
+    try:
+        response = urllib.request.urlopen(request, timeout=timeout)
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and cached:
+            print(f"{url} not modified; using cached copy")
+            return os.path.join(cache_dir, entry["file"]), entry["sha256"]
+        raise
+    except urllib.error.URLError as e:
+        if cached:
+            print(f"Cannot reach {url} ({e.reason}); using cached copy from {entry['fetched_at']}")
+            return os.path.join(cache_dir, entry["file"]), entry["sha256"]
+        raise SystemExit(f"Cannot download {url}: {e.reason}")
+
+    started = time.perf_counter()
+    digest = hashlib.sha256()
+    tmp_path = None
+    try:
+        size = 0
+        with response, tempfile.NamedTemporaryFile(dir=cache_dir, delete=False) as tmp:
+            tmp_path = tmp.name
+            for block in iter(lambda: response.read(1 << 20), b""):
+                digest.update(block)
+                tmp.write(block)
+                size += len(block)
+        expected = response.headers.get("Content-Length")
+        if expected is not None and int(expected) != size:
+            # The server hung up early; urllib returns the short body without an error
+            raise urllib.error.ContentTooShortError(f"{url}: got {size} of {expected} bytes", None)
+        name = os.path.basename(urllib.parse.urlparse(url).path)
+        filename = digest.hexdigest() + name[name.find("."):] if "." in name else digest.hexdigest()
+        os.replace(tmp_path, os.path.join(cache_dir, filename))
+        tmp_path = None
+    finally:
+        # A download that failed partway leaves no stray temp file in the cache
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    if cached and entry["file"] != filename and not any(
+            other["file"] == entry["file"] for key, other in index["urls"].items() if key != url):
+        os.remove(os.path.join(cache_dir, entry["file"]))
+
+    index["urls"][url] = {
+        "file": filename,
+        "sha256": digest.hexdigest(),
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "fetched_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    print(f"Downloaded {url} in {time.perf_counter() - started:.2f}s")
+    return os.path.join(cache_dir, filename), digest.hexdigest()
+
+
+def resolve_source(source, cache_dir=CACHE_DIR):
+    # -> (local path to read, SHA-256 of its content)
+    os.makedirs(cache_dir, exist_ok=True)
+    index = load_cache_index(cache_dir)
+    if is_url(source):
+        path, digest = download(source, cache_dir, index)
+    else:
+        path, digest = source, cached_digest(source, index)
+        if digest is None:
+            digest = file_digest(source)
+            remember_digest(source, digest, index)
+    save_cache_index(cache_dir, index)
+    return path, digest
+
+# ------------------------------
+# STEP 1: STREAM & CLEAN CSV FILE
+# ------------------------------
+
+def read_chunks(source, chunksize=100_000):
+    # Stream the CSV so peak memory is bounded by chunksize, not by file size
+    # (the chunks keep a running index, i.e. each row's offset in the source file)
+    yield from pd.read_csv(source, chunksize=chunksize, dtype={"search_type": "object"},
+                           compression=detect_compression(source))
+
+
+def skip_rows(chunks, offset):
+    # Resume support: drop source rows already committed by an earlier, interrupted run
+    for chunk in chunks:
+        if offset and chunk.index[-1] < offset:
+            continue
+        yield chunk[chunk.index >= offset] if offset else chunk
+
+
+def profile_source(source, chunksize=100_000, verbose=True):
+    # Pass 1: gather the whole-file facts cleaning depends on (all-null columns,
+    # search_type mode) without holding the file in memory
+    rows = 0
+    null_counts = None
+    search_type_counts = pd.Series(dtype="int64")
+
+    for chunk in read_chunks(source, chunksize):
+        rows += len(chunk)
+        counts = chunk.isnull().sum()
+        null_counts = counts if null_counts is None else null_counts.add(counts, fill_value=0)
+        if "search_type" in chunk.columns:
+            search_type_counts = search_type_counts.add(chunk["search_type"].value_counts(), fill_value=0)
+
+    null_counts = null_counts.astype("int64") if null_counts is not None else pd.Series(dtype="int64")
+    if verbose:
+        print(f"Profiled {rows} rows")
+        print(null_counts)  # Check missing values
+
+    # Same tie-break as Series.mode()[0]: the smallest of the most frequent values
+    mode_search_type = None
+    if not search_type_counts.empty:
+        top = search_type_counts[search_type_counts == search_type_counts.max()]
+        mode_search_type = sorted(top.index)[0]
+
+    return {
+        "rows": rows,
+        "all_null_columns": [col for col, n in null_counts.items() if n == rows],
+        "mode_search_type": mode_search_type,
+    }
+
+
+# ------------------------------
+# CLEANING STAGES
+# ------------------------------
+# Each stage takes a chunk and the file profile and returns (chunk, rejected):
+# the cleaned chunk and a Series of reasons indexed by the rows it rejects.
+# Rejected rows leave the chunk and are handed to on_reject for the
+# load_quarantine table instead of being loaded as coerced NULLs. Stages run in
+# CLEAN_STAGES order; add to the dict to plug in another check, or skip one
+# with --skip-stage.
+
+GENDER_VALUES = {"M": "M", "MALE": "M", "F": "F", "FEMALE": "F"}
+GENDER_OTHER = "Other"      # stored for any other non-blank gender; the stop itself is valid
+BOOLEAN_VALUES = {"true": 1, "false": 0, "t": 1, "f": 0, "yes": 1, "no": 0, "y": 1, "n": 0,
+                  "1": 1, "0": 0, "1.0": 1, "0.0": 0}
+DURATION_BUCKETS = {bucket.lower(): minutes for bucket, minutes in DURATION_MINUTES.items()}
+AGE_RANGE = (0, 120)
+MAX_DURATION_MINUTES = 24 * 60
+
+
+def _no_rejects(df):
+    return pd.Series(dtype="object", index=df.index[:0])
+
+
+def _reasons(df, problems):
+    # problems: [(mask, text)] -> one "; "-joined reason per rejected row
+    reason = pd.Series("", index=df.index, dtype="object")
+    for mask, text in problems:
+        reason = reason.where(~mask, reason + text + "; ")
+    return reason[reason != ""].str[:-2]
+
+
+def _lookup(values, table, upper=False):
+    # Normalize text for a lookup-table match; blank counts as missing
+    key = values.astype("string").str.strip()
+    key = key.str.upper() if upper else key.str.lower()
+    key = key.mask(key == "")
+    return key, key.map(table)
+
+
+def drop_null_columns(df, profile):
+    # Columns that are NULL across the whole file, not just this chunk
+    return df.drop(columns=profile["all_null_columns"], errors="ignore"), _no_rejects(df)
+
+
+def normalize_values(df, profile):
+    # Gender, boolean flags and duration buckets through lookup tables. Genders
+    # outside the table are stored as GENDER_OTHER (blank as NULL); unknown flags
+    # and buckets are rejected rather than loaded as NULL
+    df = df.copy()
+    problems = []
+    if "driver_gender" in df.columns:
+        key, value = _lookup(df["driver_gender"], GENDER_VALUES, upper=True)
+        df["driver_gender"] = value.where(key.isna() | value.notna(), GENDER_OTHER)
+    for col in FLAG_COLUMNS:
+        if col not in df.columns or df[col].dtype == bool:
+            continue
+        key, value = _lookup(df[col], BOOLEAN_VALUES)
+        problems.append((key.notna() & value.isna(), f"{col}: not a boolean"))
+        df[col] = value
+    if "stop_duration" in df.columns:
+        key, value = _lookup(df["stop_duration"], DURATION_BUCKETS)
+        value = value.fillna(pd.to_numeric(key, errors="coerce"))
+        problems.append((key.notna() & value.isna(), "stop_duration: unknown bucket"))
+        df["stop_duration"] = value
+    return df, _reasons(df, problems)
+
+
+def parse_datetimes(df, profile):
+    df = df.copy()
+    problems = []
+    for col in DATETIME_FORMATS:
+        if col in df.columns:
+            df[col], unparseable = normalize_datetime(df[col], col)
+            problems.append((unparseable, f"{col}: unparseable"))
+    return df, _reasons(df, problems)
+
+
+def check_ranges(df, profile):
+    problems = []
+    for col in INT_COLUMNS:
+        if col in df.columns:
+            age = pd.to_numeric(df[col], errors="coerce")
+            problems.append((df[col].notna() & age.isna(), f"{col}: not a number"))
+            problems.append((age.notna() & ~age.between(*AGE_RANGE), f"{col}: outside {AGE_RANGE[0]}-{AGE_RANGE[1]}"))
+    if "stop_date" in df.columns:
+        problems.append((df["stop_date"] > datetime.now().strftime("%Y-%m-%d"), "stop_date: in the future"))
+    if "stop_duration" in df.columns:
+        minutes = pd.to_numeric(df["stop_duration"], errors="coerce")
+        problems.append((~minutes.between(0, MAX_DURATION_MINUTES) & minutes.notna(),
+                         f"stop_duration: outside 0-{MAX_DURATION_MINUTES} minutes"))
+    return df, _reasons(df, problems)
+
+
+def fill_search_type(df, profile):
+    # Missing search_type takes the file's mode
+    if "search_type" in df.columns and profile["mode_search_type"] is not None:
+        df = df.assign(search_type=df["search_type"].fillna(profile["mode_search_type"]))
+    return df, _no_rejects(df)
+
+
+CLEAN_STAGES = {
+    "drop_null_columns": drop_null_columns,
+    "normalize_values": normalize_values,
+    "parse_datetimes": parse_datetimes,
+    "check_ranges": check_ranges,
+    "fill_search_type": fill_search_type,
+}
+LATE_STAGE = "after_watermark"     # load_quarantine stage of rows appended behind the watermark
+
+
+def new_clean_stats(stages):
+    return {name: {"rows_in": 0, "rows_out": 0, "quarantined": 0, "seconds": 0.0} for name in stages}
+
+
+def merge_clean_stats(total, stats):
+    for name, counts in stats.items():
+        into = total.setdefault(name, {"rows_in": 0, "rows_out": 0, "quarantined": 0, "seconds": 0.0})
+        for key, value in counts.items():
+            into[key] += value
+    return total
+
+
+def quarantine_frame(original, rejected, stage):
+    # Rejected rows as load_quarantine rows, with the values as they were read
+    raw = original.loc[rejected.index].astype(object)
+    raw = raw.where(raw.notna(), None)
+    return pd.DataFrame({
+        "source_row": rejected.index.astype("int64"),
+        "stage": stage,
+        "reason": rejected.str[:255].values,
+        "raw_row": [json.dumps(row, default=str) for row in raw.to_dict("records")],
+    })
+
+
+def clean_chunks(chunks, profile, stages=None, stats=None, on_reject=None):
+    stages = CLEAN_STAGES if stages is None else stages
+    stats = new_clean_stats(stages) if stats is None else stats
+    for chunk in chunks:
+        original = chunk
+        for name, stage in stages.items():
+            started = time.perf_counter()
+            rows_in = len(chunk)
+            chunk, rejected = stage(chunk, profile)
+            if len(rejected):
+                chunk = chunk.drop(index=rejected.index)
+                if on_reject is not None:
+                    on_reject(quarantine_frame(original, rejected, name))
+            counts = stats[name]
+            counts["rows_in"] += rows_in
+            counts["rows_out"] += len(chunk)
+            counts["quarantined"] += len(rejected)
+            counts["seconds"] += time.perf_counter() - started
+        if len(chunk):
+            yield chunk
+
+
+def print_clean_report(stats):
+    print(f"{'stage':<20}{'rows in':>10}{'rows out':>10}{'quarantined':>13}{'seconds':>10}{'rows/sec':>12}")
+    for name, counts in stats.items():
+        rate = counts["rows_in"] / max(counts["seconds"], 1e-9)
+        print(f"{name:<20}{counts['rows_in']:>10}{counts['rows_out']:>10}{counts['quarantined']:>13}"
+              f"{counts['seconds']:>10.3f}{rate:>12,.0f}")
+
+# ------------------------------
+# STEP 2: DATABASE CONNECTION
+# ------------------------------
+
+def connect(backend="mysql", sqlite_path="securecheck.db", allow_local_infile=False):
+    if backend == "sqlite":
+        # SQLite stand-in so loader throughput can be benchmarked without a MySQL server
+        connection = sqlite3.connect(sqlite_path)
+        # MySQL date functions used by the dashboard SQL (dates/times are stored as ISO text)
+        connection.create_function("HOUR", 1, lambda v: None if v is None else int(str(v)[:2]), deterministic=True)
+        connection.create_function("YEAR", 1, lambda v: None if v is None else int(str(v)[:4]), deterministic=True)
+        connection.create_function("MONTH", 1, lambda v: None if v is None else int(str(v)[5:7]), deterministic=True)
+        print(f"Connected to SQLite ({sqlite_path}) successfully!")
+        return connection
+
+    try:
+        connection = mysql.connector.connect(allow_local_infile=allow_local_infile, **MYSQL_CONFIG)
+
+        if connection.is_connected():
+            print("Connected to MySQL successfully!")
+
+    except mysql.connector.Error as e:
+        print("MySQL Connection Error:", e)
+        raise SystemExit
+
+    return connection
+
+# ------------------------------
+# STEP 3: CREATE TABLES
+# ------------------------------
+
+# Compact typed schema: (column, MySQL type, SQLite type). Flags are TINYINT,
+# stop_duration is minutes, and low-cardinality text is an ENUM on MySQL.
+SCHEMA = [
+    ("stop_date", "DATE", "TEXT"),
+    ("stop_time", "TIME", "TEXT"),
+    ("country_name", "ENUM", "TEXT"),
+    ("driver_gender", "ENUM", "TEXT"),
+    ("driver_age_raw", "SMALLINT", "INTEGER"),
+    ("driver_age", "SMALLINT", "INTEGER"),
+    ("driver_race", "ENUM", "TEXT"),
+    ("violation_raw", "VARCHAR(100)", "TEXT"),
+    ("violation", "ENUM", "TEXT"),
+    ("search_conducted", "TINYINT(1)", "INTEGER"),
+    ("search_type", "ENUM", "TEXT"),
+    ("stop_outcome", "ENUM", "TEXT"),
+    ("is_arrested", "TINYINT(1)", "INTEGER"),
+    ("stop_duration", "SMALLINT", "INTEGER"),
+    ("drugs_related_stop", "TINYINT(1)", "INTEGER"),
+    ("vehicle_number", "VARCHAR(50)", "TEXT"),
+    ("stop_hour", "TINYINT", "INTEGER"),
+    ("stop_year", "SMALLINT", "INTEGER"),
+    ("stop_month", "TINYINT", "INTEGER"),
+    ("age_group", "ENUM", "TEXT"),
+    ("day_period", "ENUM", "TEXT"),
+    ("row_hash", "CHAR(16)", "TEXT"),
+]
+
+# Starting ENUM members; values not listed here are appended by widen_enums() as they arrive
+ENUM_MEMBERS = {
+    "country_name": ["Canada", "India", "USA"],
+    "driver_gender": ["F", "M", GENDER_OTHER],
+    "driver_race": ["Asian", "Black", "Hispanic", "Other", "White"],
+    "violation": ["DUI", "Other", "Seatbelt", "Signal", "Speeding"],
+    "search_type": ["Frisk", "Vehicle Search"],
+    "stop_outcome": ["Arrest", "Citation", "Warning"],
+    "age_group": AGE_GROUPS,
+    "day_period": DAY_PERIODS,
+}
+
+# Composite indexes matching the dashboard's predicates: every query filters on
+# stop_date, optionally narrowed by violation / country / race / gender, and the
+# flag columns ride along so SUM(is_arrested) etc. are answered from the index
+DASHBOARD_INDEXES = {
+    "idx_date_flags": ["stop_date", "is_arrested", "search_conducted", "drugs_related_stop"],
+    "idx_violation_date": ["violation", "stop_date"],
+    "idx_country_date": ["country_name", "stop_date"],
+    "idx_race_date": ["driver_race", "stop_date"],
+    "idx_gender_date": ["driver_gender", "stop_date"],
+    # Derived columns: the time panels (hour, night/day, year x month x hour) and
+    # the age group panels are answered from these without touching the rows
+    "idx_date_time_parts": ["stop_date", "stop_year", "stop_month", "stop_hour", "day_period", "is_arrested"],
+    "idx_date_age_group": ["stop_date", "age_group", "is_arrested"],
+}
+
+
+def _enum_sql(members):
+    return "ENUM(" + ", ".join("'" + m.replace("'", "''") + "'" for m in members) + ")"
+
+
+def sql_type(backend, name, mysql_type, sqlite_type, enum_members=None):
+    if backend == "sqlite":
+        return sqlite_type
+    if mysql_type == "ENUM":
+        return _enum_sql((enum_members or ENUM_MEMBERS)[name])
+    return mysql_type
+
+
+def create_table_sql(backend, enum_members=None, table="traffic_stops"):
+    columns = [f"    {name} {sql_type(backend, name, mysql_type, sqlite_type, enum_members)}"
+               for name, mysql_type, sqlite_type in SCHEMA]
+    return f"CREATE TABLE IF NOT EXISTS {table} (\n" + ",\n".join(columns) + "\n)"
+
+# One row per source file: the watermark of what has been loaded and the
+# checkpoint (source rows consumed through the last committed batch)
+CREATE_LOAD_STATE_SQL = """
+CREATE TABLE IF NOT EXISTS load_state (
+    source VARCHAR(255) PRIMARY KEY,
+    rows_committed BIGINT,
+    rows_loaded BIGINT,
+    max_stop_date DATE,
+    max_stop_time TIME,
+    completed INT,
+    updated_at DATETIME,
+    content_hash CHAR(64)
+)
+"""
+
+# Single-row counter bumped with every committed batch; dashboards compare it
+# to drop cached query results as soon as new data lands
+CREATE_DATA_VERSION_SQL = """
+CREATE TABLE IF NOT EXISTS data_version (
+    id INT PRIMARY KEY,
+    version BIGINT,
+    updated_at DATETIME
+)
+"""
+
+# What each data version changed, published by --watch micro-batches (see
+# change_scope): the date range, the dimension values and flags of the rows
+# written or replaced, and values the table had not seen before. Dashboards
+# refresh only the panels a change can touch; a version without a row here
+# (a full load, a rebuild) means "anything may have changed".
+CREATE_DATA_CHANGES_SQL = """
+CREATE TABLE IF NOT EXISTS data_changes (
+    version BIGINT PRIMARY KEY,
+    changed_at DATETIME,
+    rows_changed INT,
+    scope TEXT
+)
+"""
+
+
+# Source rows the cleaning stages rejected, with the reason and the row as read.
+# Keyed by source row, so re-running a load does not duplicate them.
+CREATE_QUARANTINE_SQL = """
+CREATE TABLE IF NOT EXISTS load_quarantine (
+    source VARCHAR(255),
+    source_row BIGINT,
+    stage VARCHAR(50),
+    reason VARCHAR(255),
+    raw_row TEXT,
+    quarantined_at DATETIME,
+    PRIMARY KEY (source, source_row)
+)
+"""
+
+
+def table_columns(connection, table):
+    mycursor = connection.cursor()
+    mycursor.execute(f"SELECT * FROM {table} LIMIT 0")
+    columns = [d[0] for d in mycursor.description]
+    mycursor.fetchall()
+    mycursor.close()
+    return columns
+
+
+def has_index(connection, backend, table, index):
+    mycursor = connection.cursor()
+    if backend == "sqlite":
+        mycursor.execute(f"PRAGMA index_list({table})")
+        found = any(row[1] == index for row in mycursor.fetchall())
+    else:
+        mycursor.execute(f"SHOW INDEX FROM {table} WHERE Key_name = %s", (index,))
+        found = bool(mycursor.fetchall())
+    mycursor.close()
+    return found
+
+
+def ensure_dedup_key(connection, backend):
+    # Tables created before incremental loads existed lack the hash column and the unique key
+    mycursor = connection.cursor()
+    if "row_hash" not in table_columns(connection, "traffic_stops"):
+        mycursor.execute("ALTER TABLE traffic_stops ADD COLUMN row_hash CHAR(16)")
+
+    if not has_index(connection, backend, "traffic_stops", "uq_stop"):
+        # Fails if the table already holds duplicates; dedupe it once by hand first
+        mycursor.execute(f"CREATE UNIQUE INDEX uq_stop ON traffic_stops ({', '.join(KEY_COLUMNS)})")
+    connection.commit()
+    mycursor.close()
+
+
+def backfill_derived_columns(connection, columns=None):
+    # Fill derived columns from their SQL definitions, for rows loaded before they existed
+    columns = columns or DERIVED_COLUMNS
+    started = time.perf_counter()
+    mycursor = connection.cursor()
+    mycursor.execute("UPDATE traffic_stops SET "
+                     + ", ".join(f"{name} = {DERIVED_EXPRESSIONS[name]}" for name in columns))
+    print(f"Backfilled {', '.join(columns)} on {mycursor.rowcount} rows in {time.perf_counter() - started:.2f}s")
+    mycursor.close()
+    connection.commit()
+
+
+def ensure_derived_columns(connection, backend):
+    # Tables created before the derived columns existed: add and backfill them
+    present = table_columns(connection, "traffic_stops")
+    missing = [name for name in DERIVED_COLUMNS if name not in present]
+    if not missing:
+        return
+    mycursor = connection.cursor()
+    for name, mysql_type, sqlite_type in SCHEMA:
+        if name in missing:
+            mycursor.execute(f"ALTER TABLE traffic_stops ADD COLUMN {name} "
+                             f"{sql_type(backend, name, mysql_type, sqlite_type)}")
+    connection.commit()
+    mycursor.close()
+    backfill_derived_columns(connection, missing)
+
+
+def ensure_indexes(connection, backend):
+    mycursor = connection.cursor()
+    for name, columns in DASHBOARD_INDEXES.items():
+        if not has_index(connection, backend, "traffic_stops", name):
+            mycursor.execute(f"CREATE INDEX {name} ON traffic_stops ({', '.join(columns)})")
+    connection.commit()
+    mycursor.close()
+
+
+def create_table(connection, backend="mysql", enum_members=None):
+    mycursor = connection.cursor()
+    mycursor.execute(create_table_sql(backend, enum_members))
+    mycursor.execute(CREATE_LOAD_STATE_SQL)
+    if "content_hash" not in table_columns(connection, "load_state"):
+        # load_state created before sources were hashed
+        mycursor.execute("ALTER TABLE load_state ADD COLUMN content_hash CHAR(64)")
+    mycursor.execute(CREATE_DATA_VERSION_SQL)
+    mycursor.execute(CREATE_DATA_CHANGES_SQL)
+    mycursor.execute(CREATE_QUARANTINE_SQL)
+    connection.commit()
+    mycursor.close()
+    ensure_dedup_key(connection, backend)
+    ensure_derived_columns(connection, backend)
+    ensure_indexes(connection, backend)
+    create_rollup_table(connection, backend)
+    create_profile_tables(connection, backend)
+    print("Table Created successfully!")
+
+
+def read_enum_members(connection, backend):
+    # Current ENUM definitions of traffic_stops; empty for SQLite and for pre-migration tables
+    if backend != "mysql":
+        return {}
+    mycursor = connection.cursor()
+    mycursor.execute(
+        "SELECT COLUMN_NAME, COLUMN_TYPE FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'traffic_stops' AND DATA_TYPE = 'enum'")
+    members = {
+        name: [m.replace("''", "'") for m in re.findall(r"'((?:[^']|'')*)'", col_type)]
+        for name, col_type in mycursor.fetchall()
+    }
+    mycursor.close()
+    return members
+
+
+def widen_enums(frames, connection, backend):
+    # Append unseen values to ENUM columns before the batch that carries them is inserted.
+    # Appending members at the end is a metadata-only ALTER in MySQL 8.
+    members = read_enum_members(connection, backend)
+    for df in frames:
+        for col, current in members.items():
+            new = sorted(set(df[col].dropna()) - set(current))
+            if new:
+                current.extend(new)
+                mycursor = connection.cursor()
+                mycursor.execute(f"ALTER TABLE traffic_stops MODIFY {col} {_enum_sql(current)}")
+                mycursor.close()
+                print(f"Added {new} to {col}")
+        yield df
+
+# ------------------------------
+# STEP 4: CONVERT COLUMNS (VECTORIZED)
+# ------------------------------
+
+# Stored text format, then (strict format, suffix) pairs: a value of exactly the
+# strict format's width that parses with it becomes value + suffix without
+# being reformatted. Anything else goes through per-value inference ("mixed"),
+# which is ~10x slower, so it only sees the odd row.
+DATETIME_FORMATS = {
+    "stop_date": ("%Y-%m-%d", [("%Y-%m-%d", "")]),
+    "stop_time": ("%H:%M:%S", [("%H:%M:%S", ""), ("%H:%M", ":00")]),
+}
+
+
+def normalize_datetime(values, column):
+    # -> (text in the stored format, mask of values that could not be parsed)
+    out_format, strict = DATETIME_FORMATS[column]
+    raw = values.astype("string").str.strip()
+    raw = raw.mask(raw == "")
+    lengths = raw.str.len()
+    text = pd.Series(None, index=raw.index, dtype="object")
+    todo = raw.notna()
+    for fmt, suffix in strict:
+        fits = todo & (lengths == len(datetime(2000, 1, 1).strftime(fmt)))
+        if fits.any():
+            ok = pd.to_datetime(raw[fits], format=fmt, errors="coerce").notna()
+            ok = ok[ok].index
+            text[ok] = (raw[ok] + suffix).astype(object)
+            todo[ok] = False
+    if todo.any():
+        parsed = pd.to_datetime(raw[todo], format="mixed", errors="coerce").dropna()
+        text[parsed.index] = parsed.dt.strftime(out_format)
+    return text, raw.notna() & text.isna()
+
+
+def convert(df):
+    # Whole-column conversions replace the per-cell pd.isna / int() / str() of the old iterrows loop
+    out = pd.DataFrame(index=df.index)
+
+    for col in COLUMNS:
+        if col not in df.columns:
+            out[col] = None
+        elif col in DATETIME_FORMATS:
+            out[col] = normalize_datetime(df[col], col)[0]
+        elif col in INT_COLUMNS:
+            out[col] = pd.to_numeric(df[col], errors="coerce").round().astype("Int64")
+        elif col in FLAG_COLUMNS:
+            out[col] = df[col].map(FLAG_VALUES).astype("Int64")
+        elif col == "stop_duration":
+            minutes = df[col].map(DURATION_MINUTES).fillna(pd.to_numeric(df[col], errors="coerce"))
+            out[col] = minutes.round().astype("Int64")
+        else:
+            out[col] = df[col]
+
+    # Content hash of the converted row, so re-loads only rewrite rows whose data changed
+    hashes = pd.util.hash_pandas_object(out[COLUMNS].astype("string"), index=False)
+    derive(out)
+    out["row_hash"] = hashes.map("{:016x}".format)
+    return out
+
+
+# Hour of day -> day_period, the same buckets as DAY_PERIOD_SQL
+HOUR_PERIODS = {hour: DAY_PERIODS[1] if hour <= 5 else DAY_PERIODS[0] if hour >= 20 else DAY_PERIODS[2]
+                for hour in range(24)}
+
+
+def derive(out):
+    # The DERIVED_EXPRESSIONS, vectorized over the converted 'YYYY-MM-DD' / 'HH:MM:SS' text.
+    # Like the SQL CASEs, a missing age falls into '60+' and a missing time into daytime.
+    out["stop_hour"] = pd.to_numeric(out["stop_time"].str[:2], errors="coerce").astype("Int64")
+    out["stop_year"] = pd.to_numeric(out["stop_date"].str[:4], errors="coerce").astype("Int64")
+    out["stop_month"] = pd.to_numeric(out["stop_date"].str[5:7], errors="coerce").astype("Int64")
+    age_group = pd.cut(out["driver_age"].astype("float64"), [float("-inf"), 17, 25, 35, 45, 60, float("inf")],
+                       labels=AGE_GROUPS)
+    out["age_group"] = age_group.astype(object).where(age_group.notna(), AGE_GROUPS[-1])
+    out["day_period"] = out["stop_hour"].map(HOUR_PERIODS).astype(object).where(out["stop_hour"].notna(), DAY_PERIODS[2])
+
+
+def to_rows(df):
+    # DB drivers want plain Python scalars with None for missing values
+    columns = [df[col].astype(object).where(df[col].notna(), None).tolist() for col in INSERT_COLUMNS]
+    return list(zip(*columns))
+
+
+def convert_chunks(chunks):
+    for chunk in chunks:
+        yield convert(chunk)
+
+
+def after_watermark(frames, watermark, seen_rows=0, on_late=None):
+    # Incremental mode: rows older than what earlier runs loaded from this source are skipped
+    # outright; rows at or after the watermark go through the upsert, which dedups them.
+    # An old row past seen_rows (the source's length at its last completed load) was
+    # appended since, i.e. it arrived late: it goes to on_late for load_quarantine
+    for df in frames:
+        if watermark is not None:
+            stamp = df["stop_date"] + " " + df["stop_time"]
+            old = stamp.notna() & (stamp < " ".join(watermark))
+            late = old & (df.index >= seen_rows)
+            if late.any() and on_late is not None:
+                reason = pd.Series(f"older than the watermark {' '.join(watermark)}", index=df.index[late])
+                on_late(quarantine_frame(df, reason, LATE_STAGE))
+            df = df[~old]
+        if len(df):
+            yield df
+
+
+def batch_frames(frames, batch_size=5000):
+    for df in frames:
+        for start in range(0, len(df), batch_size):
+            yield df.iloc[start:start + batch_size]
+
+# ------------------------------
+# STEP 5: UPSERT DATA IN BATCHES
+# ------------------------------
+
+def upsert_clause(backend, key_columns, update_columns):
+    if backend == "sqlite":
+        updates = ", ".join(f"{col} = excluded.{col}" for col in update_columns)
+        return f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {updates}"
+    updates = ", ".join(f"{col} = VALUES({col})" for col in update_columns)
+    return f"ON DUPLICATE KEY UPDATE {updates}"
+
+
+def insert_sql(backend, n_rows=1):
+    row = "(" + ", ".join([PLACEHOLDER[backend]] * len(INSERT_COLUMNS)) + ")"
+    update_columns = [col for col in INSERT_COLUMNS if col not in KEY_COLUMNS]
+    upsert = upsert_clause(backend, KEY_COLUMNS, update_columns)
+    if backend == "sqlite":
+        # Leave unchanged rows alone instead of rewriting them
+        upsert += " WHERE traffic_stops.row_hash IS NOT excluded.row_hash"
+    return f"""
+INSERT INTO traffic_stops (
+    {", ".join(INSERT_COLUMNS)}
+) VALUES {", ".join([row] * n_rows)}
+{upsert}
+"""
+
+
+def insert_executemany(connection, backend, batch):
+    mycursor = connection.cursor()
+    mycursor.executemany(insert_sql(backend), batch)
+    mycursor.close()
+
+
+def insert_multirow(connection, backend, batch):
+    # One statement with a multi-row VALUES list per batch
+    mycursor = connection.cursor()
+    mycursor.execute(insert_sql(backend, len(batch)), [value for row in batch for value in row])
+    mycursor.close()
+
+
+def _infile_value(value):
+    if value is None:
+        return "\\N"
+    return str(value).replace("\\", "\\\\")
+
+
+def insert_infile(connection, backend, batch):
+    if backend != "mysql":
+        raise ValueError("LOAD DATA LOCAL INFILE is only available on the MySQL backend")
+
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", delete=False) as tmp:
+        csv.writer(tmp).writerows([[_infile_value(v) for v in row] for row in batch])
+
+    try:
+        mycursor = connection.cursor()
+        # REPLACE resolves duplicate keys in favour of the incoming row
+        mycursor.execute(f"""
+        LOAD DATA LOCAL INFILE '{tmp.name}'
+        REPLACE INTO TABLE traffic_stops
+        FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+        LINES TERMINATED BY '\\r\\n'
+        ({", ".join(INSERT_COLUMNS)})
+        """)
+        mycursor.close()
+    finally:
+        os.remove(tmp.name)
+
+
+INSERT_METHODS = {
+    "executemany": insert_executemany,
+    "multirow": insert_multirow,
+    "infile": insert_infile,
+}
+
+
+def bump_data_version(connection, backend):
+    if backend == "sqlite":
+        upsert = "ON CONFLICT (id) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at"
+    else:
+        upsert = "ON DUPLICATE KEY UPDATE version = version + 1, updated_at = VALUES(updated_at)"
+    mycursor = connection.cursor()
+    mycursor.execute(
+        f"INSERT INTO data_version (id, version, updated_at) VALUES (1, 1, {PLACEHOLDER[backend]}) {upsert}",
+        (datetime.now().strftime("%Y-%m-%d %H:%M:%S"),))
+    mycursor.execute("SELECT version FROM data_version WHERE id = 1")
+    version = mycursor.fetchone()[0]
+    mycursor.close()
+    return version
+
+
+# Dashboard filter columns and the row conditions of panels that count only some
+# rows (Dashboard_Queries.PANEL_ROW_FLAGS)
+CHANGE_COLUMNS = ["vehicle_number", "violation", "driver_gender", "driver_race", "country_name"]
+CHANGE_FLAGS = {
+    "drugs_related_stop": lambda df: df["drugs_related_stop"] == 1,
+    "search_conducted": lambda df: df["search_conducted"] == 1,
+    "is_arrested": lambda df: df["is_arrested"] == 1,
+    "young_driver": lambda df: df["driver_age"] < 25,
+}
+MAX_CHANGE_VALUES = 1000    # beyond this a column is published as "any value"
+KEPT_CHANGES = 1000         # data_changes rows kept behind the current version
+
+
+def _select(connection, sql, params):
+    mycursor = connection.cursor()
+    mycursor.execute(sql, params)
+    rows = mycursor.fetchall()
+    mycursor.close()
+    return rows
+
+
+def change_scope(connection, backend, batch_df, chunk=500):
+    # Read before the batch's upsert: an upsert may move a stored stop to another
+    # country, violation or flag, so the rows it replaces count as changed too
+    read_columns = CHANGE_COLUMNS + ["drugs_related_stop", "search_conducted", "is_arrested", "driver_age"]
+    vehicles = batch_df["vehicle_number"].dropna().unique().tolist()
+    dates = batch_df["stop_date"].dropna().unique().tolist()
+    stored = []
+    for start in range(0, len(vehicles) if dates else 0, chunk):
+        part = vehicles[start:start + chunk]
+        stored += _select(
+            connection,
+            f"SELECT {', '.join(read_columns + ['stop_date', 'stop_time'])} FROM traffic_stops "
+            f"WHERE vehicle_number IN ({', '.join([PLACEHOLDER[backend]] * len(part))}) "
+            f"AND stop_date IN ({', '.join([PLACEHOLDER[backend]] * len(dates))})",
+            part + dates)
+    stored = pd.DataFrame(stored, columns=read_columns + ["stop_date", "stop_time"])
+    stored["stop_date"] = stored["stop_date"].map(_as_date_str)
+    stored["stop_time"] = stored["stop_time"].map(_as_time_str)
+    replaced = stored.merge(batch_df[KEY_COLUMNS].drop_duplicates(), on=KEY_COLUMNS)
+    rows = pd.concat([batch_df[read_columns], replaced[read_columns]], ignore_index=True)
+    rows["driver_age"] = pd.to_numeric(rows["driver_age"], errors="coerce")
+    for flag in FLAG_COLUMNS:
+        rows[flag] = pd.to_numeric(rows[flag], errors="coerce")
+
+    values, new_values = {}, {}
+    for column in CHANGE_COLUMNS:
+        distinct = sorted(str(value) for value in rows[column].dropna().unique())
+        values[column] = distinct if len(distinct) <= MAX_CHANGE_VALUES else None
+        incoming = [str(value) for value in batch_df[column].dropna().unique()]
+        seen = set()
+        for start in range(0, len(incoming), chunk):
+            part = incoming[start:start + chunk]
+            seen.update(row[0] for row in _select(
+                connection,
+                f"SELECT DISTINCT {column} FROM traffic_stops "
+                f"WHERE {column} IN ({', '.join([PLACEHOLDER[backend]] * len(part))})", part))
+        new = sorted(set(incoming) - seen)
+        new_values[column] = new if len(new) <= MAX_CHANGE_VALUES else None
+    return {
+        "rows": len(batch_df),
+        "min_date": min(dates) if dates else None,
+        "max_date": max(dates) if dates else None,
+        "values": values,
+        "flags": {flag: bool(test(rows).fillna(False).any()) for flag, test in CHANGE_FLAGS.items()},
+        "new_values": new_values,
+    }
+
+
+def write_change(connection, backend, version, scope):
+    mycursor = connection.cursor()
+    mycursor.execute(
+        f"INSERT INTO data_changes (version, changed_at, rows_changed, scope) "
+        f"VALUES ({', '.join([PLACEHOLDER[backend]] * 4)})",
+        (version, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), scope["rows"], json.dumps(scope)))
+    mycursor.execute(f"DELETE FROM data_changes WHERE version <= {PLACEHOLDER[backend]}", (version - KEPT_CHANGES,))
+    mycursor.close()
+
+
+def insert_batches(connection, backend, batches, method="executemany", hooks=(), progress_every=20,
+                   publish=False, count_changed=False):
+    # publish=True also records what each batch changed in data_changes (--watch);
+    # count_changed=True sets batch_df.attrs["rows_changed"] (see changed_rows) for the hooks
+    insert = INSERT_METHODS[method]
+    started = time.perf_counter()
+    inserted = 0
+
+    for batch_no, batch_df in enumerate(batches, start=1):
+        scope = change_scope(connection, backend, batch_df) if publish else None
+        if count_changed:
+            batch_df.attrs["rows_changed"] = changed_rows(connection, backend, batch_df)
+        insert(connection, backend, to_rows(batch_df))
+        for hook in hooks:   # checkpoint, rollup refresh, ... run inside the batch's transaction
+            hook(connection, batch_df)
+        version = bump_data_version(connection, backend)
+        if publish:
+            write_change(connection, backend, version, scope)
+        connection.commit()  # commit per batch so a failure only loses the current batch
+        inserted += len(batch_df)
+
+        if batch_no % progress_every == 0:
+            elapsed = time.perf_counter() - started
+            print(f"  batch {batch_no}: {inserted} rows ({inserted / elapsed:,.0f} rows/sec)")
+
+    elapsed = time.perf_counter() - started
+    return inserted, elapsed
+
+def write_quarantine(connection, backend, source, rejects):
+    columns = ["source", "source_row", "stage", "reason", "raw_row", "quarantined_at"]
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    rows = [(source, int(row.source_row), row.stage, row.reason, row.raw_row, now)
+            for row in rejects.itertuples(index=False)]
+    mycursor = connection.cursor()
+    mycursor.executemany(
+        f"INSERT INTO load_quarantine ({', '.join(columns)}) "
+        f"VALUES ({', '.join([PLACEHOLDER[backend]] * len(columns))}) "
+        + upsert_clause(backend, ["source", "source_row"], columns[2:]),
+        rows)
+    mycursor.close()
+
+
+def clear_quarantine(connection, backend, source, keep_late=False):
+    # A load from the first row re-checks every row, so earlier rejects of this source are
+    # stale. Late rows are only detected in the run they were appended for, so an
+    # incremental run (keep_late) leaves them in place
+    sql = f"DELETE FROM load_quarantine WHERE source = {PLACEHOLDER[backend]}"
+    params = (source,)
+    if keep_late:
+        sql += f" AND stage <> {PLACEHOLDER[backend]}"
+        params += (LATE_STAGE,)
+    mycursor = connection.cursor()
+    mycursor.execute(sql, params)
+    mycursor.close()
+
+
+def make_quarantine_hook(backend, source, pending):
+    # Rows rejected while cleaning the chunk this batch came from; written in the batch's transaction
+    def quarantine(connection, batch_df):
+        while pending:
+            write_quarantine(connection, backend, source, pending.pop(0))
+
+    return quarantine
+
+# ------------------------------
+# STEP 6: WATERMARKS & CHECKPOINTS
+# ------------------------------
+
+def _as_date_str(value):
+    return None if value is None else str(value)[:10]
+
+
+def _as_time_str(value):
+    # mysql.connector hands TIME columns back as timedelta
+    if value is None:
+        return None
+    if hasattr(value, "total_seconds"):
+        seconds = int(value.total_seconds())
+        return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+    return str(value)
+
+
+def changed_rows(connection, backend, batch_df, chunk=500):
+    # Rows of the batch the upsert will insert or rewrite: a new key, or a stored
+    # row with a different row_hash (re-sent rows at the watermark are neither)
+    vehicles = batch_df["vehicle_number"].dropna().unique().tolist()
+    dates = batch_df["stop_date"].dropna()
+    stored = []
+    for start in range(0, len(vehicles) if len(dates) else 0, chunk):
+        part = vehicles[start:start + chunk]
+        stored += _select(
+            connection,
+            f"SELECT vehicle_number, stop_date, stop_time, row_hash FROM traffic_stops "
+            f"WHERE vehicle_number IN ({', '.join([PLACEHOLDER[backend]] * len(part))}) "
+            f"AND stop_date BETWEEN {PLACEHOLDER[backend]} AND {PLACEHOLDER[backend]}",
+            part + [dates.min(), dates.max()])
+    if not stored:
+        return len(batch_df)
+    stored = pd.DataFrame(stored, columns=KEY_COLUMNS + ["row_hash"])
+    stored["stop_date"] = stored["stop_date"].map(_as_date_str)
+    stored["stop_time"] = stored["stop_time"].map(_as_time_str)
+    unchanged = batch_df[KEY_COLUMNS + ["row_hash"]].merge(stored.drop_duplicates(KEY_COLUMNS),
+                                                           on=KEY_COLUMNS + ["row_hash"])
+    return len(batch_df) - len(unchanged)
+
+
+def read_load_state(connection, backend, source):
+    mycursor = connection.cursor()
+    mycursor.execute(
+        f"SELECT rows_committed, rows_loaded, max_stop_date, max_stop_time, completed, content_hash "
+        f"FROM load_state WHERE source = {PLACEHOLDER[backend]}", (source,))
+    row = mycursor.fetchone()
+    mycursor.close()
+    if row is None:
+        return None
+    return {
+        "rows_committed": row[0] or 0,
+        "rows_loaded": row[1] or 0,
+        "max_stop_date": _as_date_str(row[2]),
+        "max_stop_time": _as_time_str(row[3]),
+        "completed": bool(row[4]),
+        "content_hash": row[5],
+    }
+
+
+def write_load_state(connection, backend, source, state):
+    columns = ["source", "rows_committed", "rows_loaded", "max_stop_date", "max_stop_time", "completed", "updated_at",
+               "content_hash"]
+    values = (source, state["rows_committed"], state["rows_loaded"], state["max_stop_date"],
+              state["max_stop_time"], int(state["completed"]), datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+              state.get("content_hash"))
+    mycursor = connection.cursor()
+    mycursor.execute(
+        f"INSERT INTO load_state ({', '.join(columns)}) "
+        f"VALUES ({', '.join([PLACEHOLDER[backend]] * len(columns))}) "
+        + upsert_clause(backend, ["source"], columns[1:]),
+        values)
+    mycursor.close()
+
+
+def make_checkpoint(backend, source, state):
+    def checkpoint(connection, batch_df):
+        # Advance the checkpoint and the watermark inside the batch's own transaction
+        state["rows_committed"] = int(batch_df.index[-1]) + 1
+        state["rows_loaded"] += batch_df.attrs.get("rows_changed", len(batch_df))
+
+        stamp = (batch_df["stop_date"] + " " + batch_df["stop_time"]).dropna()
+        if len(stamp):
+            newest = stamp.max().split(" ")
+            if state["max_stop_date"] is None or newest > [state["max_stop_date"], state["max_stop_time"]]:
+                state["max_stop_date"], state["max_stop_time"] = newest
+
+        write_load_state(connection, backend, source, state)
+
+    return checkpoint
+
+# ------------------------------
+# STEP 7: DAILY ROLLUP CUBE
+# ------------------------------
+# traffic_stops_daily holds stop counts and flag sums per
+# (date, hour, country, violation, gender, race, age group), so dashboard
+# aggregates without a vehicle filter scan a few thousand cube rows instead of
+# the whole table. Days touched by a batch are recomputed from traffic_stops,
+# which keeps the cube exact even when upserts rewrite existing rows.
+
+ROLLUP_DIMENSIONS = ["stop_date", "hour", "country_name", "violation", "driver_gender", "driver_race", "driver_age_group"]
+
+CREATE_ROLLUP_SQL = """
+CREATE TABLE IF NOT EXISTS traffic_stops_daily (
+    stop_date DATE,
+    hour SMALLINT,
+    country_name VARCHAR(50),
+    violation VARCHAR(50),
+    driver_gender VARCHAR(20),
+    driver_race VARCHAR(30),
+    driver_age_group VARCHAR(10),
+    stops INT,
+    arrests INT,
+    searches INT,
+    drug_stops INT,
+    young_stops INT,
+    duration_sum BIGINT,
+    duration_count INT
+)
+"""
+
+ROLLUP_SELECT_SQL = """
+SELECT stop_date,
+       stop_hour,
+       country_name,
+       violation,
+       driver_gender,
+       driver_race,
+       age_group,
+       COUNT(*),
+       SUM(is_arrested),
+       SUM(search_conducted),
+       SUM(drugs_related_stop),
+       SUM(CASE WHEN driver_age < 25 THEN 1 ELSE 0 END),
+       SUM(stop_duration),
+       COUNT(stop_duration)
+FROM traffic_stops
+{where}
+GROUP BY 1, 2, 3, 4, 5, 6, 7
+"""
+
+
+def create_rollup_table(connection, backend):
+    mycursor = connection.cursor()
+    mycursor.execute(CREATE_ROLLUP_SQL)
+    if not has_index(connection, backend, "traffic_stops_daily", "idx_daily_date"):
+        mycursor.execute("CREATE INDEX idx_daily_date ON traffic_stops_daily (stop_date)")
+    connection.commit()
+    mycursor.close()
+
+
+def refresh_rollup(connection, backend, dates, chunk=500):
+    dates = sorted(set(dates))
+    mycursor = connection.cursor()
+    for start in range(0, len(dates), chunk):
+        part = dates[start:start + chunk]
+        in_list = ", ".join([PLACEHOLDER[backend]] * len(part))
+        mycursor.execute(f"DELETE FROM traffic_stops_daily WHERE stop_date IN ({in_list})", part)
+        mycursor.execute(
+            "INSERT INTO traffic_stops_daily "
+            + ROLLUP_SELECT_SQL.format(where=f"WHERE stop_date IN ({in_list})"), part)
+    mycursor.close()
+
+
+def rebuild_rollup(connection, backend):
+    started = time.perf_counter()
+    mycursor = connection.cursor()
+    mycursor.execute("DELETE FROM traffic_stops_daily")
+    mycursor.execute("INSERT INTO traffic_stops_daily " + ROLLUP_SELECT_SQL.format(where="WHERE stop_date IS NOT NULL"))
+    mycursor.close()
+    bump_data_version(connection, backend)
+    connection.commit()
+    print(f"Rollup rebuilt in {time.perf_counter() - started:.2f}s")
+
+
+# --rollup auto (the default) refreshes per batch only when that stays cheap:
+# watch and incremental loads, and batches spanning at most ROLLUP_BATCH_DAYS
+# days. Refreshing every day an unsorted 5,000-row batch touches rescans most
+# of the table per batch, so other full-load batches wait for one refresh at the end.
+ROLLUP_BATCH_DAYS = 31
+
+
+def make_rollup_hook(backend, touched=None, max_days=None):
+    # touched=None refreshes each batch's days in its own transaction;
+    # passing a set only collects them for one refresh after the load,
+    # except batches of at most max_days days, which are still refreshed in place
+    def rollup_hook(connection, batch_df):
+        dates = batch_df["stop_date"].dropna().unique().tolist()
+        if touched is None or (max_days is not None and len(dates) <= max_days):
+            refresh_rollup(connection, backend, dates)
+        else:
+            touched.update(dates)
+
+    return rollup_hook
+
+
+def rollup_mode(args):
+    if args.rollup != "auto":
+        return args.rollup
+    return "batch" if args.watch or args.incremental else "auto"
+
+# ------------------------------
+# STEP 8: VEHICLE PROFILES
+# ------------------------------
+# vehicle_profiles holds one row per vehicle (stop, search, arrest and drug
+# stop counts, first/last seen) and vehicle_violations its violation
+# histogram, so a checkpoint lookup is a primary-key read instead of an
+# aggregate over the vehicle's raw stops. Like the rollup, vehicles touched by
+# a batch are recomputed from traffic_stops (a range scan on the uq_stop key).
+
+CREATE_PROFILE_SQL = """
+CREATE TABLE IF NOT EXISTS vehicle_profiles (
+    vehicle_number VARCHAR(50) PRIMARY KEY,
+    stops INT,
+    searches INT,
+    arrests INT,
+    drug_stops INT,
+    first_seen DATE,
+    last_seen DATE
+)
+"""
+
+CREATE_VEHICLE_VIOLATIONS_SQL = """
+CREATE TABLE IF NOT EXISTS vehicle_violations (
+    vehicle_number VARCHAR(50),
+    violation VARCHAR(50),
+    stops INT
+)
+"""
+
+PROFILE_SELECT_SQL = """
+SELECT vehicle_number,
+       COUNT(*),
+       SUM(search_conducted),
+       SUM(is_arrested),
+       SUM(drugs_related_stop),
+       MIN(stop_date),
+       MAX(stop_date)
+FROM traffic_stops
+{where}
+GROUP BY vehicle_number
+"""
+
+VEHICLE_VIOLATIONS_SELECT_SQL = """
+SELECT vehicle_number, violation, COUNT(*)
+FROM traffic_stops
+{where}
+GROUP BY vehicle_number, violation
+"""
+
+
+def create_profile_tables(connection, backend):
+    mycursor = connection.cursor()
+    mycursor.execute(CREATE_PROFILE_SQL)
+    mycursor.execute(CREATE_VEHICLE_VIOLATIONS_SQL)
+    if not has_index(connection, backend, "vehicle_violations", "idx_vehicle_violations"):
+        mycursor.execute("CREATE INDEX idx_vehicle_violations ON vehicle_violations (vehicle_number)")
+    connection.commit()
+    mycursor.close()
+
+
+def refresh_profiles(connection, backend, vehicles, chunk=500):
+    vehicles = sorted(set(vehicles))
+    mycursor = connection.cursor()
+    for start in range(0, len(vehicles), chunk):
+        part = vehicles[start:start + chunk]
+        where = f"WHERE vehicle_number IN ({', '.join([PLACEHOLDER[backend]] * len(part))})"
+        mycursor.execute(f"DELETE FROM vehicle_profiles {where}", part)
+        mycursor.execute(f"DELETE FROM vehicle_violations {where}", part)
+        mycursor.execute("INSERT INTO vehicle_profiles " + PROFILE_SELECT_SQL.format(where=where), part)
+        mycursor.execute("INSERT INTO vehicle_violations " + VEHICLE_VIOLATIONS_SELECT_SQL.format(where=where), part)
+    mycursor.close()
+
+
+def rebuild_profiles(connection, backend):
+    started = time.perf_counter()
+    where = "WHERE vehicle_number IS NOT NULL"
+    mycursor = connection.cursor()
+    mycursor.execute("DELETE FROM vehicle_profiles")
+    mycursor.execute("DELETE FROM vehicle_violations")
+    mycursor.execute("INSERT INTO vehicle_profiles " + PROFILE_SELECT_SQL.format(where=where))
+    mycursor.execute("INSERT INTO vehicle_violations " + VEHICLE_VIOLATIONS_SELECT_SQL.format(where=where))
+    mycursor.close()
+    bump_data_version(connection, backend)
+    connection.commit()
+    print(f"Vehicle profiles rebuilt in {time.perf_counter() - started:.2f}s")
+
+
+def make_profile_hook(backend, touched=None):
+    # Same contract as make_rollup_hook, keyed on vehicle_number
+    def profile_hook(connection, batch_df):
+        vehicles = batch_df["vehicle_number"].dropna().unique().tolist()
+        if touched is None:
+            refresh_profiles(connection, backend, vehicles)
+        else:
+            touched.update(vehicles)
+
+    return profile_hook
+
+# ------------------------------
+# STEP 9: PARALLEL MULTI-FILE LOAD
+# ------------------------------
+# --source may be a directory or glob (one file per station per day). Worker
+# processes parse, clean and convert whole files in parallel and hand batches
+# to the parent through a bounded queue: when the database falls behind, the
+# full queue blocks the parsers, so memory stays bounded. The parent widens
+# ENUMs on its own connection (one thread, so ALTERs never race), then a
+# bounded pool of writer threads, one connection each, upserts the batches.
+# Rollup and vehicle profiles are refreshed once at the end, since concurrent
+# per-batch refreshes of the same day or vehicle would race, and load_state is
+# written per completed file, so an interrupted run resumes file by file.
+
+def expand_sources(source):
+    if "://" in source:
+        return [source]
+    if os.path.isdir(source):
+        return sorted(path for suffix in ("*.csv", "*.csv.gz", "*.csv.zst")
+                      for path in glob.glob(os.path.join(source, suffix)))
+    if any(ch in source for ch in "*?["):
+        return sorted(glob.glob(source))
+    return [source]
+
+
+_parsed_batches = None
+
+
+def _init_parser(batches):
+    global _parsed_batches
+    _parsed_batches = batches
+
+
+def parse_file(task):
+    # Runs in a worker process; every message goes back through the shared bounded queue
+    source, chunksize, batch_size, watermark, seen_rows, digest, loaded_digest, stage_names = task
+    started = time.perf_counter()
+    try:
+        digest = digest or file_digest(source)
+        if digest == loaded_digest:
+            _parsed_batches.put(("skipped", source, {"content_hash": digest}))
+            return
+        profile = profile_source(source, chunksize, verbose=False)
+        stages = {name: CLEAN_STAGES[name] for name in stage_names}
+        clean_stats = new_clean_stats(stages)
+        chunks = clean_chunks(read_chunks(source, chunksize), profile, stages, clean_stats,
+                              on_reject=lambda rejects: _parsed_batches.put(("quarantine", source, rejects)))
+        late = []
+
+        def on_late(rejects):
+            late.append(len(rejects))
+            _parsed_batches.put(("quarantine", source, rejects))
+
+        frames = after_watermark(convert_chunks(chunks), watermark, seen_rows, on_late)
+        sent, newest = 0, None
+        for batch_df in batch_frames(frames, batch_size):
+            stamp = (batch_df["stop_date"] + " " + batch_df["stop_time"]).dropna()
+            if len(stamp):
+                newest = max(newest or "", stamp.max())
+            _parsed_batches.put(("batch", source, batch_df))
+            sent += len(batch_df)
+        _parsed_batches.put(("done", source, {"rows_parsed": profile["rows"], "rows_sent": sent, "newest": newest,
+                                              "late": sum(late),
+                                              "content_hash": digest, "clean": clean_stats,
+                                              "file_s": round(time.perf_counter() - started, 2)}))
+    except Exception as e:
+        _parsed_batches.put(("error", source, f"{type(e).__name__}: {e}"))
+
+
+def _write_batches(args, work, status, lock, touched_dates, touched_vehicles, failures):
+    # Writer thread: its own connection, one transaction per batch. Anything that
+    # escapes a batch (e.g. connect() raising SystemExit) goes to failures for the
+    # main thread to re-raise, and the queue is drained so the producer never blocks
+    connection = None
+    try:
+        connection = connect(args.backend, args.sqlite_path, allow_local_infile=args.method == "infile")
+        insert = INSERT_METHODS[args.method]
+        while True:
+            item = work.get()
+            if item is None:
+                break
+            kind, source, batch_df = item
+            try:
+                if kind == "quarantine":
+                    write_quarantine(connection, args.backend, source, batch_df)
+                else:
+                    changed = changed_rows(connection, args.backend, batch_df)
+                    insert(connection, args.backend, to_rows(batch_df))
+                    bump_data_version(connection, args.backend)
+                connection.commit()
+            except Exception as e:
+                connection.rollback()
+                with lock:
+                    status[source]["error"] = status[source]["error"] or f"write failed: {type(e).__name__}: {e}"
+                continue
+            if kind == "quarantine":
+                with lock:
+                    status[source]["quarantined_written"] += len(batch_df)
+                continue
+            with lock:
+                status[source]["rows_written"] += len(batch_df)
+                status[source]["rows_changed"] += changed
+                touched_dates.update(batch_df["stop_date"].dropna().unique().tolist())
+                touched_vehicles.update(batch_df["vehicle_number"].dropna().unique().tolist())
+    except BaseException as e:
+        failures.append(e)
+        while work.get() is not None:
+            pass
+    finally:
+        if connection is not None:
+            connection.close()
+
+
+def load_files(connection, args, sources):
+    writers = args.writers
+    if args.backend == "sqlite" and writers > 1:
+        print("SQLite allows one writer at a time; using --writers 1")
+        writers = 1
+    workers = max(1, min(args.workers, len(sources)))
+
+    os.makedirs(args.cache_dir, exist_ok=True)
+    index = load_cache_index(args.cache_dir)
+    states, watermarks, tasks = {}, {}, []
+    for source in sources:
+        state = read_load_state(connection, args.backend, source)
+        watermark, loaded_digest, seen_rows = None, None, 0
+        if state and state["completed"]:
+            seen_rows = state["rows_committed"]
+            if args.incremental and state["max_stop_date"] is not None:
+                watermark = (state["max_stop_date"], state["max_stop_time"])
+            if not args.force:
+                loaded_digest = state["content_hash"]
+        states[source], watermarks[source] = state, watermark
+        # Unknown digests are computed by the workers, in parallel
+        tasks.append((source, args.chunksize, args.batch_size, watermark, seen_rows, cached_digest(source, index),
+                      loaded_digest, stage_names(args)))
+    status = {source: {"rows_parsed": 0, "rows_sent": 0, "rows_written": 0, "rows_changed": 0, "batches": 0,
+                       "file_s": None, "newest": None, "late": 0, "content_hash": None, "skipped": False, "error": None,
+                       "quarantined_written": 0, "clean": {}} for source in sources}
+
+    print(f"Loading {len(sources)} files with {workers} parser processes and {writers} writer connections")
+    started = time.perf_counter()
+    lock = threading.Lock()
+    touched_dates, touched_vehicles, failures = set(), set(), []
+    parsed = multiprocessing.Queue(maxsize=args.queue_size)
+    work = queue.Queue(maxsize=writers * 2)
+    threads = [threading.Thread(target=_write_batches, name=f"securecheck-writer-{i}",
+                                args=(args, work, status, lock, touched_dates, touched_vehicles, failures))
+               for i in range(writers)]
+    for thread in threads:
+        thread.start()
+
+    cleared = set()
+
+    def incoming(result):
+        finished = 0
+        while finished < len(sources):
+            try:
+                kind, source, payload = parsed.get(timeout=1)
+            except queue.Empty:
+                if result.ready() and not result.successful():
+                    result.get()    # re-raises the pool's failure
+                continue
+            if kind != "skipped" and source not in cleared:
+                cleared.add(source)
+                clear_quarantine(connection, args.backend, source, keep_late=watermarks[source] is not None)
+                connection.commit()
+            if kind == "batch":
+                status[source]["batches"] += 1
+                yield source, payload
+                continue
+            if kind == "quarantine":
+                work.put(("quarantine", source, payload))
+                continue
+            finished += 1
+            if kind == "skipped":
+                status[source].update(payload, skipped=True)
+                print(f"  [{finished}/{len(sources)}] unchanged {source}; skipped")
+            elif kind == "done":
+                status[source].update(payload)
+                print(f"  [{finished}/{len(sources)}] parsed {source}: {payload['rows_sent']} rows "
+                      f"in {payload['file_s']:.2f}s")
+            else:
+                status[source]["error"] = payload
+                print(f"  [{finished}/{len(sources)}] FAILED {source}: {payload}")
+
+    try:
+        with multiprocessing.Pool(workers, initializer=_init_parser, initargs=(parsed,)) as pool:
+            result = pool.map_async(parse_file, tasks)
+            batch_sources = []
+
+            def frames():
+                for source, batch_df in incoming(result):
+                    batch_sources.append(source)
+                    yield batch_df
+
+            for batch_df in widen_enums(frames(), connection, args.backend):
+                work.put(("batch", batch_sources.pop(0), batch_df))   # blocks while the writers are busy
+                if failures:
+                    raise failures[0]
+            result.get()
+    finally:
+        for _ in threads:
+            work.put(None)
+        for thread in threads:
+            thread.join()
+    if failures:
+        raise failures[0]   # a writer died after the last batch was queued
+    elapsed = time.perf_counter() - started
+
+    if args.rollup != "off" and touched_dates:
+        refresh_rollup(connection, args.backend, touched_dates)
+    if args.profiles != "off" and touched_vehicles:
+        refresh_profiles(connection, args.backend, touched_vehicles)
+    if touched_dates or touched_vehicles:
+        bump_data_version(connection, args.backend)
+    connection.commit()
+
+    for source in sources:
+        info = status[source]
+        info["quarantined"] = sum(counts["quarantined"] for counts in info["clean"].values()) + info["late"]
+        info["ok"] = (info["error"] is None and info["rows_written"] == info["rows_sent"]
+                      and info["quarantined_written"] == info["quarantined"])
+        if info["content_hash"]:
+            remember_digest(source, info["content_hash"], index)
+        if info["ok"] and not info["skipped"]:
+            state = states[source] if args.incremental and states[source] else {
+                "rows_loaded": 0, "max_stop_date": None, "max_stop_time": None}
+            state.update(rows_committed=info["rows_parsed"], rows_loaded=state["rows_loaded"] + info["rows_changed"],
+                         completed=True, content_hash=info["content_hash"])
+            if info["newest"] and (state["max_stop_date"] is None
+                                   or info["newest"].split(" ") > [state["max_stop_date"], state["max_stop_time"]]):
+                state["max_stop_date"], state["max_stop_time"] = info["newest"].split(" ")
+            write_load_state(connection, args.backend, source, state)
+    connection.commit()
+    save_cache_index(args.cache_dir, index)
+
+    return status, elapsed, workers, writers
+
+
+def print_file_summary(status, elapsed, workers, writers):
+    width = max(len(source) for source in status)
+    print(f"{'file':<{width}}  {'status':<6}{'parsed':>10}{'written':>10}{'quarantined':>13}{'file s':>9}")
+    for source, info in status.items():
+        file_s = f"{info['file_s']:.2f}" if info["file_s"] is not None else "-"
+        label = "FAILED" if not info["ok"] else "same" if info["skipped"] else "ok"
+        print(f"{source:<{width}}  {label:<6}{info['rows_parsed']:>10}"
+              f"{info['rows_written']:>10}{info['quarantined']:>13}{file_s:>9}")
+        if info["error"]:
+            print(f"    {info['error']}")
+    written = sum(info["rows_written"] for info in status.values())
+    failed = sum(not info["ok"] for info in status.values())
+    skipped = sum(info["skipped"] for info in status.values())
+    print(f"{len(status)} files ({failed} failed, {skipped} unchanged), {written} rows in {elapsed:.2f}s "
+          f"({written / max(elapsed, 1e-9):,.0f} rows/sec, workers={workers}, writers={writers})")
+    clean_stats = {}
+    for info in status.values():
+        merge_clean_stats(clean_stats, info["clean"])
+    if clean_stats:
+        print_clean_report(clean_stats)
+    return failed
+
+# ------------------------------
+# STEP 10: SINGLE SOURCE & WATCH MODE
+# ------------------------------
+# --watch DIR keeps the loader running as the ingest side of a live
+# dashboard: every poll picks up the CSV files dropped into DIR, loads each
+# in micro-batches of --micro-batch rows (one transaction, data version and
+# data_changes row each), then moves it to DIR/loaded, or DIR/failed if it
+# could not be loaded. Producers should write under another name (e.g.
+# .csv.tmp) and rename when done; files modified in the last WATCH_SETTLE
+# seconds are left for the next poll in case they are still being written.
+
+WATCH_SETTLE = 1.0
+
+
+def load_source(connection, args, source, publish=False):
+    # One source, streamed in batches of --batch-size; returns the rows written
+    path, content_hash = resolve_source(source, args.cache_dir)
+
+    state = read_load_state(connection, args.backend, source)
+    if state and state["completed"] and state["content_hash"] == content_hash and not args.force:
+        print(f"{source} is unchanged since its last load (sha256 {content_hash[:12]}); nothing to do")
+        return 0
+
+    offset, watermark, hooks = 0, None, []
+    seen_rows = state["rows_committed"] if state and state["completed"] else 0
+    if not args.incremental or state is None:
+        state = {"rows_committed": 0, "rows_loaded": 0, "max_stop_date": None, "max_stop_time": None}
+    elif not state["completed"] and state["content_hash"] in (None, content_hash):
+        offset = state["rows_committed"]
+        print(f"Resuming {source} after {offset} committed source rows")
+    else:
+        state["rows_committed"] = 0     # completed, or the file changed under an interrupted load
+    if args.incremental and state["max_stop_date"] is not None and offset == 0:
+        watermark = (state["max_stop_date"], state["max_stop_time"])
+        print(f"Watermark for {source}: {' '.join(watermark)}")
+    state["completed"] = False
+    state["content_hash"] = content_hash
+    # Checkpoint every load (only --incremental resumes from it); the hash lets unchanged sources be skipped
+    hooks.append(make_checkpoint(args.backend, source, state))
+
+    rollup = rollup_mode(args)
+    touched_dates = None if rollup == "batch" else set()
+    if rollup != "off":
+        hooks.append(make_rollup_hook(args.backend, touched_dates, ROLLUP_BATCH_DAYS if rollup == "auto" else None))
+
+    touched_vehicles = set() if args.profiles == "end" else None
+    if args.profiles != "off":
+        hooks.append(make_profile_hook(args.backend, touched_vehicles))
+
+    pending_rejects = []
+    hooks.append(make_quarantine_hook(args.backend, source, pending_rejects))
+    if offset == 0:
+        # Committed with the first batch
+        clear_quarantine(connection, args.backend, source, keep_late=watermark is not None)
+
+    # Pass 1 profiles the file, pass 2 streams read -> clean -> convert -> insert
+    profile = profile_source(path, args.chunksize)
+
+    stages = {name: CLEAN_STAGES[name] for name in stage_names(args)}
+    clean_stats = new_clean_stats(stages)
+    chunks = clean_chunks(skip_rows(read_chunks(path, args.chunksize), offset), profile, stages, clean_stats,
+                          on_reject=pending_rejects.append)
+    late = []
+
+    def on_late(rejects):
+        late.append(len(rejects))
+        pending_rejects.append(rejects)
+
+    frames = widen_enums(after_watermark(convert_chunks(chunks), watermark, seen_rows, on_late),
+                         connection, args.backend)
+    batches = batch_frames(frames, args.batch_size)
+
+    loaded_before = state["rows_loaded"]
+    inserted, elapsed = insert_batches(connection, args.backend, batches, args.method, hooks, publish=publish,
+                                       count_changed=True)
+
+    if touched_dates or touched_vehicles:
+        if touched_dates:
+            refresh_rollup(connection, args.backend, touched_dates)
+        if touched_vehicles:
+            refresh_profiles(connection, args.backend, touched_vehicles)
+        bump_data_version(connection, args.backend)
+        connection.commit()
+
+    # Rejects after the last batch (e.g. a trailing chunk with no valid rows)
+    while pending_rejects:
+        write_quarantine(connection, args.backend, source, pending_rejects.pop(0))
+    state["completed"] = True
+    state["rows_committed"] = profile["rows"]   # the source's length, for telling late rows next time
+    write_load_state(connection, args.backend, source, state)
+    connection.commit()
+
+    print_clean_report(clean_stats)
+    if late:
+        print(f"{sum(late)} rows appended with a stop older than the watermark were quarantined "
+              f"(stage {LATE_STAGE}); load without --incremental to include them")
+    print("Data inserted successfully!")
+    print(f"{inserted} rows in {elapsed:.2f}s ({inserted / max(elapsed, 1e-9):,.0f} rows/sec, "
+          f"{state['rows_loaded'] - loaded_before} new or changed, "
+          f"method={args.method}, batch_size={args.batch_size}, chunksize={args.chunksize})")
+    return inserted
+
+
+def settled_files(inbox):
+    now = time.time()
+    return [path for path in expand_sources(inbox) if now - os.path.getmtime(path) >= WATCH_SETTLE]
+
+
+def move_to(path, folder):
+    os.makedirs(folder, exist_ok=True)
+    os.replace(path, os.path.join(folder, os.path.basename(path)))
+
+
+def watch_inbox(connection, args, max_polls=None):
+    args.batch_size = args.micro_batch
+    loaded_dir, failed_dir = os.path.join(args.watch, "loaded"), os.path.join(args.watch, "failed")
+    os.makedirs(args.watch, exist_ok=True)
+    print(f"Watching {args.watch} every {args.poll_interval}s ({args.micro_batch} rows per micro-batch); "
+          f"Ctrl+C to stop")
+    polls, files, rows = 0, 0, 0
+    try:
+        while max_polls is None or polls < max_polls:
+            polls += 1
+            for path in settled_files(args.watch):
+                started = time.perf_counter()
+                try:
+                    written = load_source(connection, args, path, publish=True)
+                except Exception as e:
+                    connection.rollback()
+                    print(f"FAILED {path}: {type(e).__name__}: {e}")
+                    move_to(path, failed_dir)
+                    continue
+                move_to(path, loaded_dir)
+                files += 1
+                rows += written
+                print(f"{datetime.now():%H:%M:%S} {os.path.basename(path)}: {written} rows live "
+                      f"in {time.perf_counter() - started:.2f}s")
+            if max_polls is None or polls < max_polls:
+                time.sleep(args.poll_interval)
+    except KeyboardInterrupt:
+        pass
+    print(f"Stopped watching {args.watch}: {files} files, {rows} rows")
+
+# ------------------------------
+# MAIN
+# ------------------------------
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load traffic stop logs into the SecureCheck database")
+    parser.add_argument("--source", default=SOURCE_URL,
+                        help="CSV path or URL (.gz/.zst compressed too), or a directory / glob of CSV files "
+                             "to load in parallel")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="download cache and file hash memo")
+    parser.add_argument("--force", action="store_true", help="load sources even if unchanged since their last load")
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], default="mysql")
+    parser.add_argument("--sqlite-path", default="securecheck.db")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--chunksize", type=int, default=100_000, help="CSV rows held in memory at once")
+    parser.add_argument("--method", choices=sorted(INSERT_METHODS), default="executemany")
+    parser.add_argument("--incremental", action="store_true",
+                        help="skip rows older than this source's watermark and resume an interrupted load")
+    parser.add_argument("--rollup", choices=["auto", "batch", "end", "off"], default="auto",
+                        help="refresh the daily rollup per batch, once after the load (faster for unsorted "
+                             "full loads), or not at all; auto refreshes per batch in --watch and --incremental "
+                             "loads and for batches spanning a few weeks at most, otherwise once at the end")
+    parser.add_argument("--rebuild-rollup", action="store_true", help="rebuild the daily rollup from scratch and exit")
+    parser.add_argument("--profiles", choices=["batch", "end", "off"], default="batch",
+                        help="refresh vehicle profiles per batch, once after the load, or not at all")
+    parser.add_argument("--rebuild-profiles", action="store_true",
+                        help="rebuild the vehicle profiles from scratch and exit")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="parser processes for multi-file loads")
+    parser.add_argument("--writers", type=int, default=2, help="database writer connections for multi-file loads")
+    parser.add_argument("--queue-size", type=int, default=8,
+                        help="parsed batches held in memory before parsers wait for the writers")
+    parser.add_argument("--skip-stage", action="append", default=[], choices=list(CLEAN_STAGES),
+                        help="leave out a cleaning stage (repeatable)")
+    parser.add_argument("--watch", metavar="DIR",
+                        help="keep running: load CSV files dropped into DIR in micro-batches as they arrive")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="seconds between --watch polls")
+    parser.add_argument("--micro-batch", type=int, default=500,
+                        help="rows per transaction (and published data version) in --watch mode")
+    parser.add_argument("--snapshot", metavar="DIR",
+                        help="after loading, also export a Parquet snapshot for offline dashboards (Snapshot_Store.py)")
+    return parser.parse_args(argv)
+
+
+def stage_names(args):
+    return [name for name in CLEAN_STAGES if name not in args.skip_stage]
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    connection = connect(args.backend, args.sqlite_path, allow_local_infile=args.method == "infile")
+    create_table(connection, args.backend)
+
+    if args.rebuild_rollup or args.rebuild_profiles:
+        if args.rebuild_rollup:
+            rebuild_rollup(connection, args.backend)
+        if args.rebuild_profiles:
+            rebuild_profiles(connection, args.backend)
+        connection.close()
+        return
+
+    if args.watch:
+        watch_inbox(connection, args)
+        connection.close()
+        return
+
+    sources = expand_sources(args.source)
+    if not sources:
+        raise SystemExit(f"No CSV files match {args.source}")
+    if len(sources) > 1:
+        status, elapsed, workers, writers = load_files(connection, args, sources)
+        failed = print_file_summary(status, elapsed, workers, writers)
+        if args.snapshot:
+            from Snapshot_Store import write_snapshot
+            write_snapshot(connection, args.backend, args.snapshot, args.chunksize)
+        connection.close()
+        if failed:
+            raise SystemExit(1)
+        return
+    load_source(connection, args, sources[0])
+
+    if args.snapshot:
+        from Snapshot_Store import write_snapshot
+        write_snapshot(connection, args.backend, args.snapshot, args.chunksize)
+
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+import argparse
+import json
+import statistics
+import time
+
+import Data_Load as dl
+from Dashboard_Queries import QUERIES, default_filters, expression_form, query
+
+# ------------------------------
+# Moves an existing traffic_stops table onto the compact typed schema of
+# Data_Load.py (TINYINT flags, ENUM text codes, stop_duration in minutes)
+# with the dashboard indexes, and reports dashboard query latency before/after.
+# The old table is kept as traffic_stops_legacy for rollback.
+# A typed table without the derived columns (stop_hour, stop_year, stop_month,
+# age_group, day_period) gets them added, backfilled and indexed in place.
+# "Before" always runs the panels in their per-row expression form, so the
+# report is the per-panel speedup of the derived columns (plus typing).
+# ------------------------------
+
+
+def column_type(connection, backend, table, column):
+    mycursor = connection.cursor()
+    if backend == "sqlite":
+        mycursor.execute(f"PRAGMA table_info({table})")
+        types = {row[1]: row[2] for row in mycursor.fetchall()}
+    else:
+        mycursor.execute(
+            "SELECT COLUMN_NAME, DATA_TYPE FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", (table,))
+        types = dict(mycursor.fetchall())
+    mycursor.close()
+    return (types.get(column) or "").lower()
+
+
+def table_exists(connection, backend, table):
+    mycursor = connection.cursor()
+    if backend == "sqlite":
+        mycursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+    else:
+        mycursor.execute("SHOW TABLES LIKE %s", (table,))
+    found = bool(mycursor.fetchall())
+    mycursor.close()
+    return found
+
+
+def is_migrated(connection, backend):
+    return column_type(connection, backend, "traffic_stops", "is_arrested").startswith(("tinyint", "integer"))
+
+
+def has_derived_columns(connection):
+    return set(dl.DERIVED_COLUMNS) <= set(dl.table_columns(connection, "traffic_stops"))
+
+# ------------------------------
+# LATENCY REPORT
+# ------------------------------
+
+def time_queries(connection, backend, runs=3, expressions=False):
+    # expressions=True computes hour/year/month/age group/day period per row, as
+    # the queries did before the loader stored them
+    filter_sql, params = default_filters()
+    timings = {}
+    mycursor = connection.cursor()
+    for name in QUERIES:
+        sql = query(name, filter_sql)
+        if expressions:
+            sql = expression_form(sql)
+        if backend == "sqlite":
+            sql = sql.replace("%s", "?")
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            mycursor.execute(sql, params)
+            mycursor.fetchall()
+            samples.append((time.perf_counter() - started) * 1000)
+        timings[name] = round(statistics.median(samples), 2)
+    mycursor.close()
+    return timings
+
+
+def print_report(before, after):
+    print(f"{'query':<32}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for name in QUERIES:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:<32}{before[name]:>12.2f}{after[name]:>12.2f}{speedup:>9.1f}x")
+    total_before, total_after = sum(before.values()), sum(after.values())
+    print(f"{'TOTAL':<32}{total_before:>12.2f}{total_after:>12.2f}{total_before / max(total_after, 1e-9):>9.1f}x")
+
+# ------------------------------
+# MIGRATION
+# ------------------------------
+
+def _flag_expr(column):
+    return (f"CASE WHEN {column} IN ('1', 'True', 'true') THEN 1 "
+            f"WHEN {column} IN ('0', 'False', 'false') THEN 0 END")
+
+
+def _duration_expr(backend):
+    buckets = " ".join(f"WHEN '{bucket}' THEN {minutes}" for bucket, minutes in dl.DURATION_MINUTES.items())
+    if backend == "sqlite":
+        numeric = "WHEN stop_duration <> '' AND stop_duration NOT GLOB '*[^0-9]*' THEN CAST(stop_duration AS INTEGER)"
+    else:
+        numeric = "WHEN stop_duration REGEXP '^[0-9]+$' THEN CAST(stop_duration AS UNSIGNED)"
+    return f"CASE stop_duration {buckets} ELSE CASE {numeric} END END"
+
+
+def select_expressions(connection, backend):
+    legacy_columns = dl.table_columns(connection, "traffic_stops_legacy")
+    expressions = []
+    for name, mysql_type, _ in dl.SCHEMA:
+        if name not in legacy_columns:
+            expressions.append("NULL")
+        elif name in dl.FLAG_COLUMNS:
+            expressions.append(_flag_expr(name))
+        elif name == "stop_duration":
+            expressions.append(_duration_expr(backend))
+        elif mysql_type == "ENUM":
+            expressions.append(f"NULLIF({name}, '')")
+        else:
+            expressions.append(name)
+    return expressions
+
+
+def legacy_enum_members(connection, backend):
+    # ENUM members = the defaults plus every value already present in the table
+    members = {}
+    columns = dl.table_columns(connection, "traffic_stops")
+    mycursor = connection.cursor()
+    for name, values in dl.ENUM_MEMBERS.items():
+        if name not in columns:
+            members[name] = values   # derived columns: fixed members
+            continue
+        mycursor.execute(f"SELECT DISTINCT {name} FROM traffic_stops WHERE {name} IS NOT NULL AND {name} <> ''")
+        existing = {row[0] for row in mycursor.fetchall()}
+        members[name] = values + sorted(existing - set(values))
+    mycursor.close()
+    return members
+
+
+def missing_enum_values(connection):
+    # Legacy values of the ENUM columns that did not reach the typed table. On MySQL
+    # INSERT IGNORE stores a value outside the ENUM as '', so this is the only trace
+    legacy_columns = dl.table_columns(connection, "traffic_stops_legacy")
+    missing = {}
+    mycursor = connection.cursor()
+    for name in dl.ENUM_MEMBERS:
+        if name not in legacy_columns:
+            continue
+        mycursor.execute(f"SELECT DISTINCT {name} FROM traffic_stops_legacy WHERE {name} IS NOT NULL AND {name} <> ''")
+        old = {row[0] for row in mycursor.fetchall()}
+        mycursor.execute(f"SELECT DISTINCT {name} FROM traffic_stops WHERE {name} IS NOT NULL AND {name} <> ''")
+        lost = old - {row[0] for row in mycursor.fetchall()}
+        if lost:
+            missing[name] = sorted(lost)
+    mycursor.close()
+    return missing
+
+
+def restore_legacy(connection, backend):
+    # Puts the untouched legacy table back (on SQLite without the indexes migrate() dropped)
+    mycursor = connection.cursor()
+    mycursor.execute("DROP TABLE traffic_stops")
+    if backend == "sqlite":
+        mycursor.execute("ALTER TABLE traffic_stops_legacy RENAME TO traffic_stops")
+    else:
+        mycursor.execute("RENAME TABLE traffic_stops_legacy TO traffic_stops")
+    connection.commit()
+    mycursor.close()
+
+
+def migrate(connection, backend):
+    if table_exists(connection, backend, "traffic_stops_legacy"):
+        raise SystemExit("traffic_stops_legacy already exists; drop it (or restore it) before migrating again")
+
+    enum_members = legacy_enum_members(connection, backend)
+
+    mycursor = connection.cursor()
+    if backend == "sqlite":
+        mycursor.execute("ALTER TABLE traffic_stops RENAME TO traffic_stops_legacy")
+        # SQLite index names are schema-wide; free them for the new table
+        mycursor.execute("PRAGMA index_list(traffic_stops_legacy)")
+        for index in [row[1] for row in mycursor.fetchall() if not row[1].startswith("sqlite_autoindex")]:
+            mycursor.execute(f"DROP INDEX {index}")
+    else:
+        mycursor.execute("RENAME TABLE traffic_stops TO traffic_stops_legacy")
+    connection.commit()
+
+    dl.create_table(connection, backend, enum_members)
+
+    columns = [name for name, _, _ in dl.SCHEMA]
+    ignore = "OR IGNORE" if backend == "sqlite" else "IGNORE"
+    started = time.perf_counter()
+    mycursor.execute(f"""
+    INSERT {ignore} INTO traffic_stops ({", ".join(columns)})
+    SELECT {", ".join(select_expressions(connection, backend))}
+    FROM traffic_stops_legacy
+    """)
+    copied = mycursor.rowcount
+    connection.commit()
+    missing = missing_enum_values(connection)
+    if missing:
+        restore_legacy(connection, backend)
+        raise SystemExit(f"Migration rolled back, traffic_stops is unchanged: legacy values missing from the "
+                         f"typed table: {missing}")
+    dl.bump_data_version(connection, backend)
+    connection.commit()
+    print(f"Copied {copied} rows into the typed table in {time.perf_counter() - started:.2f}s")
+    dl.backfill_derived_columns(connection)
+
+    dl.rebuild_rollup(connection, backend)
+    dl.rebuild_profiles(connection, backend)
+
+    analyze(connection, backend)
+    mycursor.close()
+
+
+def add_derived_columns(connection, backend):
+    dl.ensure_derived_columns(connection, backend)
+    dl.ensure_indexes(connection, backend)
+    # Values are unchanged, but cached dashboard results were computed by the old queries
+    dl.bump_data_version(connection, backend)
+    connection.commit()
+
+
+def analyze(connection, backend):
+    mycursor = connection.cursor()
+    mycursor.execute("ANALYZE" if backend == "sqlite" else "ANALYZE TABLE traffic_stops")
+    if backend == "mysql":
+        mycursor.fetchall()
+    connection.commit()
+    mycursor.close()
+
+# ------------------------------
+# MAIN
+# ------------------------------
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Migrate traffic_stops to the typed, indexed schema")
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], default="mysql")
+    parser.add_argument("--sqlite-path", default="securecheck.db")
+    parser.add_argument("--runs", type=int, default=3, help="timed runs per query (median is reported)")
+    parser.add_argument("--report", help="also write the latency report to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    connection = dl.connect(args.backend, args.sqlite_path)
+
+    if not is_migrated(connection, args.backend):
+        step = "typed schema"
+        before = time_queries(connection, args.backend, args.runs, expressions=True)
+        migrate(connection, args.backend)
+    elif not has_derived_columns(connection):
+        step = "derived columns"
+        before = time_queries(connection, args.backend, args.runs, expressions=True)
+        add_derived_columns(connection, args.backend)
+    else:
+        print("traffic_stops already uses the typed schema with derived columns; nothing to do")
+        connection.close()
+        return
+    after = time_queries(connection, args.backend, args.runs)
+
+    print_report(before, after)
+    if args.report:
+        with open(args.report, "w") as fh:
+            json.dump({"backend": args.backend, "step": step, "runs": args.runs,
+                       "before_ms": before, "after_ms": after}, fh, indent=2)
+        print(f"Report written to {args.report}")
+
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import argparse
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import Data_Load as dl
+from Dashboard_Queries import DERIVED_EXPRESSIONS
+
+# ------------------------------
+# COLUMNAR SNAPSHOT
+# ------------------------------
+# A Parquet copy of traffic_stops, hive-partitioned by year/country_name, that
+# the dashboard can query offline through DuckDB instead of MySQL:
+#
+#   python Snapshot_Store.py --out snapshot/            (or Data_Load.py --snapshot snapshot/)
+#   SECURECHECK_SNAPSHOT=snapshot/ streamlit run Streamlit.py
+#
+# The snapshot is exported from the database (not from the CSV) so it carries
+# the deduplicated, typed rows. pyarrow and duckdb are only needed here.
+
+SNAPSHOT_META = "_snapshot.json"
+PARTITION_COLUMNS = ["year", "country_name"]
+TABLE_COLUMNS = [name for name, _, _ in dl.SCHEMA]
+
+
+def _arrow_types():
+    import pyarrow as pa
+
+    types = {name: pa.string() for name in TABLE_COLUMNS}
+    types.update({"stop_date": pa.date32(), "stop_time": pa.time64("us"), "year": pa.int16(),
+                  "stop_duration": pa.int16(), "driver_age": pa.int16(), "driver_age_raw": pa.int16(),
+                  "stop_hour": pa.int8(), "stop_year": pa.int16(), "stop_month": pa.int8()})
+    types.update({name: pa.int8() for name in dl.FLAG_COLUMNS})
+    return types
+
+
+def to_arrow(df, columns=TABLE_COLUMNS, with_year=True):
+    # One chunk of traffic_stops as read from any backend -> typed Arrow table
+    import pyarrow as pa
+
+    stop_date = pd.to_datetime(df["stop_date"].astype("string").str[:10], errors="coerce")
+    # TIME is a timedelta from MySQL and 'HH:MM:SS' text from SQLite
+    stop_time = df["stop_time"] if df["stop_time"].dtype.kind == "m" else pd.to_timedelta(
+        df["stop_time"].astype("string"), errors="coerce")
+    micros = (stop_time.dt.total_seconds() * 1_000_000).round().astype("Int64")
+
+    types = _arrow_types()
+    arrays = {}
+    for name in columns:
+        if name == "stop_date":
+            arrays[name] = pa.array(stop_date.dt.date.where(stop_date.notna(), None), types[name])
+        elif name == "stop_time":
+            arrays[name] = pa.array(micros, pa.int64()).cast(types[name])
+        elif types[name] == pa.string():
+            arrays[name] = pa.array(df[name].astype(object).where(df[name].notna(), None), types[name])
+        else:
+            arrays[name] = pa.array(pd.to_numeric(df[name], errors="coerce").astype("Int64"), pa.int64()).cast(types[name])
+    if with_year:
+        arrays["year"] = pa.array(stop_date.dt.year.astype("Int64"), pa.int64()).cast(types["year"])
+    return pa.table(arrays)
+
+
+def read_source_version(connection):
+    mycursor = connection.cursor()
+    try:
+        mycursor.execute("SELECT MAX(version) FROM data_version")
+        return mycursor.fetchone()[0]
+    except Exception:
+        return None
+    finally:
+        mycursor.close()
+
+
+def write_snapshot(connection, backend, out_dir, chunksize=100_000):
+    import pyarrow.dataset as ds
+
+    started = time.perf_counter()
+    # Build next to the target and swap in at the end, so readers never see half a snapshot
+    staging = out_dir.rstrip("/\\") + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+
+    rows = 0
+    sql = f"SELECT {', '.join(TABLE_COLUMNS)} FROM traffic_stops"
+    for chunk_no, chunk in enumerate(pd.read_sql(sql, connection, chunksize=chunksize)):
+        ds.write_dataset(
+            to_arrow(chunk), staging, format="parquet",
+            partitioning=PARTITION_COLUMNS, partitioning_flavor="hive",
+            basename_template=f"part-{chunk_no:05d}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        rows += len(chunk)
+
+    os.makedirs(staging, exist_ok=True)
+    meta = {
+        "rows": rows,
+        "data_version": read_source_version(connection),
+        "source_backend": backend,
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    with open(os.path.join(staging, SNAPSHOT_META), "w") as fh:
+        json.dump(meta, fh, indent=2)
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(staging, out_dir)
+    print(f"Snapshot of {rows} rows written to {out_dir} in {time.perf_counter() - started:.2f}s")
+    return meta
+
+# ------------------------------
+# DUCKDB QUERY BACKEND
+# ------------------------------
+# Presents the snapshot under the table names the dashboard SQL expects:
+# traffic_stops is a view over the Parquet files, and the derived tables the
+# loader maintains (daily rollup, vehicle profiles, data_version) are built
+# in memory from it when the store is opened.
+
+class _SnapshotCursor:
+    # DB-API cursor over a DuckDB connection, accepting the dashboard's %s placeholders
+    def __init__(self, conn):
+        self._conn = conn
+
+    def execute(self, sql, params=None):
+        self._conn.execute(sql.replace("%s", "?"), list(params or ()))
+        return self
+
+    @property
+    def description(self):
+        return self._conn.description
+
+    def fetchone(self):
+        return self._conn.fetchone()
+
+    def fetchmany(self, size=1):
+        return self._conn.fetchmany(size)
+
+    def fetchall(self):
+        return self._conn.fetchall()
+
+    def close(self):
+        pass
+
+
+class _SnapshotConnection:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self):
+        return _SnapshotCursor(self._conn)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self._conn.close()
+
+
+class SnapshotStore:
+    def __init__(self, path):
+        import duckdb
+
+        self.path = path
+        with open(os.path.join(path, SNAPSHOT_META)) as fh:
+            self.meta = json.load(fh)
+
+        started = time.perf_counter()
+        self._db = duckdb.connect()
+        files = os.path.join(path, "**", "*.parquet").replace("'", "''")
+        source = f"read_parquet('{files}', hive_partitioning = true)"
+        # Snapshots written before the loader derived columns get them computed in the view
+        present = {row[0] for row in self._db.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()}
+        select = [name if name in present else f"{DERIVED_EXPRESSIONS[name]} AS {name}" for name in TABLE_COLUMNS]
+        self._db.execute(f"CREATE VIEW traffic_stops AS SELECT {', '.join(select)} FROM {source}")
+
+        self._db.execute("CREATE TABLE data_version (id INT, version BIGINT, updated_at VARCHAR)")
+        self._db.execute("INSERT INTO data_version VALUES (1, ?, ?)",
+                         [self.meta.get("data_version") or 0, self.meta["created_at"]])
+
+        self._db.execute(dl.CREATE_ROLLUP_SQL)
+        self._db.execute("INSERT INTO traffic_stops_daily "
+                         + dl.ROLLUP_SELECT_SQL.format(where="WHERE stop_date IS NOT NULL"))
+        self._db.execute(dl.CREATE_PROFILE_SQL)
+        self._db.execute(dl.CREATE_VEHICLE_VIOLATIONS_SQL)
+        where = "WHERE vehicle_number IS NOT NULL"
+        self._db.execute("INSERT INTO vehicle_profiles " + dl.PROFILE_SELECT_SQL.format(where=where))
+        self._db.execute("INSERT INTO vehicle_violations " + dl.VEHICLE_VIOLATIONS_SELECT_SQL.format(where=where))
+        self.open_seconds = time.perf_counter() - started
+
+    def connect(self):
+        # One DuckDB cursor per pooled connection; they share the in-memory database
+        return _SnapshotConnection(self._db.cursor())
+
+# ------------------------------
+# MAIN
+# ------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export traffic_stops to a partitioned Parquet snapshot")
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], default="mysql")
+    parser.add_argument("--sqlite-path", default="securecheck.db")
+    parser.add_argument("--out", default="snapshot", help="snapshot directory (replaced if it exists)")
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    connection = dl.connect(args.backend, args.sqlite_path)
+    write_snapshot(connection, args.backend, args.out, args.chunksize)
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+# ------------------------------
+# STARTUP PROFILE
+# ------------------------------
+# How soon a freshly started dashboard shows something. Every run is a new
+# Python process, so every import is cold, like the first session after the
+# server starts. It renders Streamlit.py once with Streamlit's AppTest and
+# timestamps each element the script sends, measuring from the start of the run:
+# the title (first paint), the first filled KPI card, the first chart and the
+# end of the run. A second render in the same process shows a warm revisit.
+# Import times of the heavy modules are measured in their own cold processes.
+#
+#   python Startup_Profile.py --report startup.json
+#   python Startup_Profile.py --script old/Streamlit.py --report before.json
+#   python Startup_Profile.py --baseline before.json
+#
+# The dashboard's own settings apply (MySQL, or SECURECHECK_SNAPSHOT=<dir>).
+
+HEAVY_MODULES = ["streamlit", "pandas", "plotly.express", "pyarrow", "pymysql"]
+MARKS = ["first_paint_ms", "kpis_ms", "first_chart_ms", "done_ms"]
+KPI_PLACEHOLDER = "…"
+
+# ------------------------------
+# COLD IMPORTS
+# ------------------------------
+
+def import_ms(module):
+    # Milliseconds to import module in a fresh interpreter
+    code = f"import time; t = time.perf_counter(); import {module}; print((time.perf_counter() - t) * 1000)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    return round(float(out.stdout.strip().splitlines()[-1]), 1) if out.returncode == 0 else None
+
+# ------------------------------
+# RENDER MARKS
+# ------------------------------
+
+def _marks(events, started, ended):
+    # events: (timestamp, element type, element) in the order the script sent them
+    def first(test):
+        for ts, kind, element in events:
+            if test(kind, element):
+                return round((ts - started) * 1000, 1)
+        return None
+
+    return {
+        "first_paint_ms": first(lambda kind, element: kind == "heading"),
+        "kpis_ms": first(lambda kind, element: kind == "metric" and element.metric.body != KPI_PLACEHOLDER),
+        "first_chart_ms": first(lambda kind, element: kind == "plotly_chart"),
+        "done_ms": round((ended - started) * 1000, 1),
+    }
+
+
+def render_marks(script, section=None, renders=2):
+    # Runs in the child process: the first render is cold, the later ones warm
+    from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext
+    from streamlit.testing.v1 import AppTest
+
+    events = []
+    enqueue = ScriptRunContext.enqueue
+
+    def timed_enqueue(self, msg):
+        if msg.WhichOneof("type") == "delta" and msg.delta.WhichOneof("type") == "new_element":
+            element = msg.delta.new_element
+            events.append((time.perf_counter(), element.WhichOneof("type"), element))
+        enqueue(self, msg)
+
+    ScriptRunContext.enqueue = timed_enqueue
+    results = []
+    for _ in range(renders):
+        events.clear()
+        app = AppTest.from_file(script, default_timeout=300)
+        if section:
+            app.session_state["section"] = section
+        started = time.perf_counter()
+        app.run()
+        ended = time.perf_counter()
+        marks = _marks(events, started, ended)
+        marks["exceptions"] = [str(e.value) for e in app.exception]
+        results.append(marks)
+    return results
+
+
+def profile_process(script, section):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", "--script", script]
+                         + (["--section", section] if section else []),
+                         capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(f"profiling {script} failed:\n{out.stderr[-2000:]}")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def median_marks(runs):
+    return {mark: (round(statistics.median(values), 1) if values else None)
+            for mark in MARKS
+            for values in [[run[mark] for run in runs if run[mark] is not None]]}
+
+# ------------------------------
+# MAIN
+# ------------------------------
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Profile the dashboard's imports and time to first paint")
+    parser.add_argument("--script", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "Streamlit.py"))
+    parser.add_argument("--section", help="open this dashboard section (default: the first)")
+    parser.add_argument("--runs", type=int, default=3, help="cold processes to profile (median is reported)")
+    parser.add_argument("--report", default="startup_profile.json")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.child:
+        print(json.dumps(render_marks(args.script, args.section)))
+        return
+
+    processes = []
+    for run in range(args.runs):
+        processes.append(profile_process(args.script, args.section))
+        print(f"  run {run + 1}/{args.runs}: {processes[-1][0]}")
+    exceptions = sorted({e for renders in processes for render in renders for e in render["exceptions"]})
+    report = {
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "script": args.script,
+        "section": args.section,
+        "runs": args.runs,
+        "imports_ms": {module: import_ms(module) for module in HEAVY_MODULES},
+        "cold": median_marks([renders[0] for renders in processes]),
+        "warm": median_marks([renders[-1] for renders in processes]),
+        "exceptions": exceptions,
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+    print(f"{'import':<24}{'ms':>10}" + (f"{'baseline':>10}" if baseline else ""))
+    for module, ms in report["imports_ms"].items():
+        print(f"{module:<24}{ms if ms is not None else '-':>10}"
+              + (f"{baseline['imports_ms'].get(module) or '-':>10}" if baseline else ""))
+    for render in ["cold", "warm"]:
+        print(f"{render + ' render':<24}{'ms':>10}" + (f"{'baseline':>10}" if baseline else ""))
+        for mark in MARKS:
+            value = report[render][mark]
+            print(f"  {mark:<22}{value if value is not None else '-':>10}"
+                  + (f"{baseline[render].get(mark) or '-':>10}" if baseline else ""))
+    if exceptions:
+        print(f"Dashboard raised: {exceptions}")
+
+    with open(args.report, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
+import time
+script_started = time.perf_counter()
+render_started = time.time()
+
 import streamlit as st
-import pandas as pd
-import pymysql 
+import logging
+import os
+import threading
 from datetime import datetime, date, timedelta
-import plotly.express as px
 
 # -----------------------------
 # PAGE CONFIGURATION & STYLE
@@ -23,44 +27,181 @@ page_bg = """
 st.markdown(page_bg, unsafe_allow_html=True)
 st.title("🚓 SecureCheck Traffic Stop Dashboard")
 
+# -----------------------------
+# PAGE SKELETON
+# -----------------------------
+# Drawn before the heavy imports and any query, so the layout is on screen at
+# once. The placeholders are filled in order: sidebar filters, KPI cards, then
+# each panel of the open section as its own query returns.
+KPI_PLACEHOLDER = "…"
+st.subheader("📊 Key Metrics")
+kpi_cards = [col.empty() for col in st.columns(3)]
+for card, label in zip(kpi_cards, ["Total Logs", "Total Violations", "High-Risk Vehicles"]):
+    card.metric(label, KPI_PLACEHOLDER)
+kpi_note = st.empty()
+st.write("---")
+section_picker = st.container()
+section_area = st.container()
+section_skeleton = section_area.empty()
+section_skeleton.info("Loading panels…")
+render_profile = {"first_paint_ms": round((time.perf_counter() - script_started) * 1000, 1)}
+
+# pandas (through the dashboard modules) alone takes longer to import than the skeleton takes to draw
+import pandas as pd
+
+from Dashboard_Db import (
+    EXPORT_FORMATS, WARM_UP, ConnectionPool, QueryCache, cached_query, explain, export_file, filter_options,
+    keep_warm, panel_summary, prometheus_text, read_changes, read_data_version, search_vehicles, submit_many,
+    sync_data_version, timings_frame, touches, vehicle_profile,
+)
+from Analytics_Engine import compute, prepare_slice, slice_query
+from Analytics_Engine import kpis as engine_kpis
+from Dashboard_Render import (
+    PAYLOAD_BUDGET, TABLE_PAGE_SIZE, MAX_CATEGORIES, MAX_FACETS, LazyModule, cap_categories, downsample_series,
+    figure_bytes, page_count, paginate, payload_summary, record_payload, table_bytes,
+)
+from Dashboard_Queries import (
+    PANEL_ROW_FLAGS, ROLLUP_QUERIES, build_filters, export_query, filter_scope, kpi_query, query, rollup_query,
+)
+
+px = LazyModule("plotly.express")   # imported by the first chart, after the KPI cards are filled
+
 # -----------------------------
 # DATABASE FUNCTION
 # -----------------------------
-def get_data(query, params=None):
-    conn = pymysql.connect(
-        host="localhost",
-        user="root",
-        password="7654321",
-        database="SecureCheck",
-        port=3306
-    )
-    df = pd.read_sql(query, conn, params=params)
-    conn.close()
-    return df
+@st.cache_resource
+def get_snapshot():
+    # SECURECHECK_SNAPSHOT=<dir> serves the dashboard from a Parquet snapshot via DuckDB, no MySQL needed
+    path = os.environ.get("SECURECHECK_SNAPSHOT")
+    if not path:
+        return None
+    from Snapshot_Store import SnapshotStore
+    return SnapshotStore(path)
+
+@st.cache_resource
+def get_pool():
+    # Shared by every session of this server process
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        return ConnectionPool(connect=snapshot.connect, max_size=5)
+    return ConnectionPool(max_size=5)
+
+@st.cache_resource
+def get_cache():
+    return QueryCache(ttl=300, max_bytes=64 * 1024 * 1024)
+
+@st.cache_resource
+def get_query_log():
+    # SECURECHECK_QUERY_LOG=<file> appends one JSON line per dashboard query
+    path = os.environ.get("SECURECHECK_QUERY_LOG")
+    if path:
+        handler = logging.FileHandler(path)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger = logging.getLogger("securecheck.queries")
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    return path
+
+@st.cache_resource
+def start_warm_up():
+    # Once per server process: keeps the default view in the shared cache (Dashboard_Db.keep_warm)
+    thread = threading.Thread(target=keep_warm, args=(get_pool(), get_cache()), name="securecheck-warm-up",
+                              daemon=True)
+    thread.start()
+    return thread
+
+def get_data(query, params=None, panel=None):
+    return cached_query(get_pool(), get_cache(), query, params, panel=panel, scope=panel_scope(panel))
+
+def csv_download(df):
+    # Deferred: the CSV is only built when the download button is clicked
+    return lambda: df.to_csv(index=False).encode('utf-8')
+
+def show_table(panel, df):
+    # Server-side paging: only the visible page of a long result goes to the browser
+    pages = page_count(len(df))
+    if pages == 1:
+        st.dataframe(df)
+        return df
+    key = f"page_{panel}"
+    if st.session_state.get(key, 1) > pages:
+        st.session_state[key] = 1   # filters shrank the result
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=key)
+    shown = paginate(df, page)
+    first = (page - 1) * TABLE_PAGE_SIZE + 1
+    st.caption(f"Rows {first}–{first + len(shown) - 1} of {len(df)}")
+    st.dataframe(shown)
+    return shown
+
+def show_chart(panel, fig, shown, rows):
+    st.plotly_chart(fig, use_container_width=True)
+    total = record_payload(panel, table_bytes(shown), figure_bytes(fig, panel, rows), rows, len(shown))
+    if total > PAYLOAD_BUDGET:
+        st.caption(f"⚠️ {panel} sent {total / 1024:.0f} KB, over its {PAYLOAD_BUDGET / 1024:.0f} KB budget")
 
-def convert_df_to_csv(df):
-    return df.to_csv(index=False).encode('utf-8')
+# -----------------------------
+# LIVE REFRESH
+# -----------------------------
+LIVE_REFRESH_SECONDS = 5
+
+def live_status():
+    # Runs on its own every LIVE_REFRESH_SECONDS while live refresh is on: a cheap
+    # data_version read, and a full rerun only when new data touches this view
+    seen = st.session_state.get("live_seen_version", data_version)
+    version = read_data_version(get_pool())
+    if version != seen:
+        changes = read_changes(get_pool(), seen, version)
+        st.session_state["live_seen_version"] = version
+        if changes is None or any(touches(change, view_scope) for change in changes):
+            st.rerun()
+    refreshed = st.session_state.get("refreshed_panels")
+    if refreshed and refreshed[0] == data_version:
+        st.caption(f"Data version {version}: refreshed {len(refreshed[1])} panels, kept {refreshed[2]}")
+    else:
+        st.caption(f"Data version {version}, checked {datetime.now():%H:%M:%S}")
+
+get_query_log()
+start_warm_up()
+
+# Drop the cached results that data committed by the loader since the last rerun can change
+data_version = sync_data_version(get_pool(), get_cache())
 
 # -----------------------------
 # SIDEBAR FILTERS
 # -----------------------------
 st.sidebar.header("🔎 Filters")
 
-vehicle_options = get_data("SELECT DISTINCT vehicle_number FROM traffic_stops")['vehicle_number'].tolist()
-selected_vehicles = st.sidebar.multiselect("Select Vehicle(s)", options=vehicle_options)
+max_parallel = st.sidebar.slider(
+    "Parallel queries", min_value=1, max_value=get_pool().max_size, value=4,
+    help="How many dashboard queries may run against the database at the same time",
+)
 
-violation_options = get_data("SELECT DISTINCT violation FROM traffic_stops")['violation'].tolist()
+# Dimension dictionaries come from the process-wide cache (refreshed when the loader commits)
+options = filter_options(get_pool(), get_cache(), max_parallel)
+
+# Vehicle numbers: server-side prefix search, only matching plates reach the browser
+vehicle_prefix = st.sidebar.text_input("Search Vehicle Number", placeholder="Type the start of a plate")
+vehicle_matches = search_vehicles(get_pool(), get_cache(), vehicle_prefix, limit=50)
+vehicle_options = sorted(set(vehicle_matches) | set(st.session_state.get("selected_vehicles", [])))
+selected_vehicles = st.sidebar.multiselect("Select Vehicle(s)", options=vehicle_options, key="selected_vehicles")
+
+violation_options = options["violation_options"]
 selected_violations = st.sidebar.multiselect("Select Violation(s)", options=violation_options)
 
-gender_options = ["Male", "Female", "Other"]
+gender_options = options["gender_options"]   # the loader normalizes to M / F / Other
 selected_genders = st.sidebar.multiselect("Select Gender(s)", options=gender_options)
 
-race_options = get_data("SELECT DISTINCT driver_race FROM traffic_stops")['driver_race'].tolist()
+race_options = options["race_options"]
 selected_races = st.sidebar.multiselect("Select Race(s)", options=race_options)
 
-country_options = get_data("SELECT DISTINCT country_name FROM traffic_stops")['country_name'].tolist()
+country_options = options["country_options"]
 selected_countries = st.sidebar.multiselect("Select Country(s)", options=country_options)
 
+high_risk_threshold = st.sidebar.number_input(
+    "High-Risk Threshold (stops)", min_value=2, max_value=100, value=4,
+    help="A vehicle counts as high-risk once it has at least this many stops in the filtered range",
+)
+
 # Date range filter
 # Default date range from 2020 to today
 start_default = date(2020, 1, 1)
@@ -78,156 +219,170 @@ end_date = datetime.combine(date_range[1], datetime.max.time())
 # -----------------------------
 # BUILD FILTER SQL
 # -----------------------------
-filters = ["stop_date BETWEEN %s AND %s"]
-params = [start_date, end_date]
-
-if selected_vehicles:
-    filters.append("vehicle_number IN (%s)" % ",".join(["%s"]*len(selected_vehicles)))
-    params.extend(selected_vehicles)
-
-if selected_violations:
-    filters.append("violation IN (%s)" % ",".join(["%s"]*len(selected_violations)))
-    params.extend(selected_violations)
-
-if selected_genders:
-    filters.append("driver_gender IN (%s)" % ",".join(["%s"]*len(selected_genders)))
-    params.extend(selected_genders)
-
-if selected_races:
-    filters.append("driver_race IN (%s)" % ",".join(["%s"]*len(selected_races)))
-    params.extend(selected_races)
-
-if selected_countries:
-    filters.append("country_name IN (%s)" % ",".join(["%s"]*len(selected_countries)))
-    params.extend(selected_countries)
+selected_filters = dict(
+    vehicles=selected_vehicles,
+    violations=selected_violations,
+    genders=selected_genders,
+    races=selected_races,
+    countries=selected_countries,
+)
+filter_sql, params = build_filters(start_date, end_date, **selected_filters)
+view_scope = filter_scope(start_date, end_date, **selected_filters)
 
-filter_sql = "WHERE " + " AND ".join(filters)
+def panel_scope(name):
+    # What a panel's result depends on, to tell whether new data changes it
+    return dict(view_scope, flag=PANEL_ROW_FLAGS.get(name))
 
 # -----------------------------
-# KPI CARDS
+# PANEL DATA (SQL OR IN-MEMORY ENGINE)
 # -----------------------------
-st.subheader("📊 Key Metrics")
-col1, col2, col3 = st.columns(3)
-
-total_logs = get_data(f"SELECT COUNT(*) AS c FROM traffic_stops {filter_sql}", params)['c'][0]
-col1.metric("Total Logs", total_logs)
-
-total_violations = get_data(f"SELECT COUNT(*) AS c FROM traffic_stops {filter_sql} AND violation IS NOT NULL AND violation != ''", params)['c'][0]
-col2.metric("Total Violations", total_violations)
-
-high_risk = get_data(f"""
-SELECT COUNT(*) AS c 
-FROM (
-    SELECT vehicle_number 
-    FROM traffic_stops
-    {filter_sql}
-    GROUP BY vehicle_number
-    HAVING COUNT(*) >= 4
-) AS t
-""", params)['c'][0]
-col3.metric("High-Risk Vehicles", high_risk)
+use_engine = st.sidebar.toggle(
+    "⚡ In-memory analytics engine",
+    help="Fetch the filtered slice once and compute every panel in-process instead of one SQL query per panel",
+)
+use_rollup = st.sidebar.toggle(
+    "🧊 Answer from daily rollup", value=True,
+    help="Aggregate panels read the pre-aggregated traffic_stops_daily table when no vehicle filter is set",
+)
+live_refresh = st.sidebar.toggle(
+    "🔄 Live refresh",
+    help=f"Check every {LIVE_REFRESH_SECONDS}s for data committed by the loader (Data_Load.py --watch) and "
+         "refresh the panels it changes",
+)
 
-st.write("---")
+def panel_sql(name):
+    if use_rollup and not selected_vehicles and name in ROLLUP_QUERIES:
+        return rollup_query(name, filter_sql)
+    return query(name, filter_sql)
+
+# Panel results are memoized per filter state: switching sections, or reruns that
+# leave the filters alone, reuse them instead of recomputing
+filter_state = (filter_sql, tuple(params), use_engine, use_rollup)
+if st.session_state.get("panel_memo_state") != filter_state:
+    st.session_state["panel_memo_state"] = filter_state
+    st.session_state["panel_memo"] = {}
+    st.session_state["panel_memo_version"] = data_version
+panel_memo = st.session_state["panel_memo"]
+
+# New data since the memo was filled: drop only the panels it can change (all of
+# them when the loader did not publish what changed) and keep the rest
+memo_version = st.session_state["panel_memo_version"]
+if memo_version != data_version:
+    changes = read_changes(get_pool(), memo_version, data_version)
+    stale = [name for name in panel_memo
+             if changes is None or any(touches(change, panel_scope(name)) for change in changes)]
+    for name in stale:
+        del panel_memo[name]
+    st.session_state["panel_memo_version"] = data_version
+    st.session_state["refreshed_panels"] = (data_version, stale, len(panel_memo))
+
+st.session_state["live_seen_version"] = data_version
+with st.sidebar:
+    st.fragment(live_status, run_every=LIVE_REFRESH_SECONDS if live_refresh else None)()
+
+def engine_slice():
+    if "slice" not in panel_memo:
+        panel_memo["slice"] = prepare_slice(get_data(slice_query(filter_sql), params, panel="engine_slice"))
+    return panel_memo["slice"]
+
+panel_futures = {}
+
+def prefetch(names):
+    # Start the given deferred panels' queries, all in flight at once; panel_data
+    # then waits only for the panel it draws, so each one shows as soon as it is ready
+    missing = [name for name in names if name not in panel_memo]
+    if use_engine:
+        for name in missing:
+            panel_memo[name] = compute(name, engine_slice())
+        return
+    panel_futures.update(submit_many(get_pool(), get_cache(), {name: (panel_sql(name), params) for name in missing},
+                                     max_parallel, scopes={name: panel_scope(name) for name in missing}))
+
+def panel_data(name):
+    if name not in panel_memo and name in panel_futures:
+        try:
+            panel_memo[name] = panel_futures.pop(name).result()
+        except Exception:
+            pass    # handled below
+    if name not in panel_memo:
+        if use_engine:
+            panel_memo[name] = compute(name, engine_slice())
+        else:
+            # Prefetch failed, e.g. rollup table missing (loader not run since it was added): use the raw table
+            panel_memo[name] = get_data(query(name, filter_sql), params, panel=name)
+    return panel_memo[name]
 
 # -----------------------------
-# TABS FOR ANALYTICS
+# KPI CARDS
 # -----------------------------
-tabs = st.tabs([
-    "Vehicle Analytics", "Time & Duration", "Demographics", 
-    "Violations", "Location-Based", "Advanced Analytics"
-])
+def fill_kpis():
+    # All three cards come from one fused scan (or one engine pass), memoized per filter state
+    kpi_key = f"kpis:{high_risk_threshold}"
+    kpi_started = time.perf_counter()
+    if kpi_key not in panel_memo:
+        if use_engine:
+            panel_memo[kpi_key] = engine_kpis(engine_slice(), high_risk_threshold)
+        else:
+            panel_memo[kpi_key] = get_data(kpi_query(filter_sql, high_risk_threshold), params, panel="kpis")
+    kpis = panel_memo[kpi_key]
+    kpi_ms = (time.perf_counter() - kpi_started) * 1000
+
+    kpi_cards[0].metric("Total Logs", int(kpis['total_logs'][0]))
+    kpi_cards[1].metric("Total Violations", int(kpis['total_violations'][0]))
+    kpi_cards[2].metric(f"High-Risk Vehicles (≥{high_risk_threshold} stops)", int(kpis['high_risk_vehicles'][0]))
+    kpi_note.caption(f"Key metrics computed in a single scan in {kpi_ms:.0f} ms")
 
 # -----------------------------
 # TAB 1: Vehicle-Based Analytics
 # -----------------------------
-with tabs[0]:
+def render_vehicle_analytics():
     st.subheader("🚗 Vehicle-Based Analytics")
     
     # Top 10 vehicles in drug-related stops
-    df_drug = get_data(f"""
-    SELECT vehicle_number, COUNT(*) AS drug_stop_count
-    FROM traffic_stops
-    {filter_sql} AND drugs_related_stop = 1
-    GROUP BY vehicle_number
-    ORDER BY drug_stop_count DESC
-    LIMIT 10
-    """, params)
+    df_drug = panel_data("drug_vehicles")
     st.write("**Top 10 Vehicles Involved in Drug-Related Stops**")
-    st.dataframe(df_drug)
-    st.download_button("Download CSV", convert_df_to_csv(df_drug), file_name="drug_stops.csv")
+    df_drug_page = show_table("drug_vehicles", df_drug)
+    st.download_button("Download CSV", csv_download(df_drug), file_name="drug_stops.csv")
     fig_drug = px.bar(df_drug, x='vehicle_number', y='drug_stop_count', text='drug_stop_count', title="Drug-Related Stops")
-    st.plotly_chart(fig_drug, use_container_width=True)
+    show_chart("drug_vehicles", fig_drug, df_drug_page, len(df_drug))
 
     # Most frequently searched vehicles
-    df_search = get_data(f"""
-    SELECT vehicle_number, COUNT(*) AS search_count
-    FROM traffic_stops
-    {filter_sql} AND search_conducted = 1
-    GROUP BY vehicle_number
-    ORDER BY search_count DESC
-    LIMIT 10
-    """, params)
+    df_search = panel_data("searched_vehicles")
     st.write("**Most Frequently Searched Vehicles**")
-    st.dataframe(df_search)
-    st.download_button("Download CSV", convert_df_to_csv(df_search), file_name="frequent_searches.csv")
+    df_search_page = show_table("searched_vehicles", df_search)
+    st.download_button("Download CSV", csv_download(df_search), file_name="frequent_searches.csv")
     fig_search = px.bar(df_search, x='vehicle_number', y='search_count', text='search_count', title="Most Frequently Searched Vehicles")
-    st.plotly_chart(fig_search, use_container_width=True)
+    show_chart("searched_vehicles", fig_search, df_search_page, len(df_search))
 
 # -----------------------------
 # TAB 2: Time & Duration Analytics
 # -----------------------------
-with tabs[1]:
+def render_time_duration():
     st.subheader("🕒 Time & Duration Analytics")
     
     # Traffic stops by hour
-    df_time = get_data(f"""
-    SELECT HOUR(stop_time) AS hour_of_day, COUNT(*) AS stop_count
-    FROM traffic_stops
-    {filter_sql}
-    GROUP BY hour_of_day
-    ORDER BY stop_count DESC
-    """, params)
+    df_time = panel_data("stops_by_hour")
     st.write("**Traffic Stops by Hour of the Day**")
-    st.dataframe(df_time)
+    df_time_page = show_table("stops_by_hour", df_time)
     fig_time = px.bar(df_time, x='hour_of_day', y='stop_count', text='stop_count', title="Traffic Stops by Hour")
-    st.plotly_chart(fig_time, use_container_width=True)
+    show_chart("stops_by_hour", fig_time, df_time_page, len(df_time))
 
     # Average stop duration by violation
-    df_duration = get_data(f"""
-    SELECT violation, ROUND(AVG(stop_duration),2) AS avg_duration
-    FROM traffic_stops
-    {filter_sql}
-    GROUP BY violation
-    ORDER BY avg_duration DESC
-    """, params)
+    df_duration = panel_data("duration_by_violation")
     st.write("**Average Stop Duration by Violation**")
-    st.dataframe(df_duration)
+    df_duration_page = show_table("duration_by_violation", df_duration)
     fig_duration = px.bar(df_duration, x='violation', y='avg_duration', text='avg_duration', title="Average Stop Duration")
-    st.plotly_chart(fig_duration, use_container_width=True)
+    show_chart("duration_by_violation", fig_duration, df_duration_page, len(df_duration))
 
     # -------------------------------------------
     # NEW ANALYTIC → Are Night Stops More Likely to Lead to Arrests?
     # -------------------------------------------
     st.subheader("🌙 Night-Time vs Day-Time Arrest Rates")
 
-    df_night_arrest = get_data(f"""
-    SELECT
-        CASE
-            WHEN HOUR(stop_time) BETWEEN 20 AND 23 THEN 'Night (8 PM–11 PM)'
-            WHEN HOUR(stop_time) BETWEEN 0 AND 5 THEN 'Night (12 AM–5 AM)'
-            ELSE 'Daytime (6 AM–7 PM)'
-        END AS time_period,
-        COUNT(*) AS total_stops,
-        SUM(is_arrested) AS total_arrests,
-        ROUND(SUM(is_arrested) / COUNT(*) * 100, 2) AS arrest_rate_percent
-    FROM traffic_stops
-    {filter_sql}
-    GROUP BY time_period
-    ORDER BY arrest_rate_percent DESC;
-    """, params)
+    df_night_arrest = panel_data("night_arrest_rate")
 
     st.write("**Arrest Rate by Time of Day**")
-    st.dataframe(df_night_arrest)
+    df_night_arrest_page = show_table("night_arrest_rate", df_night_arrest)
 
     # Chart
     fig_night_arrest = px.bar(
@@ -237,7 +392,7 @@ with tabs[1]:
         text="arrest_rate_percent",
         title="Arrest Rate (%) by Time of Day",
     )
-    st.plotly_chart(fig_night_arrest, use_container_width=True)
+    show_chart("night_arrest_rate", fig_night_arrest, df_night_arrest_page, len(df_night_arrest))
 
     # Interpretation highlight
     if not df_night_arrest.empty:
@@ -251,65 +406,33 @@ with tabs[1]:
 # -----------------------------
 # TAB 3: Demographics
 # -----------------------------
-with tabs[2]:
+def render_demographics():
     st.subheader("🧍 Demographic-Based Analytics")
     
     # Arrests by age group
-    df_age = get_data(f"""
-    SELECT 
-        CASE
-            WHEN driver_age < 18 THEN 'Under 18'
-            WHEN driver_age BETWEEN 18 AND 25 THEN '18-25'
-            WHEN driver_age BETWEEN 26 AND 35 THEN '26-35'
-            WHEN driver_age BETWEEN 36 AND 45 THEN '36-45'
-            WHEN driver_age BETWEEN 46 AND 60 THEN '46-60'
-            ELSE '60+'
-        END AS driver_age_group,
-        COUNT(*) AS arrests
-    FROM traffic_stops
-    {filter_sql} AND is_arrested = 1
-    GROUP BY driver_age_group
-    ORDER BY arrests DESC
-    LIMIT 10
-    """, params)
+    df_age = panel_data("arrests_by_age_group")
     st.write("**Driver Age Group with Highest Arrest Rate**")
-    st.dataframe(df_age)
+    df_age_page = show_table("arrests_by_age_group", df_age)
     fig_age = px.bar(df_age, x='driver_age_group', y='arrests', text='arrests', title="Arrests by Age Group")
-    st.plotly_chart(fig_age, use_container_width=True)
+    show_chart("arrests_by_age_group", fig_age, df_age_page, len(df_age))
 
     # Gender distribution by country
-    df_gender_country = get_data(f"""
-    SELECT country_name AS country, driver_gender, COUNT(*) AS stop_count
-    FROM traffic_stops
-    {filter_sql}
-    GROUP BY country, driver_gender
-    ORDER BY stop_count DESC
-    """, params)
+    df_gender_country = panel_data("gender_by_country")
     st.write("**Gender Distribution of Drivers Stopped by Country**")
-    st.dataframe(df_gender_country)
-    fig_gender_country = px.bar(df_gender_country, x='country', y='stop_count', color='driver_gender', barmode='stack', title="Gender Distribution by Country")
-    st.plotly_chart(fig_gender_country, use_container_width=True)
+    df_gender_country_page = show_table("gender_by_country", df_gender_country)
+    chart_gender_country = cap_categories(df_gender_country, "country", measures=["stop_count"])
+    fig_gender_country = px.bar(chart_gender_country, x='country', y='stop_count', color='driver_gender', barmode='stack', title="Gender Distribution by Country")
+    show_chart("gender_by_country", fig_gender_country, df_gender_country_page, len(df_gender_country))
 
     # -------------------------------------------
     # NEW ANALYTIC → Race and Gender Highest Search Rate
     # -------------------------------------------
     st.subheader("🔍 Race × Gender Search Rate Analysis")
 
-    df_race_gender = get_data(f"""
-    SELECT 
-        driver_race,
-        driver_gender,
-        COUNT(*) AS total_stops,
-        SUM(search_conducted) AS total_searches,
-        ROUND(SUM(search_conducted) / COUNT(*) * 100, 2) AS search_rate_percent
-    FROM traffic_stops
-    {filter_sql}
-    GROUP BY driver_race, driver_gender
-    ORDER BY search_rate_percent DESC
-    """, params)
+    df_race_gender = panel_data("race_gender_search_rate")
 
     st.write("**Search Rate by Race & Gender Combination**")
-    st.dataframe(df_race_gender)
+    df_race_gender_page = show_table("race_gender_search_rate", df_race_gender)
 
     # Highlight the highest search-rate combination
     if not df_race_gender.empty:
@@ -320,8 +443,10 @@ with tabs[2]:
         )
 
     # Bar chart
+    chart_race_gender = cap_categories(df_race_gender, "driver_race", measures=["total_stops", "total_searches"],
+                                       rates={"search_rate_percent": ("total_searches", "total_stops")})
     fig_race_gender = px.bar(
-        df_race_gender,
+        chart_race_gender,
         x="driver_race",
         y="search_rate_percent",
         color="driver_gender",
@@ -329,50 +454,32 @@ with tabs[2]:
         barmode="group",
         title="Search Rate (%) by Race & Gender"
     )
-    st.plotly_chart(fig_race_gender, use_container_width=True)
+    show_chart("race_gender_search_rate", fig_race_gender, df_race_gender_page, len(df_race_gender))
 
 
 
 # -----------------------------
 # TAB 4: Violation-Based Analytics
 # -----------------------------
-with tabs[3]:
+def render_violations():
     st.subheader("⚖️ Violation-Based Analytics")
     
     # Violations vs Searches & Arrests
-    df_violation_search_arrest = get_data(f"""
-    SELECT violation, 
-           SUM(search_conducted) AS total_searches,
-           SUM(is_arrested) AS total_arrests
-    FROM traffic_stops
-    {filter_sql}
-    GROUP BY violation
-    ORDER BY total_searches DESC, total_arrests DESC
-    LIMIT 10
-    """, params)
+    df_violation_search_arrest = panel_data("violation_search_arrest")
     st.write("**Violations Most Associated with Searches or Arrests**")
-    st.dataframe(df_violation_search_arrest)
+    df_violation_search_arrest_page = show_table("violation_search_arrest", df_violation_search_arrest)
     fig_violation = px.bar(df_violation_search_arrest, x='violation', y=['total_searches','total_arrests'], barmode='group', title="Violations vs Searches & Arrests")
-    st.plotly_chart(fig_violation, use_container_width=True)
+    show_chart("violation_search_arrest", fig_violation, df_violation_search_arrest_page, len(df_violation_search_arrest))
 
     # -------------------------------------------
     # NEW ANALYTIC → Top Violations Among Younger Drivers (<25)
     # -------------------------------------------
     st.subheader("🧑‍🧒 Top Violations Among Younger Drivers (<25 Years)")
 
-    df_young_violations = get_data(f"""
-    SELECT 
-        violation, 
-        COUNT(*) AS violation_count
-    FROM traffic_stops
-    {filter_sql} AND driver_age < 25
-    GROUP BY violation
-    ORDER BY violation_count DESC
-    LIMIT 10;
-    """, params)
+    df_young_violations = panel_data("young_driver_violations")
 
     st.write("**Most Common Violations for Drivers Under 25**")
-    st.dataframe(df_young_violations)
+    df_young_violations_page = show_table("young_driver_violations", df_young_violations)
 
     # Chart
     fig_young_violations = px.bar(
@@ -382,53 +489,40 @@ with tabs[3]:
         text="violation_count",
         title="Top Violations Among Younger Drivers (<25)"
     )
-    st.plotly_chart(fig_young_violations, use_container_width=True)
+    show_chart("young_driver_violations", fig_young_violations, df_young_violations_page, len(df_young_violations))
 
 
 # -----------------------------
 # TAB 5: Location-Based Analytics
 # -----------------------------
-with tabs[4]:
+def render_location_based():
     st.subheader("🌍 Location-Based Analytics")
     
     # Drug-related stops by country
-    df_country_drug = get_data(f"""
-    SELECT country_name AS country, COUNT(*) AS drug_stop_count
-    FROM traffic_stops
-    {filter_sql} AND drugs_related_stop = 1
-    GROUP BY country
-    ORDER BY drug_stop_count DESC
-    LIMIT 10
-    """, params)
+    df_country_drug = panel_data("drug_stops_by_country")
     st.write("**Countries Reporting Highest Rate of Drug-Related Stops**")
-    st.dataframe(df_country_drug)
+    df_country_drug_page = show_table("drug_stops_by_country", df_country_drug)
     fig_country_drug = px.bar(df_country_drug, x='country', y='drug_stop_count', text='drug_stop_count', title="Drug-Related Stops by Country")
-    st.plotly_chart(fig_country_drug, use_container_width=True)
+    show_chart("drug_stops_by_country", fig_country_drug, df_country_drug_page, len(df_country_drug))
 
     # -------------------------------------------
     # NEW ANALYTIC → Arrest Rate by Country & Violation
     # -------------------------------------------
     st.subheader("🚨 Arrest Rate by Country and Violation")
 
-    df_country_violation_arrest = get_data(f"""
-    SELECT
-        country_name AS country,
-        violation,
-        COUNT(*) AS total_stops,
-        SUM(is_arrested) AS total_arrests,
-        ROUND(SUM(is_arrested)/COUNT(*)*100, 2) AS arrest_rate_percent
-    FROM traffic_stops
-    {filter_sql}
-    GROUP BY country, violation
-    ORDER BY arrest_rate_percent DESC;
-    """, params)
+    df_country_violation_arrest = panel_data("country_violation_arrest_rate")
 
     st.write("**Arrest Rate (%) by Country & Violation**")
-    st.dataframe(df_country_violation_arrest)
+    df_country_violation_arrest_page = show_table("country_violation_arrest_rate", df_country_violation_arrest)
 
     # Bar Chart
+    # Long tails of violations / countries fold into "Other", with the arrest rate recomputed
+    arrest_rate = {"arrest_rate_percent": ("total_arrests", "total_stops")}
+    chart_country_violation_arrest = cap_categories(
+        cap_categories(df_country_violation_arrest, "violation", measures=["total_stops", "total_arrests"], rates=arrest_rate),
+        "country", measures=["total_stops", "total_arrests"], rates=arrest_rate)
     fig_country_violation_arrest = px.bar(
-        df_country_violation_arrest,
+        chart_country_violation_arrest,
         x="country",
         y="arrest_rate_percent",
         color="violation",
@@ -436,25 +530,17 @@ with tabs[4]:
         title="Arrest Rate (%) by Country and Violation",
         barmode="group"
     )
-    st.plotly_chart(fig_country_violation_arrest, use_container_width=True)
+    show_chart("country_violation_arrest_rate", fig_country_violation_arrest, df_country_violation_arrest_page, len(df_country_violation_arrest))
 
     # -------------------------------------------
     # NEW ANALYTIC → Country with Most Search-Conducted Stops
     # -------------------------------------------
     st.subheader("🔍 Country with the Most Search-Conducted Stops")
 
-    df_country_search = get_data(f"""
-    SELECT 
-        country_name AS country,
-        COUNT(*) AS total_search_stops
-    FROM traffic_stops
-    {filter_sql} AND search_conducted = 1
-    GROUP BY country
-    ORDER BY total_search_stops DESC;
-    """, params)
+    df_country_search = panel_data("country_searches")
 
     st.write("**Total Search-Conducted Stops by Country**")
-    st.dataframe(df_country_search)
+    df_country_search_page = show_table("country_searches", df_country_search)
 
     # Highlight the top country
     if not df_country_search.empty:
@@ -466,159 +552,251 @@ with tabs[4]:
 
     # Chart
     fig_country_search = px.bar(
-        df_country_search,
+        cap_categories(df_country_search, "country", measures=["total_search_stops"]),
         x="country",
         y="total_search_stops",
         text="total_search_stops",
         title="Search-Conducted Stops by Country"
     )
-    st.plotly_chart(fig_country_search, use_container_width=True)
+    show_chart("country_searches", fig_country_search, df_country_search_page, len(df_country_search))
 
 
 # -----------------------------
 # TAB 6: Advanced Analytics
 # -----------------------------
-with tabs[5]:
+def render_advanced_analytics():
     st.subheader("📊 Advanced Analytics")
 
     # 1️⃣ Yearly Breakdown of Stops & Arrests by Country
     st.markdown("**1️⃣ Yearly Breakdown of Stops & Arrests by Country**")
-    df_yearly = get_data(f"""
-    SELECT country_name AS country,
-           YEAR(stop_date) AS year,
-           COUNT(*) AS total_stops,
-           SUM(is_arrested) AS total_arrests
-    FROM traffic_stops
-    {filter_sql}
-    GROUP BY country, year
-    ORDER BY country, year
-    """, params)
-    st.dataframe(df_yearly)
-    fig_yearly = px.bar(df_yearly, x='year', y='total_stops', color='country', barmode='group', title="Yearly Stops by Country")
-    st.plotly_chart(fig_yearly, use_container_width=True)
+    df_yearly = panel_data("yearly_by_country")
+    df_yearly_page = show_table("yearly_by_country", df_yearly)
+    chart_yearly = cap_categories(df_yearly, "country", measures=["total_stops", "total_arrests"])
+    fig_yearly = px.bar(chart_yearly, x='year', y='total_stops', color='country', barmode='group', title="Yearly Stops by Country")
+    show_chart("yearly_by_country", fig_yearly, df_yearly_page, len(df_yearly))
 
     # 2️⃣ Driver Violation Trends by Age & Race
     st.markdown("**2️⃣ Driver Violation Trends by Age & Race**")
-    df_violation_trends = get_data(f"""
-    SELECT driver_race,
-           CASE
-               WHEN driver_age < 18 THEN 'Under 18'
-               WHEN driver_age BETWEEN 18 AND 25 THEN '18-25'
-               WHEN driver_age BETWEEN 26 AND 35 THEN '26-35'
-               WHEN driver_age BETWEEN 36 AND 45 THEN '36-45'
-               WHEN driver_age BETWEEN 46 AND 60 THEN '46-60'
-               ELSE '60+'
-           END AS driver_age_group,
-           violation,
-           COUNT(*) AS violation_count
-    FROM traffic_stops
-    {filter_sql}
-    GROUP BY driver_race, driver_age_group, violation
-    ORDER BY violation_count DESC
-    """, params)
-    st.dataframe(df_violation_trends)
-    fig_violation_trends = px.bar(df_violation_trends,
+    df_violation_trends = panel_data("violation_trends_age_race")
+    df_violation_trends_page = show_table("violation_trends_age_race", df_violation_trends)
+    # One facet per violation: keep the busiest MAX_FACETS, and the top races
+    chart_violation_trends = cap_categories(
+        cap_categories(df_violation_trends, "violation", MAX_FACETS, measures=["violation_count"]),
+        "driver_race", measures=["violation_count"])
+    fig_violation_trends = px.bar(chart_violation_trends,
                                   x='driver_age_group',
                                   y='violation_count',
                                   color='driver_race',
                                   facet_col='violation',
                                   title="Driver Violation Trends by Age & Race")
-    st.plotly_chart(fig_violation_trends, use_container_width=True)
+    show_chart("violation_trends_age_race", fig_violation_trends, df_violation_trends_page, len(df_violation_trends))
 
     # 3️⃣ Time Period Analysis: Stops by Year, Month, Hour
     st.markdown("**3️⃣ Time Period Analysis of Stops (Year, Month, Hour)**")
-    df_time_analysis = get_data(f"""
-    SELECT YEAR(stop_date) AS year,
-           MONTH(stop_date) AS month,
-           HOUR(stop_time) AS hour,
-           COUNT(*) AS stop_count
-    FROM traffic_stops
-    {filter_sql}
-    GROUP BY year, month, hour
-    ORDER BY year, month, hour
-    """, params)
-    st.dataframe(df_time_analysis)
-    fig_time_analysis = px.line(df_time_analysis,
+    df_time_analysis = panel_data("time_period_analysis")
+    df_time_analysis_page = show_table("time_period_analysis", df_time_analysis)
+    # One line per (month, year) grows with the years covered: past the point budget the
+    # years are summed, then hours bucketed
+    chart_time_analysis = downsample_series(df_time_analysis, "hour", "stop_count", ["month", "year"])
+    fig_time_analysis = px.line(chart_time_analysis,
                                 x='hour',
                                 y='stop_count',
                                 color='month',
-                                line_group='year',
+                                line_group='year' if 'year' in chart_time_analysis else None,
                                 title="Stops by Hour for Each Month")
-    st.plotly_chart(fig_time_analysis, use_container_width=True)
+    show_chart("time_period_analysis", fig_time_analysis, df_time_analysis_page, len(df_time_analysis))
 
     # 4️⃣ Violations with High Search & Arrest Rates
     st.markdown("**4️⃣ Violations with High Search & Arrest Rates**")
-    df_violation_high_rates = get_data(f"""
-    SELECT violation,
-           total_stops,
-           total_searches,
-           total_arrests,
-           ROUND(total_searches/total_stops*100,2) AS search_rate,
-           ROUND(total_arrests/total_stops*100,2) AS arrest_rate
-    FROM (
-        SELECT violation,
-               COUNT(*) AS total_stops,
-               SUM(search_conducted) AS total_searches,
-               SUM(is_arrested) AS total_arrests
-        FROM traffic_stops
-        {filter_sql}
-        GROUP BY violation
-    ) AS t
-    ORDER BY search_rate DESC, arrest_rate DESC
-    LIMIT 10
-    """, params)
-    st.dataframe(df_violation_high_rates)
+    df_violation_high_rates = panel_data("violation_high_rates")
+    df_violation_high_rates_page = show_table("violation_high_rates", df_violation_high_rates)
     fig_violation_high = px.bar(df_violation_high_rates,
                                 x='violation',
                                 y=['search_rate','arrest_rate'],
                                 barmode='group',
                                 title="Violations with High Search & Arrest Rates")
-    st.plotly_chart(fig_violation_high, use_container_width=True)
+    show_chart("violation_high_rates", fig_violation_high, df_violation_high_rates_page, len(df_violation_high_rates))
 
     # 5️⃣ Driver Demographics by Country (Age, Gender, Race)
     st.markdown("**5️⃣ Driver Demographics by Country**")
-    df_demographics_country = get_data(f"""
-    SELECT country_name AS country,
-           driver_gender,
-           driver_race,
-           CASE
-               WHEN driver_age < 18 THEN 'Under 18'
-               WHEN driver_age BETWEEN 18 AND 25 THEN '18-25'
-               WHEN driver_age BETWEEN 26 AND 35 THEN '26-35'
-               WHEN driver_age BETWEEN 36 AND 45 THEN '36-45'
-               WHEN driver_age BETWEEN 46 AND 60 THEN '46-60'
-               ELSE '60+'
-           END AS driver_age_group,
-           COUNT(*) AS count
-    FROM traffic_stops
-    {filter_sql}
-    GROUP BY country, driver_gender, driver_race, driver_age_group
-    ORDER BY count DESC
-    """, params)
-    st.dataframe(df_demographics_country)
-    fig_demographics_country = px.sunburst(df_demographics_country,
+    df_demographics_country = panel_data("demographics_by_country")
+    df_demographics_country_page = show_table("demographics_by_country", df_demographics_country)
+    chart_demographics_country = df_demographics_country
+    for level in ["country", "driver_race"]:
+        chart_demographics_country = cap_categories(chart_demographics_country, level, measures=["count"])
+    fig_demographics_country = px.sunburst(chart_demographics_country,
                                            path=['country','driver_gender','driver_race','driver_age_group'],
                                            values='count',
                                            title="Driver Demographics by Country")
-    st.plotly_chart(fig_demographics_country, use_container_width=True)
+    show_chart("demographics_by_country", fig_demographics_country, df_demographics_country_page, len(df_demographics_country))
 
     # 6️⃣ Top 5 Violations by Arrest Rate
     st.markdown("**6️⃣ Top 5 Violations by Arrest Rate**")
-    df_top_violations = get_data(f"""
-    SELECT violation,
-           COUNT(*) AS total_stops,
-           SUM(is_arrested) AS total_arrests,
-           ROUND(SUM(is_arrested)/COUNT(*)*100,2) AS arrest_rate_percent
-    FROM traffic_stops
-    {filter_sql}
-    GROUP BY violation
-    ORDER BY arrest_rate_percent DESC
-    LIMIT 5
-    """, params)
-    st.dataframe(df_top_violations)
+    df_top_violations = panel_data("top_violations_arrest_rate")
+    df_top_violations_page = show_table("top_violations_arrest_rate", df_top_violations)
     fig_top_violations = px.bar(df_top_violations,
                                 x='violation',
                                 y='arrest_rate_percent',
                                 text='arrest_rate_percent',
                                 title="Top 5 Violations by Arrest Rate")
-    st.plotly_chart(fig_top_violations, use_container_width=True)
+    show_chart("top_violations_arrest_rate", fig_top_violations, df_top_violations_page, len(df_top_violations))
+
+
+# -----------------------------
+# TAB 7: Vehicle Lookup
+# -----------------------------
+def render_vehicle_lookup():
+    st.subheader("🔎 Vehicle Lookup")
+
+    lookup_prefix = st.text_input("Vehicle number", key="lookup_prefix", placeholder="Type a vehicle number")
+    if not lookup_prefix.strip():
+        st.info("Enter a vehicle number to see its full stop history.")
+        return
+    matches = search_vehicles(get_pool(), get_cache(), lookup_prefix, limit=20)
+    if not matches:
+        st.warning("No vehicle matches that number.")
+        return
+    vehicle = st.selectbox("Matching vehicles", matches, key="lookup_vehicle")
+
+    lookup_started = time.perf_counter()
+    try:
+        lookup = vehicle_profile(get_pool(), get_cache(), vehicle)
+    except Exception as e:
+        st.error(f"Vehicle profiles unavailable (run Data_Load.py --rebuild-profiles): {e}")
+        return
+    lookup_ms = (time.perf_counter() - lookup_started) * 1000
+
+    profile = lookup["profile"]
+    if profile.empty:
+        st.warning("No profile stored for this vehicle yet.")
+        return
+    row = profile.iloc[0]
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Stops", int(row["stops"]))
+    c2.metric("Searches", int(row["searches"] or 0))
+    c3.metric("Arrests", int(row["arrests"] or 0))
+    c4.metric("Drug-Related Stops", int(row["drug_stops"] or 0))
+    st.write(f"First seen **{row['first_seen']}**, last seen **{row['last_seen']}**")
+    st.caption(f"Looked up in {lookup_ms:.0f} ms")
+
+    st.write("**Violations**")
+    st.dataframe(lookup["violations"])
+    st.write("**Stop History (latest first)**")
+    st.dataframe(lookup["history"])
+
+# -----------------------------
+# TAB 8: Performance
+# -----------------------------
+def render_performance():
+    st.subheader("⏱ Query Performance")
+    st.caption("Recent queries of every session on this server, slowest panels first (p95 of cache misses)")
+
+    summary = panel_summary()
+    if summary.empty:
+        st.info("No queries recorded yet.")
+        return
+    st.dataframe(summary)
+    slowest = summary.dropna(subset=["p95_ms"]).head(15)
+    if not slowest.empty:
+        fig_slow = px.bar(slowest, x="p95_ms", y="panel", orientation="h", title="Slowest Panels (p95 ms)")
+        fig_slow.update_layout(yaxis={"categoryorder": "total ascending"})
+        st.plotly_chart(fig_slow, use_container_width=True)
+
+    explain_panel = st.selectbox("Query plan for panel", summary["panel"].tolist(), key="explain_panel")
+    if st.button("Show EXPLAIN"):
+        try:
+            st.dataframe(explain(get_pool(), explain_panel))
+        except Exception as e:
+            st.error(f"EXPLAIN failed: {e}")
+
+    st.write(f"**Panel payloads** (budget {PAYLOAD_BUDGET / 1024:.0f} KB per panel)")
+    st.dataframe(payload_summary())
+
+    metrics_text = prometheus_text(get_cache(), get_pool())
+    st.download_button("Download Prometheus metrics", metrics_text.encode("utf-8"),
+                       file_name="securecheck_metrics.prom", mime="text/plain")
+    log_path = get_query_log()
+    if log_path:
+        st.caption(f"Structured query log: {log_path}")
+
+# -----------------------------
+# ANALYTICS SECTIONS (LAZY)
+# -----------------------------
+# Only the open section runs: its panels are prefetched together, the other
+# sections' queries never execute on this rerun
+SECTIONS = {
+    "Vehicle Analytics": (render_vehicle_analytics, [
+        "drug_vehicles", "searched_vehicles",
+    ]),
+    "Time & Duration": (render_time_duration, [
+        "stops_by_hour", "duration_by_violation", "night_arrest_rate",
+    ]),
+    "Demographics": (render_demographics, [
+        "arrests_by_age_group", "gender_by_country", "race_gender_search_rate",
+    ]),
+    "Violations": (render_violations, [
+        "violation_search_arrest", "young_driver_violations",
+    ]),
+    "Location-Based": (render_location_based, [
+        "drug_stops_by_country", "country_violation_arrest_rate", "country_searches",
+    ]),
+    "Advanced Analytics": (render_advanced_analytics, [
+        "yearly_by_country", "violation_trends_age_race", "time_period_analysis",
+        "violation_high_rates", "demographics_by_country", "top_violations_arrest_rate",
+    ]),
+    # Independent of the sidebar filters: reads the loader's vehicle profile tables
+    "Vehicle Lookup": (render_vehicle_lookup, []),
+    "Performance": (render_performance, []),
+}
+
+with section_picker:
+    selected_section = st.radio("Section", list(SECTIONS), horizontal=True, key="section",
+                                label_visibility="collapsed")
+render_section, section_panels = SECTIONS[selected_section]
+prefetch(section_panels)    # the section's queries run while the KPI cards are filled
+fill_kpis()
+render_profile["kpis_ms"] = round((time.perf_counter() - script_started) * 1000, 1)
+section_skeleton.empty()
+with section_area:
+    render_section()
+render_profile["section_ms"] = round((time.perf_counter() - script_started) * 1000, 1)
+
+
+# -----------------------------
+# EXPORT FILTERED RECORDS
+# -----------------------------
+# All raw rows matching the sidebar filters. Nothing runs until the button is
+# clicked; the rows are then streamed from the database into a compressed file.
+with st.sidebar.expander("📦 Export Filtered Records"):
+    export_format = st.radio("Format", list(EXPORT_FORMATS), horizontal=True, key="export_format")
+
+    def export_bytes(fmt=export_format, sql=export_query(filter_sql), export_params=tuple(params),
+                     version=get_cache().data_version):
+        with open(export_file(get_pool(), sql, list(export_params), fmt, version), "rb") as fh:
+            return fh.read()
+
+    st.download_button("Download records", export_bytes, file_name=f"traffic_stops.{export_format}",
+                       mime=EXPORT_FORMATS[export_format], key="export_download")
+    st.caption("Streams every stop in the current filters; large ranges take a while to prepare.")
+
+# -----------------------------
+# CONNECTION POOL, CACHE & QUERY TIMINGS
+# -----------------------------
+with st.sidebar.expander("⏱ Query Timings & Cache"):
+    render_timings = timings_frame(since=render_started).drop(columns="ts")
+    st.write(f"**{len(render_timings)} queries ({int(render_timings['cached'].sum())} from cache), "
+             f"{render_timings['ms'].sum():.0f} ms this render**")
+    st.caption(f"First paint {render_profile['first_paint_ms']:.0f} ms, KPI cards {render_profile['kpis_ms']:.0f} ms, "
+               f"section {render_profile['section_ms']:.0f} ms after the rerun started")
+    if st.button("Clear query cache"):
+        get_cache().clear()
+    st.write("Cache")
+    st.json(get_cache().status())
+    st.write("Connection pool")
+    st.json(get_pool().status())
+    st.write("Default view warm-up")
+    st.json(WARM_UP)
+    if get_snapshot() is not None:
+        st.write(f"Snapshot backend ({get_snapshot().path})")
+        st.json(get_snapshot().meta)
+    st.dataframe(render_timings.sort_values("ms", ascending=False))